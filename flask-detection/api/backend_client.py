@@ -1,5 +1,6 @@
 import requests
 import time
+import urllib3
 import sys
 import os
 
@@ -7,6 +8,11 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 from shared.logger import logger
 
+# Outcomes of BackendClient.addBasketItem()
+ADD_APPLIED = 'applied'
+ADD_FAILED = 'failed'      # Definitely not applied; safe to resend
+ADD_UNKNOWN = 'unknown'    # Sent but unanswered; may have been applied
+
 
 class BackendClient:
     """HTTP client for communicating with Node.js backend"""
@@ -23,6 +29,7 @@ class BackendClient:
         self.timeout = timeout
         self.device_id = None
         self.device_code = None
+        self.device_status = None
 
         # Circuit breaker state
         self.failure_count = 0
@@ -38,10 +45,16 @@ class BackendClient:
 
         logger.info(f"Backend client initialized for {self.backend_url}")
 
-    def registerDevice(self, max_retries=3):
+    def registerDevice(self, max_retries=3, device_id=None):
         """
         Register device with backend on startup
 
+        Args:
+            max_retries (int): Attempts before giving up
+            device_id (str): Existing device to refresh; the backend issues a
+                new pairing code and marks it disconnected, so the shopper has
+                to pair again. None registers a new device
+
         Returns:
             str: Device ID if successful
 
@@ -56,7 +69,7 @@ class BackendClient:
 
                 response = self.session.post(
                     endpoint,
-                    json={},
+                    json={'deviceId': device_id} if device_id else {},
                     timeout=self.timeout
                 )
                 response.raise_for_status()
@@ -65,6 +78,7 @@ class BackendClient:
                 device_data = data.get('data', {})                                                                                                                                                           
                 self.device_id = device_data.get('deviceId')
                 self.device_code = device_data.get('code')
+                self.device_status = device_data.get('status')
 
                 if not self.device_id:
                     logger.error(f"Registration response missing deviceId: {data}")
@@ -234,6 +248,67 @@ class BackendClient:
         self._record_failure()
         return False
 
+    def addBasketItem(self, product_id, quantity, confidence):
+        """
+        Add to the basket with a single request, for callers that track state
+
+        Unlike sendToBasket(), a request that may have reached the backend is
+        never resent (the endpoint adds to the existing row, so a resend could
+        add the item twice); the outcome says whether it applied.
+
+        Args:
+            product_id (str): Product ID (e.g., "P001")
+            quantity (int): Quantity to add
+            confidence (float): Detection confidence (0.0-1.0)
+
+        Returns:
+            tuple: (outcome, data) where outcome is ADD_APPLIED, ADD_FAILED or
+                ADD_UNKNOWN and data is the backend response data on success
+                (itemId, productId, quantity = new row total, action)
+        """
+        if not self.device_id:
+            logger.error("Cannot add to basket: device not registered")
+            return ADD_FAILED, None
+
+        if self._check_circuit_breaker():
+            return ADD_FAILED, None
+
+        payload = {
+            "productId": product_id,
+            "quantity": quantity,
+            "confidence": round(confidence, 4),
+            "deviceId": self.device_id
+        }
+
+        try:
+            response = self.session.post(
+                f"{self.backend_url}/api/basket/items",
+                json=payload,
+                timeout=self.timeout
+            )
+        except requests.exceptions.RequestException as e:
+            if not _request_not_sent(e):
+                logger.error(f"Basket API request unanswered, outcome unknown: {str(e)}")
+                self._record_failure()
+                return ADD_UNKNOWN, None
+            logger.error(f"Cannot reach backend for basket add: {str(e)}")
+            self._record_failure()
+            return ADD_FAILED, None
+
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+
+        if response.ok and data.get('success'):
+            self._record_success()
+            return ADD_APPLIED, data.get('data', {})
+
+        # Errors roll back the transaction, so nothing was added
+        logger.error(f"Basket API rejected {quantity}x {product_id} (status {response.status_code}): {data}")
+        self._record_failure()
+        return ADD_FAILED, data
+
     def sendToPending(self, product_id, name, quantity, confidence):
         """
         Send low-confidence detection (<70%) to pending approval queue
@@ -412,3 +487,13 @@ class BackendClient:
         if self.failure_count > 0:
             logger.info(f"✅ API call succeeded after {self.failure_count} failures, resetting counter")
         self.failure_count = 0
+
+
+def _request_not_sent(error):
+    """Return True if a requests error happened before the request reached the server."""
+    if isinstance(error, (requests.exceptions.ConnectTimeout, requests.exceptions.InvalidURL)):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        reason = getattr(error.args[0], 'reason', error.args[0])
+        return isinstance(reason, (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError))
+    return False
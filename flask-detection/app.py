@@ -16,6 +16,12 @@ from shared.logger import logger
 # Import backend client for API communication (Task 3.5)
 from api.backend_client import BackendClient
 
+# Recording requests are picked up by the detection loop's frame recorder
+from camera.recorder import TRIGGER_API, requestRecording
+
+# Model reload requests are picked up by the detection loop's model manager
+from models.yolo_detector import requestModelSwap, resolveEngine, resolveModelPath, resolvePrecision
+
 # Create Flask app
 app = Flask(__name__)
 
@@ -45,6 +51,36 @@ def handle_error(error):
 def health_check():
     return jsonify({'status': 'ok'}), 200
 
+# Save the detection loop's recent frames (e.g. when a basket line is disputed)
+@app.route('/recordings', methods=['POST'])
+def request_recording():
+    body = request.get_json(silent=True) or {}
+    reason = body.get('reason') or TRIGGER_API
+    output_dir = os.getenv('RECORDER_OUTPUT_DIR', 'recordings')
+
+    requestRecording(reason, output_dir, metadata=body.get('metadata'))
+    return jsonify({'status': 'requested', 'reason': reason}), 202
+
+# Hot-swap the detection model (e.g. after copying new weights) without restarting
+@app.route('/model/reload', methods=['POST'])
+def request_model_reload():
+    body = request.get_json(silent=True) or {}
+    try:
+        model_path = resolveModelPath(body['model_path']) if body.get('model_path') else None
+        engine = resolveEngine(body['engine']) if body.get('engine') else None
+        precision = resolvePrecision(body['precision']) if body.get('precision') else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    request_id = requestModelSwap(
+        os.getenv('MODEL_RELOAD_FILE', 'model_reload.json'),
+        model_path=model_path,
+        engine=engine,
+        precision=precision,
+        reason=body.get('reason') or 'api',
+    )
+    return jsonify({'status': 'requested', 'request_id': request_id}), 202
+
 # Configuration helper
 def get_config():
     """Load and validate all required environment variables"""
@@ -80,6 +116,7 @@ def get_config():
 
     # Add optional YOLO configuration with defaults
     config['YOLO_DEVICE'] = os.getenv('YOLO_DEVICE', 'auto')
+    config['YOLO_ENGINE'] = os.getenv('YOLO_ENGINE', 'torch')
     config['YOLO_IOU_THRESHOLD'] = float(os.getenv('YOLO_IOU_THRESHOLD', '0.45'))
     config['YOLO_MAX_DETECTIONS'] = int(os.getenv('YOLO_MAX_DETECTIONS', '300'))
 
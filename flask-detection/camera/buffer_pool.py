@@ -0,0 +1,123 @@
+"""
+Preallocated frame buffer pool.
+
+Capture, color conversion and visualization borrow H x W x C arrays from a
+bounded pool keyed by (shape, dtype) and hand them back when done, so the
+detection loop reuses the same few buffers instead of allocating a fresh
+640x480x3 image for every read, conversion and overlay. OpenCV calls write
+into the borrowed arrays via their dst= forms.
+"""
+
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+
+class FrameBufferPool:
+    """
+    Thread-safe pool of reusable numpy buffers keyed by shape and dtype.
+
+    Attributes:
+        hits: acquire() calls served from the pool
+        misses: acquire() calls that had to allocate
+        returns: Buffers handed back with release()
+        discarded: Released buffers dropped because the key was already full
+    """
+
+    def __init__(self, max_per_key=4):
+        """
+        Args:
+            max_per_key (int): Max idle buffers kept per (shape, dtype)
+        """
+        self.max_per_key = max_per_key
+        self._free = defaultdict(list)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.returns = 0
+        self.discarded = 0
+
+    @staticmethod
+    def _key(shape, dtype):
+        return tuple(shape), np.dtype(dtype).str
+
+    def acquire(self, shape, dtype=np.uint8):
+        """
+        Borrow a buffer (contents are undefined).
+
+        Args:
+            shape (tuple): Array shape, e.g. (480, 640, 3)
+            dtype: numpy dtype (default uint8)
+
+        Returns:
+            numpy.ndarray: Writable C-contiguous array
+        """
+        key = self._key(shape, dtype)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                self.hits += 1
+                return free.pop()
+            self.misses += 1
+        return np.empty(shape, dtype=dtype)
+
+    def acquireLike(self, array):
+        """Borrow a buffer with the same shape and dtype as array."""
+        return self.acquire(array.shape, array.dtype)
+
+    def release(self, array):
+        """
+        Return a buffer to the pool.
+
+        Only owning, contiguous arrays are pooled; views and anything beyond
+        max_per_key are left to the garbage collector.
+        """
+        if array is None:
+            return
+        if not array.flags.owndata or not array.flags.c_contiguous or not array.flags.writeable:
+            self.discarded += 1
+            return
+
+        key = self._key(array.shape, array.dtype)
+        with self._lock:
+            free = self._free[key]
+            if len(free) >= self.max_per_key or any(buf is array for buf in free):
+                self.discarded += 1
+                return
+            free.append(array)
+            self.returns += 1
+
+    def clear(self):
+        """Drop all idle buffers."""
+        with self._lock:
+            self._free.clear()
+
+    def getStats(self):
+        """
+        Get pool counters.
+
+        Returns:
+            dict: Hit/miss/return/discard counts, hit rate and idle buffers
+        """
+        with self._lock:
+            idle = sum(len(free) for free in self._free.values())
+        requests = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / requests, 3) if requests else 0.0,
+            'returns': self.returns,
+            'discarded': self.discarded,
+            'idle_buffers': idle,
+        }
+
+
+# Process-wide default pool shared by capture and visualization
+_default_pool = FrameBufferPool()
+
+
+def getBufferPool():
+    """Return the process-wide default FrameBufferPool."""
+    return _default_pool
@@ -2,6 +2,7 @@ import atexit
 import os
 import signal
 import sys
+import threading
 import time
 
 import cv2
@@ -10,9 +11,272 @@ import cv2
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 from shared.logger import logger  # noqa: E402
 
+from camera.buffer_pool import getBufferPool  # noqa: E402
+from camera.frame import BGR, Frame  # noqa: E402
+
 # Global camera instance for cleanup
 _camera_instance = None
 
+# Global frame grabber instance for cleanup
+_grabber_instance = None
+
+# Shape of the last captured frame, used to borrow pooled read buffers
+_last_frame_shape = None
+
+
+class FrameGrabber:
+    """
+    Background frame grabber that keeps the camera driver buffer drained.
+
+    A dedicated thread calls ``camera.grab()`` continuously so the V4L/OpenCV
+    buffer never holds stale frames. Frames are only decoded (``retrieve()``)
+    when a consumer asks for one via :meth:`read`, so the detection loop gets
+    the most recent frame without paying for decodes it never uses. With a
+    FrameRecorder attached, grabbed frames the recorder wants (its fps) are
+    also decoded into a pooled buffer and handed to it; a read() of such a
+    frame copies that decode instead of decoding the frame again.
+
+    Counters:
+        grabbed_frames: Frames successfully grabbed from the device
+        dropped_frames: Grabbed frames overwritten before any consumer read them
+        duplicate_frames: Reads that returned a frame sequence already handed out
+        failed_grabs: ``grab()`` calls that returned False
+        stale_reads: Reads refused because the device stopped delivering frames
+
+    A device that stops grabbing (unplugged, driver hang) would otherwise keep
+    serving its last frame forever, since retrieve() still decodes it. Once
+    max_failed_grabs grabs in a row have failed, or the newest frame is older
+    than read_timeout, read() returns no frame so callers count a failure.
+    """
+
+    def __init__(self, camera, idle_sleep=0.005, read_timeout=1.0, recorder=None, max_failed_grabs=10):
+        """
+        Initialize frame grabber (call start() to launch the thread).
+
+        Args:
+            camera (cv2.VideoCapture): Camera object from initCamera()
+            idle_sleep (float): Seconds to back off after a failed grab
+            read_timeout (float): Default max seconds read() waits for a frame
+            recorder (FrameRecorder): Receives every grabbed frame (optional)
+            max_failed_grabs (int): Consecutive failed grabs after which the
+                latest frame counts as stale
+        """
+        self.camera = camera
+        self.idle_sleep = idle_sleep
+        self.read_timeout = read_timeout
+        self.recorder = recorder
+        self.max_failed_grabs = max(1, max_failed_grabs)
+        self._record_shape = None
+        # Frame decoded for the recorder, and the sequence it belongs to
+        self._recorded_frame = None
+        self._recorded_sequence = 0
+
+        # Latest-frame slot, guarded by _cond
+        self._cond = threading.Condition()
+        self._sequence = 0
+        self._timestamp = None
+        self._grabbing = False
+        self._readers_waiting = 0
+
+        # Sequence of the last frame handed out to a consumer
+        self._decoded_sequence = 0
+
+        self.grabbed_frames = 0
+        self.dropped_frames = 0
+        self.duplicate_frames = 0
+        self.failed_grabs = 0
+        self.consecutive_failed_grabs = 0
+        self.stale_reads = 0
+
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the background grab thread."""
+        if self._running:
+            return self
+
+        self._running = True
+        self._thread = threading.Thread(target=self._grab_loop, name='FrameGrabber', daemon=True)
+        self._thread.start()
+        logger.info("Frame grabber started")
+        return self
+
+    def stop(self, timeout=1.0):
+        """Stop the background grab thread (does not release the camera)."""
+        if not self._running:
+            return
+
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+        logger.info(
+            f"Frame grabber stopped (grabbed {self.grabbed_frames}, "
+            f"dropped {self.dropped_frames}, duplicates {self.duplicate_frames})"
+        )
+
+    def isRunning(self):
+        """Return True while the grab thread is active."""
+        return self._running and self._thread is not None and self._thread.is_alive()
+
+    def _grab_loop(self):
+        """Continuously grab frames, yielding to readers between grabs."""
+        while self._running:
+            with self._cond:
+                # Let a pending retrieve() run against the frame we just grabbed
+                while self._readers_waiting and self._running:
+                    self._cond.wait(0.1)
+                if not self._running:
+                    break
+                self._grabbing = True
+
+            recorded = None
+            try:
+                ok = self.camera.grab()
+                if ok and self.recorder is not None and self.recorder.wants(time.time()):
+                    # Decoded while _grabbing is set, so readers wait for it
+                    recorded = self._record_grabbed()
+            except cv2.error as e:
+                logger.warning(f"Frame grab raised OpenCV error: {str(e)}")
+                ok = False
+
+            with self._cond:
+                self._grabbing = False
+                if ok:
+                    # Previous frame was never decoded by any consumer
+                    if self._sequence > self._decoded_sequence:
+                        self.dropped_frames += 1
+                    self._sequence += 1
+                    self._timestamp = time.monotonic()
+                    self._recorded_frame = recorded
+                    self._recorded_sequence = self._sequence if recorded is not None else 0
+                    self.grabbed_frames += 1
+                    self.consecutive_failed_grabs = 0
+                else:
+                    self.failed_grabs += 1
+                    self.consecutive_failed_grabs += 1
+                self._cond.notify_all()
+
+            if not ok:
+                time.sleep(self.idle_sleep)
+
+    def _record_grabbed(self):
+        """
+        Decode the frame just grabbed into a pooled buffer for the recorder.
+
+        Returns:
+            numpy.ndarray: The decoded frame (now owned by the recorder's
+            ring, read-only), or None if nothing was recorded
+        """
+        pool = getBufferPool()
+        buffer = pool.acquire(self._record_shape) if self._record_shape is not None else None
+        ok, frame = self.camera.retrieve(buffer) if buffer is not None else self.camera.retrieve()
+        if buffer is not None and frame is not buffer:
+            pool.release(buffer)
+        if not ok or frame is None:
+            return None
+
+        self._record_shape = frame.shape
+        try:
+            self.recorder.record(frame, time.time(), pool=pool)
+        except Exception as e:  # pragma: no cover - never stop grabbing for the recorder
+            logger.warning(f"Frame recorder failed: {str(e)}")
+            return None
+        return frame
+
+    def read(self, timeout=None, image=None):
+        """
+        Decode and return the latest grabbed frame.
+
+        Args:
+            timeout (float): Max seconds to wait for a frame (default read_timeout)
+            image (numpy.ndarray): Optional output buffer to decode into
+
+        Returns:
+            tuple: (frame, sequence, timestamp) where frame is the BGR
+            numpy.ndarray (or None if nothing is available or the device
+            stopped delivering frames), sequence is the monotonically
+            increasing grab number and timestamp is the time.monotonic()
+            value at grab time.
+        """
+        deadline = time.monotonic() + (self.read_timeout if timeout is None else timeout)
+
+        with self._cond:
+            self._readers_waiting += 1
+            try:
+                # Wait for an in-flight grab to finish (or the first frame)
+                while self._grabbing or self._sequence == 0:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._running:
+                        break
+                    self._cond.wait(remaining)
+
+                if self._grabbing or self._sequence == 0:
+                    return None, self._sequence, self._timestamp
+
+                if (self.consecutive_failed_grabs >= self.max_failed_grabs
+                        or time.monotonic() - self._timestamp > self.read_timeout):
+                    self.stale_reads += 1
+                    return None, self._sequence, self._timestamp
+
+                # Decode again (or copy the recorder's decode) rather than
+                # sharing the array, so each consumer owns (and may draw on)
+                # the frame it receives
+                if self._sequence == self._decoded_sequence:
+                    self.duplicate_frames += 1
+
+                if self._recorded_sequence == self._sequence:
+                    # Still the newest frame in the recorder's ring, so its
+                    # buffer is not recycled while the grab thread waits
+                    frame = self._copy_recorded(image)
+                else:
+                    ok, frame = self.camera.retrieve(image) if image is not None else self.camera.retrieve()
+                    if not ok or frame is None:
+                        return None, self._sequence, self._timestamp
+
+                self._decoded_sequence = self._sequence
+                return frame, self._sequence, self._timestamp
+            finally:
+                self._readers_waiting -= 1
+                self._cond.notify_all()
+
+    def _copy_recorded(self, image=None):
+        """Copy the recorder's decode of the latest frame into image (or a new array)."""
+        source = self._recorded_frame
+        if image is not None and image.shape == source.shape and image.dtype == source.dtype:
+            image[...] = source
+            return image
+        return source.copy()
+
+    def getStats(self):
+        """
+        Get grabber counters.
+
+        Returns:
+            dict: Sequence number and grabbed/dropped/duplicate/failed/stale counters
+        """
+        with self._cond:
+            return {
+                'sequence': self._sequence,
+                'grabbed_frames': self.grabbed_frames,
+                'dropped_frames': self.dropped_frames,
+                'duplicate_frames': self.duplicate_frames,
+                'failed_grabs': self.failed_grabs,
+                'consecutive_failed_grabs': self.consecutive_failed_grabs,
+                'stale_reads': self.stale_reads,
+            }
+
+    def release(self):
+        """Stop the grab thread and release the underlying camera."""
+        self.stop()
+        if self.camera is not None:
+            self.camera.release()
+
 
 def initCamera(camera_index=0):
     """
@@ -84,23 +348,63 @@ def initCamera(camera_index=0):
         return None
 
 
+def startFrameGrabber(camera):
+    """
+    Start a background FrameGrabber for an initialized camera.
+
+    Args:
+        camera (cv2.VideoCapture): Camera object from initCamera()
+
+    Returns:
+        FrameGrabber: Running grabber, or None if camera is None
+    """
+    global _grabber_instance
+
+    if camera is None:
+        logger.error("Cannot start frame grabber: camera is None")
+        return None
+
+    _grabber_instance = FrameGrabber(camera).start()
+    return _grabber_instance
+
+
 def captureFrame(camera, max_retries=3):
     """
     Capture a single frame from the camera with retry logic.
 
     Args:
-        camera (cv2.VideoCapture): Camera object from initCamera()
+        camera (cv2.VideoCapture | FrameGrabber): Camera object from initCamera()
+            or a running FrameGrabber (returns its latest frame)
         max_retries (int): Maximum number of retry attempts
 
     Returns:
-        numpy.ndarray: Frame in RGB format (ready for YOLO), or None if failed
+        Frame: BGR frame as delivered by OpenCV (Ultralytics expects BGR for
+        numpy input, so no conversion is done here), or None if failed.
+        The pixel buffer belongs to the shared FrameBufferPool; call
+        frame.release() once the iteration is done with it.
     """
+    global _last_frame_shape
+
     if camera is None:
         logger.error("Cannot capture frame: camera is None")
         return None
 
+    pool = getBufferPool()
+
     for attempt in range(max_retries):
-        ret, frame = camera.read()
+        # Decode into a pooled buffer once the frame shape is known
+        buffer = pool.acquire(_last_frame_shape) if _last_frame_shape is not None else None
+
+        if isinstance(camera, FrameGrabber):
+            frame, _, _ = camera.read(image=buffer)
+            ret = frame is not None
+        elif buffer is not None:
+            ret, frame = camera.read(buffer)
+        else:
+            ret, frame = camera.read()
+
+        if buffer is not None and frame is not buffer:
+            pool.release(buffer)
 
         if not ret or frame is None:
             logger.warning(f"Frame capture failed (attempt {attempt + 1}/{max_retries})")
@@ -117,22 +421,277 @@ def captureFrame(camera, max_retries=3):
             logger.error(f"Invalid frame dimensions: {frame.shape}")
             return None
 
-        # Convert BGR (OpenCV) to RGB (YOLO expects RGB)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        _last_frame_shape = frame.shape
 
-        return frame_rgb
+        # Keep OpenCV's native BGR order; consumers convert only if needed
+        return Frame(frame, BGR, pool=pool)
 
     return None
 
 
+class CameraSupervisor:
+    """
+    Keeps a frame source available, reopening it in the background on failure.
+
+    The detection loop calls captureFrame() on the supervisor instead of on a
+    raw camera. After failure_threshold consecutive failed captures the
+    supervisor marks the camera unavailable and reopens the device (or its
+    fallbacks, via the opener) on a background thread with capped exponential
+    backoff. captureFrame() never blocks on recovery: while the camera is down
+    it returns None immediately and the loop can skip inference.
+
+    States:
+        'connecting': Initial open in progress
+        'available': Frames are flowing
+        'reconnecting': Sustained failure detected, reopening in background
+        'exhausted': A finite replay source has ended (no reconnect)
+        'stopped': stop() was called
+    """
+
+    def __init__(self, opener=None, use_grabber=True, failure_threshold=3,
+                 backoff_initial=0.5, backoff_max=30.0, read_timeout=0.2, recorder=None):
+        """
+        Args:
+            opener (callable): Returns an opened frame source (or None on
+                failure); defaults to camera.sources.openFrameSourceFromEnv
+            use_grabber (bool): Run a FrameGrabber on live (non-prefetched) sources
+            failure_threshold (int): Consecutive failed captures before reconnecting
+            backoff_initial (float): First retry delay in seconds
+            backoff_max (float): Cap for the exponential retry delay
+            read_timeout (float): Max seconds a capture waits on the grabber
+            recorder (FrameRecorder): Fed every grabbed frame by the grabber,
+                or every captured frame when there is no grabber (optional)
+        """
+        if opener is None:
+            from camera.sources import openFrameSourceFromEnv
+
+            opener = openFrameSourceFromEnv
+
+        self.opener = opener
+        self.use_grabber = use_grabber
+        self.failure_threshold = max(1, failure_threshold)
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.read_timeout = read_timeout
+        self.recorder = recorder
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._available = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+        self.source = None
+        self.grabber = None
+        self.state = 'connecting'
+        self.consecutive_failures = 0
+        self.reconnects = 0
+        self.open_attempts = 0
+
+    @classmethod
+    def fromEnv(cls, recorder=None):
+        """Build a supervisor configured by CAMERA_* environment variables."""
+        return cls(
+            use_grabber=os.getenv('CAMERA_BACKGROUND_GRAB', 'true').lower() == 'true',
+            failure_threshold=int(os.getenv('CAMERA_FAILURE_THRESHOLD', 3)),
+            backoff_initial=float(os.getenv('CAMERA_RECONNECT_BACKOFF', 0.5)),
+            backoff_max=float(os.getenv('CAMERA_RECONNECT_BACKOFF_MAX', 30)),
+            recorder=recorder,
+        )
+
+    def start(self):
+        """Start the supervisor thread; the first open happens in the background."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._supervise, name='CameraSupervisor', daemon=True)
+            self._thread.start()
+        return self
+
+    def waitUntilAvailable(self, timeout=None):
+        """Block until the camera is available (startup only). Returns availability."""
+        return self._available.wait(timeout)
+
+    def isAvailable(self):
+        return self._available.is_set()
+
+    def isExhausted(self):
+        return self.state == 'exhausted'
+
+    def _supervise(self):
+        """Open (and reopen after failures) the frame source with capped backoff."""
+        delay = self.backoff_initial
+
+        while not self._stopping:
+            if self._available.is_set():
+                # Sleep until captureFrame() reports sustained failure
+                self._wake.wait()
+                self._wake.clear()
+                continue
+
+            self._close_source()
+            if self._stopping:
+                break
+
+            self.open_attempts += 1
+            try:
+                source = self.opener()
+            except Exception as e:  # pragma: no cover - opener is best effort
+                logger.error(f"Camera open raised: {str(e)}")
+                source = None
+
+            if source is not None:
+                grabber = None
+                if self.use_grabber and not getattr(source, 'prefetched', False):
+                    grabber = FrameGrabber(source, read_timeout=self.read_timeout, recorder=self.recorder).start()
+
+                with self._lock:
+                    self.source = source
+                    self.grabber = grabber
+                    self.consecutive_failures = 0
+                    if self.state == 'reconnecting':
+                        self.reconnects += 1
+                    self.state = 'available'
+                self._available.set()
+                delay = self.backoff_initial
+                logger.info(f"📷 Camera available: {source}")
+                continue
+
+            logger.warning(f"Camera open failed (attempt {self.open_attempts}), retrying in {delay:.1f}s")
+            self._wake.wait(delay)
+            self._wake.clear()
+            delay = min(delay * 2, self.backoff_max)
+
+    def _close_source(self):
+        with self._lock:
+            source, grabber = self.source, self.grabber
+            self.source = None
+            self.grabber = None
+
+        if grabber is not None:
+            grabber.stop()
+        if source is not None:
+            try:
+                source.release()
+            except Exception as e:  # pragma: no cover - cleanup best effort
+                logger.warning(f"Error releasing failed camera: {str(e)}")
+
+    def captureFrame(self):
+        """
+        Capture a frame without ever blocking on recovery.
+
+        Returns:
+            Frame: Latest frame, or None if the camera is unavailable or the
+            capture failed (failures count towards a reconnect)
+        """
+        if not self._available.is_set():
+            return None
+
+        with self._lock:
+            source, grabber = self.source, self.grabber
+        if source is None:
+            return None
+
+        frame = captureFrame(grabber if grabber is not None else source, max_retries=1)
+        if frame is not None:
+            self.consecutive_failures = 0
+            if grabber is None and self.recorder is not None:
+                self.recorder.record(frame)
+            return frame
+
+        if getattr(source, 'isExhausted', lambda: False)():
+            self.state = 'exhausted'
+            self._available.clear()
+            return None
+
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            logger.error(
+                f"Camera failed {self.consecutive_failures} consecutive captures, "
+                "reconnecting in background"
+            )
+            self.state = 'reconnecting'
+            self._available.clear()
+            self._wake.set()
+
+        return None
+
+    def getStats(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'reconnects': self.reconnects,
+            'open_attempts': self.open_attempts,
+        }
+
+    def stop(self):
+        """Stop supervising and release the camera."""
+        self._stopping = True
+        self.state = 'stopped'
+        self._available.clear()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self._close_source()
+
+
+def runFrameBusProducer(ring_name, stop_event):
+    """
+    Process target: capture frames into a shared-memory frame ring.
+
+    Opens the frame source configured by CAMERA_SOURCE/CAMERA_INDEX in this
+    process and publishes every captured frame to the SharedFrameRing named
+    ring_name until stop_event is set or a finite source is exhausted.
+
+    Args:
+        ring_name (str): Name of a SharedFrameRing created by the parent
+        stop_event (multiprocessing.Event): Set by the parent to stop capture
+    """
+    from camera.frame_bus import SharedFrameRing
+
+    ring = SharedFrameRing.attach(ring_name)
+
+    # Frames are published continuously, so the supervisor reads the source
+    # directly (no FrameGrabber) and reconnects it if it fails
+    supervisor = CameraSupervisor.fromEnv()
+    supervisor.use_grabber = False
+    supervisor.start()
+
+    logger.info(f"Frame bus producer publishing to {ring_name}")
+
+    try:
+        while not stop_event.is_set():
+            frame = supervisor.captureFrame()
+            if frame is None:
+                if supervisor.isExhausted():
+                    logger.info("Frame bus producer: source exhausted")
+                    break
+                time.sleep(0.01)
+                continue
+
+            ring.write(frame.data, time.monotonic_ns())
+            frame.release()
+    finally:
+        logger.info(f"Frame bus producer stopped ({ring.getStats()})")
+        supervisor.stop()
+        ring.close()
+
+
 def releaseCamera(camera=None):
     """
     Release camera resources and cleanup.
 
     Args:
-        camera (cv2.VideoCapture): Camera object to release, or None to use global
+        camera (cv2.VideoCapture | FrameGrabber): Camera object to release, or None to use global
     """
-    global _camera_instance
+    global _camera_instance, _grabber_instance
+
+    if isinstance(camera, FrameGrabber):
+        camera = camera.camera
+
+    # Stop the grab thread before releasing the device it reads from
+    if _grabber_instance is not None:
+        _grabber_instance.stop()
+        _grabber_instance = None
 
     if camera is None:
         camera = _camera_instance
@@ -0,0 +1,98 @@
+"""
+Color-tagged frame container.
+
+OpenCV captures and displays BGR, and Ultralytics treats numpy input as BGR,
+so the detection pipeline can stay in BGR end-to-end. ``Frame`` carries the
+channel order alongside the pixel data so each consumer converts only when it
+really needs a different order.
+
+This module is imported by the inference path, so cv2 is only imported when
+a conversion is actually performed.
+"""
+
+BGR = 'BGR'
+RGB = 'RGB'
+
+
+class Frame:
+    """
+    Image array tagged with its color space.
+
+    Attributes:
+        data (numpy.ndarray): H x W x 3 uint8 pixel data
+        color_space (str): 'BGR' or 'RGB'
+        pool (FrameBufferPool): Pool that data is returned to by release(), or None
+    """
+
+    __slots__ = ('data', 'color_space', 'pool')
+
+    def __init__(self, data, color_space=BGR, pool=None):
+        if color_space not in (BGR, RGB):
+            raise ValueError(f"Unsupported color space: {color_space}")
+        self.data = data
+        self.color_space = color_space
+        self.pool = pool
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    def __array__(self, dtype=None):
+        return self.data if dtype is None else self.data.astype(dtype)
+
+    def __repr__(self):
+        return f"Frame(shape={self.data.shape}, color_space={self.color_space})"
+
+    def to(self, color_space, dst=None):
+        """
+        Return pixel data in the requested color space.
+
+        Converts only when the order differs; otherwise returns the underlying
+        array as-is. Conversions write into dst when given (e.g. a buffer
+        borrowed from a FrameBufferPool) instead of allocating.
+        """
+        if color_space == self.color_space:
+            return self.data
+        if color_space not in (BGR, RGB):
+            raise ValueError(f"Unsupported color space: {color_space}")
+
+        import cv2
+
+        # BGR<->RGB is the same channel swap in both directions
+        return cv2.cvtColor(self.data, cv2.COLOR_BGR2RGB, dst=dst)
+
+    def release(self):
+        """Return the pixel buffer to its pool (the frame must not be used afterwards)."""
+        if self.pool is not None and self.data is not None:
+            self.pool.release(self.data)
+        self.data = None
+
+    def asBGR(self):
+        return self.to(BGR)
+
+    def asRGB(self):
+        return self.to(RGB)
+
+
+def toColorSpace(frame, color_space, assume=BGR, dst=None):
+    """
+    Get pixel data from a Frame or raw array in the requested color space.
+
+    Args:
+        frame: Frame or numpy.ndarray
+        color_space (str): Target color space ('BGR' or 'RGB')
+        assume (str): Color space of raw numpy arrays (untagged input)
+        dst (numpy.ndarray): Optional output buffer used if a conversion is needed
+
+    Returns:
+        numpy.ndarray: Pixel data in color_space (no copy if already matching)
+    """
+    if frame is None:
+        return None
+    if not isinstance(frame, Frame):
+        frame = Frame(frame, assume)
+    return frame.to(color_space, dst=dst)
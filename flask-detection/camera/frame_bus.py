@@ -0,0 +1,326 @@
+"""
+Shared-memory frame bus for multi-process detection.
+
+A SharedFrameRing is a ring of preallocated H x W x 3 uint8 slots in a
+multiprocessing.shared_memory block. One capture process writes frames into
+the ring; inference and display processes map the same block and read slots
+as zero-copy numpy views, so frames never get pickled across processes.
+
+Protocol (single writer, up to max_readers readers):
+- Each slot has a seqlock counter: odd while the writer is filling it, even
+  once the frame is published.
+- A reader pins the slot it is using; the writer never starts writing a
+  pinned slot, so a pinned view stays valid until release().
+- The writer marks a slot odd *before* checking pins and the reader pins
+  *before* re-checking the seqlock, so at least one side always sees the
+  other and backs off.
+"""
+
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+FRAME_BUS_MAGIC = 0x5353464231  # "SSFB1"
+
+# Header layout (int64 words)
+_H_MAGIC = 0
+_H_SLOTS = 1
+_H_HEIGHT = 2
+_H_WIDTH = 3
+_H_CHANNELS = 4
+_H_LATEST_SLOT = 5
+_H_LATEST_SEQ = 6
+_H_MAX_READERS = 7
+_H_FIXED_WORDS = 8
+
+# Per-slot metadata words
+_S_LOCK = 0
+_S_FRAME_SEQ = 1
+_S_TIMESTAMP_NS = 2
+_S_WORDS = 4
+
+_ALIGN = 64
+
+
+def _header_words(slots, max_readers):
+    return _H_FIXED_WORDS + slots * _S_WORDS + slots * max_readers
+
+
+def _data_offset(slots, max_readers):
+    header_bytes = _header_words(slots, max_readers) * 8
+    return (header_bytes + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class SharedFrameRing:
+    """
+    Ring of preallocated frame slots in shared memory.
+
+    Use SharedFrameRing.create() in the owning process and
+    SharedFrameRing.attach(name) in the others.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+
+        words = np.ndarray((_H_FIXED_WORDS,), dtype=np.int64, buffer=shm.buf)
+        if int(words[_H_MAGIC]) != FRAME_BUS_MAGIC:
+            raise ValueError(f"Shared memory block {shm.name} is not a frame bus")
+
+        self.slots = int(words[_H_SLOTS])
+        self.shape = (int(words[_H_HEIGHT]), int(words[_H_WIDTH]), int(words[_H_CHANNELS]))
+        self.max_readers = int(words[_H_MAX_READERS])
+
+        self._header = np.ndarray(
+            (_header_words(self.slots, self.max_readers),), dtype=np.int64, buffer=shm.buf
+        )
+        meta_start = _H_FIXED_WORDS
+        pins_start = meta_start + self.slots * _S_WORDS
+        self._meta = self._header[meta_start:pins_start].reshape(self.slots, _S_WORDS)
+        self._pins = self._header[pins_start:].reshape(self.max_readers, self.slots)
+
+        self._frames = np.ndarray(
+            (self.slots,) + self.shape,
+            dtype=np.uint8,
+            buffer=shm.buf,
+            offset=_data_offset(self.slots, self.max_readers),
+        )
+
+        # Writer-local state
+        self._next_slot = 0
+        self._frame_seq = int(self._header[_H_LATEST_SEQ])
+
+        # Reader-local state: reader_id -> pinned slot
+        self._pinned = {}
+
+        self.frames_written = 0
+        self.writer_collisions = 0
+        self.reader_retries = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @classmethod
+    def create(cls, slots=4, shape=(480, 640, 3), max_readers=2, name=None):
+        """
+        Allocate a new ring in shared memory.
+
+        Args:
+            slots (int): Number of frame slots (>= max_readers + 2 so the
+                writer always has a free slot)
+            shape (tuple): Frame shape (height, width, channels)
+            max_readers (int): Number of reader ids that can pin slots
+            name (str): Optional shared memory name (random if None)
+
+        Returns:
+            SharedFrameRing: Ring owned by this process (call unlink() when done)
+        """
+        slots = max(int(slots), max_readers + 2)
+        height, width, channels = shape
+        size = _data_offset(slots, max_readers) + slots * height * width * channels
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((_header_words(slots, max_readers),), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_H_SLOTS] = slots
+        header[_H_HEIGHT] = height
+        header[_H_WIDTH] = width
+        header[_H_CHANNELS] = channels
+        header[_H_LATEST_SLOT] = -1
+        header[_H_MAX_READERS] = max_readers
+        header[_H_MAGIC] = FRAME_BUS_MAGIC
+        del header
+
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Map an existing ring created by another process."""
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    # ----- Writer side -----
+
+    def write(self, frame, timestamp_ns=None):
+        """
+        Copy a frame into the next free slot and publish it.
+
+        Frames whose shape differs from the slot shape are resized into the
+        slot directly (no intermediate allocation).
+
+        Args:
+            frame (numpy.ndarray): H x W x 3 uint8 frame (BGR)
+            timestamp_ns (int): Capture time (time.monotonic_ns()); now if None
+
+        Returns:
+            int: Published frame sequence number, or -1 if every slot was pinned
+        """
+        for _ in range(self.slots):
+            slot = self._next_slot
+            self._next_slot = (self._next_slot + 1) % self.slots
+
+            meta = self._meta[slot]
+            if slot == self._header[_H_LATEST_SLOT] and self._frame_seq:
+                continue
+
+            # Mark slot as being written, then back off if a reader holds it
+            meta[_S_LOCK] += 1
+            if self._pins[:, slot].any():
+                meta[_S_LOCK] += 1
+                self.writer_collisions += 1
+                continue
+
+            view = self._frames[slot]
+            if frame.shape == self.shape:
+                np.copyto(view, frame)
+            else:
+                import cv2
+
+                cv2.resize(frame, (self.shape[1], self.shape[0]), dst=view)
+
+            self._frame_seq += 1
+            meta[_S_FRAME_SEQ] = self._frame_seq
+            meta[_S_TIMESTAMP_NS] = timestamp_ns if timestamp_ns is not None else time.monotonic_ns()
+            meta[_S_LOCK] += 1
+
+            self._header[_H_LATEST_SLOT] = slot
+            self._header[_H_LATEST_SEQ] = self._frame_seq
+            self.frames_written += 1
+            return self._frame_seq
+
+        return -1
+
+    # ----- Reader side -----
+
+    def latestSequence(self):
+        """Return the sequence number of the most recently published frame."""
+        return int(self._header[_H_LATEST_SEQ])
+
+    def acquire(self, reader_id=0, after_seq=0, timeout=1.0, poll_interval=0.002):
+        """
+        Pin and return the latest frame newer than after_seq.
+
+        The returned array is a read-only view into shared memory; it stays
+        valid until release(reader_id) is called. Copy it before drawing.
+
+        Args:
+            reader_id (int): Reader slot (0..max_readers-1), one per consumer
+            after_seq (int): Only return frames with a larger sequence number
+            timeout (float): Max seconds to wait for a new frame
+            poll_interval (float): Sleep between polls while waiting
+
+        Returns:
+            tuple: (frame_view, frame_seq, timestamp_ns), or (None, 0, 0) on timeout
+        """
+        self.release(reader_id)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            slot = int(self._header[_H_LATEST_SLOT])
+            latest_seq = int(self._header[_H_LATEST_SEQ])
+
+            if slot >= 0 and latest_seq > after_seq:
+                meta = self._meta[slot]
+                lock_before = int(meta[_S_LOCK])
+
+                if lock_before % 2 == 0:
+                    self._pins[reader_id, slot] = 1
+                    frame_seq = int(meta[_S_FRAME_SEQ])
+                    timestamp_ns = int(meta[_S_TIMESTAMP_NS])
+
+                    # Writer did not touch the slot between our reads and the pin
+                    if int(meta[_S_LOCK]) == lock_before and frame_seq > after_seq:
+                        self._pinned[reader_id] = slot
+                        view = self._frames[slot]
+                        view.flags.writeable = False
+                        return view, frame_seq, timestamp_ns
+
+                    self._pins[reader_id, slot] = 0
+
+                self.reader_retries += 1
+
+            if time.monotonic() >= deadline:
+                return None, 0, 0
+            time.sleep(poll_interval)
+
+    def acquireSequence(self, frame_seq, reader_id=0, timeout=1.0, poll_interval=0.002):
+        """
+        Pin and return one specific frame by sequence number.
+
+        Used when a dispatcher assigns exact frames to a reader (sharded
+        inference) instead of the reader taking whatever is latest.
+
+        Args:
+            frame_seq (int): Sequence number returned by write()
+            reader_id (int): Reader slot (0..max_readers-1)
+            timeout (float): Max seconds to wait for the frame to be published
+            poll_interval (float): Sleep between polls while waiting
+
+        Returns:
+            tuple: (frame_view, timestamp_ns), or (None, 0) if the frame was
+                overwritten or did not appear before the timeout
+        """
+        self.release(reader_id)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            if frame_seq > int(self._header[_H_LATEST_SEQ]):
+                if time.monotonic() >= deadline:
+                    return None, 0
+                time.sleep(poll_interval)
+                continue
+
+            for slot in range(self.slots):
+                meta = self._meta[slot]
+                lock_before = int(meta[_S_LOCK])
+                if lock_before % 2 or int(meta[_S_FRAME_SEQ]) != frame_seq:
+                    continue
+
+                self._pins[reader_id, slot] = 1
+                if int(meta[_S_LOCK]) == lock_before and int(meta[_S_FRAME_SEQ]) == frame_seq:
+                    self._pinned[reader_id] = slot
+                    view = self._frames[slot]
+                    view.flags.writeable = False
+                    return view, int(meta[_S_TIMESTAMP_NS])
+                self._pins[reader_id, slot] = 0
+                self.reader_retries += 1
+
+            # Published but no longer in any slot: overwritten
+            return None, 0
+
+    def release(self, reader_id=0):
+        """Unpin the slot held by reader_id (no-op if nothing is pinned)."""
+        slot = self._pinned.pop(reader_id, None)
+        if slot is not None:
+            self._pins[reader_id, slot] = 0
+
+    # ----- Lifecycle -----
+
+    def getStats(self):
+        return {
+            'slots': self.slots,
+            'latest_seq': self.latestSequence(),
+            'frames_written': self.frames_written,
+            'writer_collisions': self.writer_collisions,
+            'reader_retries': self.reader_retries,
+        }
+
+    def close(self):
+        """Unmap the shared memory (views become invalid)."""
+        for reader_id in list(self._pinned):
+            self.release(reader_id)
+        self._frames = None
+        self._meta = None
+        self._pins = None
+        self._header = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes away with the process
+            pass
+
+    def unlink(self):
+        """Destroy the shared memory block (owner only, after all processes close)."""
+        if self.owner:
+            self.shm.unlink()
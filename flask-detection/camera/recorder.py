@@ -0,0 +1,518 @@
+"""
+Ring-buffer frame recorder for dispute evidence.
+
+FrameRecorder keeps the last N seconds of camera frames in memory, sampled at
+its own rate (fps). The capture path feeds it independently of inference
+(FrameGrabber decodes a grabbed frame into a FrameBufferPool buffer whenever
+the recorder wants() one), so a clip shows what happened between two detection
+iterations, not just the frames that were inferred. Buffered frames live in
+pooled buffers that go back to the pool once they leave the ring and no pending
+clip uses them.
+
+Each buffered frame is a full decoded image (640x480 BGR is about 0.9 MB), so
+memory use is min(seconds * fps, max_frames) frames: the defaults (10 s at
+5 fps, at most 50 frames) keep about 46 MB, where 10 s at 30 fps would keep
+about 276 MB, too much for a Raspberry Pi.
+
+When a trigger fires (low-confidence detection, failed backend call, or an API
+request), the buffered window is handed to a background writer thread that
+encodes it to disk as an MP4 clip or a JPEG sequence, next to a metadata.json
+describing why it was saved. Capture never waits on encoding or disk I/O.
+
+API triggers come from a different process (app.py), so they are passed as
+small request files in the output directory (see requestRecording()) and picked
+up by the recorder from record(). A request file is only deleted once its clip
+is queued, and API triggers ignore the cooldown, so a POST /recordings is not
+lost to an automatic trigger that fired just before. app.py only needs
+requestRecording(), so cv2 and numpy are imported by the recorder when frames
+are actually buffered or encoded.
+
+Output layout:
+    <output_dir>/<YYYYmmdd-HHMMSS>_<reason>/clip.mp4      (format 'mp4')
+    <output_dir>/<YYYYmmdd-HHMMSS>_<reason>/frame_0001.jpg (format 'jpg')
+    <output_dir>/<YYYYmmdd-HHMMSS>_<reason>/metadata.json
+"""
+
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from shared.logger import logger  # noqa: E402
+
+from camera.frame import BGR, toColorSpace  # noqa: E402
+
+RECORDING_FORMATS = ('jpg', 'mp4')
+
+TRIGGER_LOW_CONFIDENCE = 'low_confidence'
+TRIGGER_ROUTING_FAILURE = 'routing_failure'
+TRIGGER_API = 'api'
+
+_REQUEST_PREFIX = 'request-'
+_REQUEST_SUFFIX = '.json'
+
+
+class _BufferedFrame:
+    """Frame in the ring; refs counts the ring and pending clips holding it."""
+
+    __slots__ = ('timestamp', 'data', 'pool', 'refs')
+
+    def __init__(self, timestamp, data, pool):
+        self.timestamp = timestamp
+        self.data = data
+        self.pool = pool
+        self.refs = 1
+
+
+def _safe_name(text):
+    return re.sub(r'[^A-Za-z0-9_-]+', '-', str(text)).strip('-')[:40] or 'trigger'
+
+
+def requestRecording(reason='api', output_dir='recordings', metadata=None):
+    """
+    Ask a running FrameRecorder (possibly in another process) to save a clip.
+
+    Writes a request file into output_dir atomically; the recorder deletes it
+    once the clip is queued for writing.
+
+    Args:
+        reason (str): Trigger reason stored in the recording metadata
+        output_dir (str): Recorder output directory (RECORDER_OUTPUT_DIR)
+        metadata (dict): Extra JSON-serializable context
+
+    Returns:
+        str: Path of the request file
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    name = f"{_REQUEST_PREFIX}{time.time_ns()}{_REQUEST_SUFFIX}"
+    path = os.path.join(output_dir, name)
+    tmp_path = path + '.tmp'
+
+    with open(tmp_path, 'w') as f:
+        json.dump({'reason': reason, 'metadata': metadata or {}}, f)
+    os.replace(tmp_path, path)
+
+    return path
+
+
+class FrameRecorder:
+    """
+    Keep the last N seconds of frames and flush them to disk on triggers.
+
+    Usage:
+        recorder = FrameRecorder.fromEnv()
+        recorder.start()
+        ...
+        recorder.record(frame)    # or FrameGrabber(camera, recorder=recorder)
+        if low_conf:
+            recorder.trigger('low_confidence', {'detections': low_conf})
+        ...
+        recorder.stop()
+
+    Attributes:
+        recordings_saved: Clips written to disk
+        triggers_coalesced: Triggers ignored because of the cooldown
+        jobs_dropped: Clips dropped because the writer queue was full
+    """
+
+    def __init__(
+        self,
+        seconds=10.0,
+        fps=5.0,
+        max_frames=50,
+        output_dir='recordings',
+        file_format='mp4',
+        jpeg_quality=85,
+        cooldown=None,
+        max_pending=2,
+        poll_interval=0.5,
+    ):
+        """
+        Initialize recorder.
+
+        Args:
+            seconds (float): Length of the pre-trigger window kept in memory
+            fps (float): Frames buffered per second; faster input is
+                sampled down (0 = keep every frame)
+            max_frames (int): Hard cap on buffered frames (bounds memory use,
+                about 0.9 MB per 640x480 frame)
+            output_dir (str): Directory recordings are written to
+            file_format (str): 'mp4' (single clip) or 'jpg' (frame sequence)
+            jpeg_quality (int): JPEG quality for 'jpg' recordings (0-100)
+            cooldown (float): Seconds after a trigger during which further
+                automatic triggers are coalesced (defaults to seconds); API
+                triggers are never coalesced
+            max_pending (int): Max clips queued for the writer before new
+                triggers are dropped
+            poll_interval (float): Min seconds between checks for API
+                request files
+        """
+        if file_format not in RECORDING_FORMATS:
+            raise ValueError(f"Unknown recording format: {file_format}")
+
+        self.seconds = float(seconds)
+        self.fps = max(0.0, float(fps))
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.jpeg_quality = int(jpeg_quality)
+        self.cooldown = self.seconds if cooldown is None else float(cooldown)
+        self.max_frames = max(1, int(max_frames))
+        self.poll_interval = float(poll_interval)
+
+        # _BufferedFrame entries holding read-only pooled buffers; record()
+        # runs on the capture thread and trigger() on the detection loop
+        self._ring = deque()
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._thread = None
+        self._running = False
+        self._last_trigger = None
+        self._next_poll = 0.0
+        self._next_record = None
+
+        self.frames_recorded = 0
+        self.frames_skipped = 0
+        self.recordings_saved = 0
+        self.triggers_coalesced = 0
+        self.jobs_dropped = 0
+        self.write_errors = 0
+
+    @classmethod
+    def fromEnv(cls):
+        """
+        Build a recorder from environment variables.
+
+        Returns:
+            FrameRecorder: Configured recorder, or None if RECORDER_ENABLED is not 'true'
+        """
+        if os.getenv('RECORDER_ENABLED', 'false').lower() != 'true':
+            return None
+
+        cooldown = os.getenv('RECORDER_COOLDOWN')
+        return cls(
+            seconds=float(os.getenv('RECORDER_SECONDS', 10)),
+            fps=float(os.getenv('RECORDER_FPS', 5)),
+            max_frames=int(os.getenv('RECORDER_MAX_FRAMES', 50)),
+            output_dir=os.getenv('RECORDER_OUTPUT_DIR', 'recordings'),
+            file_format=os.getenv('RECORDER_FORMAT', 'mp4'),
+            jpeg_quality=int(os.getenv('RECORDER_JPEG_QUALITY', 85)),
+            cooldown=float(cooldown) if cooldown else None,
+        )
+
+    # ----- Detection loop side -----
+
+    def start(self):
+        """Start the background writer thread."""
+        if self._running:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, name='FrameRecorder-writer', daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Frame recorder started ({self.seconds:.0f}s window at {self.fps:g} fps, "
+            f"max {self.max_frames} frames, {self.file_format}, "
+            f"output {self.output_dir})"
+        )
+
+    def wants(self, timestamp=None):
+        """
+        Check whether a frame captured at timestamp would be buffered.
+
+        Lets the capture path skip decoding frames the recorder would drop.
+
+        Args:
+            timestamp (float): Capture time (time.time()); now if None
+
+        Returns:
+            bool: True if record() would keep the frame (fps not exceeded)
+        """
+        if self.fps <= 0 or self._next_record is None:
+            return True
+        return (time.time() if timestamp is None else timestamp) >= self._next_record
+
+    def record(self, frame, timestamp=None, pool=None):
+        """
+        Add a frame to the ring buffer and process pending API requests.
+
+        Frames arriving faster than fps are skipped (an owned buffer goes
+        straight back to its pool).
+
+        Args:
+            frame: Frame or numpy array (BGR)
+            timestamp (float): Capture time (time.time()); now if None
+            pool (FrameBufferPool): If given, the recorder takes ownership of
+                frame's array (a buffer borrowed from pool) and returns it to
+                the pool when done; otherwise the frame is copied into a
+                buffer from the shared pool
+        """
+        if frame is None:
+            return
+
+        timestamp = time.time() if timestamp is None else timestamp
+        data = toColorSpace(frame, BGR)
+        if not self.wants(timestamp):
+            self.frames_skipped += 1
+            if pool is not None:
+                pool.release(data)
+            self._poll_if_due()
+            return
+
+        if self.fps > 0:
+            interval = 1.0 / self.fps
+            # Keep a steady cadence; restart it after a gap in the input
+            if self._next_record is None or timestamp - self._next_record >= interval:
+                self._next_record = timestamp + interval
+            else:
+                self._next_record += interval
+
+        if pool is None:
+            import numpy as np
+
+            from camera.buffer_pool import getBufferPool
+
+            pool = getBufferPool()
+            buffer = pool.acquireLike(data)
+            np.copyto(buffer, data)
+            data = buffer
+        data.flags.writeable = False
+
+        expired = []
+        with self._lock:
+            self._ring.append(_BufferedFrame(timestamp, data, pool))
+            self.frames_recorded += 1
+
+            # Drop frames that fell out of the time window (or over the cap)
+            while self._ring and (
+                len(self._ring) > self.max_frames or timestamp - self._ring[0].timestamp > self.seconds
+            ):
+                expired.append(self._ring.popleft())
+        self._unref(expired)
+        self._poll_if_due()
+
+    def _poll_if_due(self):
+        if time.monotonic() >= self._next_poll:
+            self._next_poll = time.monotonic() + self.poll_interval
+            self._poll_requests()
+
+    def _unref(self, entries):
+        """Drop one reference to each entry; recycle buffers nobody holds."""
+        with self._lock:
+            freed = []
+            for entry in entries:
+                entry.refs -= 1
+                if entry.refs == 0:
+                    freed.append(entry)
+        for entry in freed:
+            entry.data.flags.writeable = True
+            entry.pool.release(entry.data)
+
+    def trigger(self, reason, metadata=None, coalesce=None):
+        """
+        Flush the buffered window to disk on the writer thread.
+
+        Never blocks: automatic triggers within the cooldown are coalesced
+        (TRIGGER_API requests are not) and clips are dropped if the writer is
+        still busy with earlier ones.
+
+        Args:
+            reason (str): Why the clip is being saved (stored in metadata)
+            metadata (dict): Extra JSON-serializable context (detections, payloads)
+            coalesce (bool): Apply the cooldown (default: unless reason is
+                TRIGGER_API)
+
+        Returns:
+            str: Directory the clip will be written to, or None if not saved
+        """
+        now = time.time()
+        automatic = reason != TRIGGER_API if coalesce is None else coalesce
+        if automatic and self._last_trigger is not None and now - self._last_trigger < self.cooldown:
+            self.triggers_coalesced += 1
+            logger.debug(f"Recorder trigger '{reason}' coalesced (cooldown {self.cooldown:.0f}s)")
+            return None
+
+        with self._lock:
+            frames = list(self._ring)
+            for entry in frames:
+                entry.refs += 1
+        if not frames:
+            logger.debug(f"Recorder trigger '{reason}' ignored (no frames buffered)")
+            return None
+
+        stamp = datetime.fromtimestamp(now).strftime('%Y%m%d-%H%M%S')
+        directory = os.path.join(self.output_dir, f"{stamp}_{_safe_name(reason)}")
+        job = {
+            'directory': directory,
+            'reason': reason,
+            'triggered_at': now,
+            'metadata': metadata or {},
+            'frames': frames,
+        }
+
+        try:
+            self._jobs.put_nowait(job)
+        except queue.Full:
+            self._unref(frames)
+            self.jobs_dropped += 1
+            logger.warning(f"Recorder writer busy, dropping '{reason}' recording")
+            return None
+
+        if automatic:
+            self._last_trigger = now
+        logger.info(f"Recording last {len(frames)} frames ({reason}) → {directory}")
+        return directory
+
+    def _poll_requests(self):
+        """
+        Turn request files written by requestRecording() into triggers.
+
+        A request is deleted only once its clip is queued; while nothing is
+        buffered yet or the writer queue is full it stays for the next poll.
+        """
+        try:
+            names = [
+                name for name in os.listdir(self.output_dir)
+                if name.startswith(_REQUEST_PREFIX) and name.endswith(_REQUEST_SUFFIX)
+            ]
+        except FileNotFoundError:
+            return
+
+        for name in sorted(names):
+            if self._jobs.full() or not self._ring:
+                return
+
+            path = os.path.join(self.output_dir, name)
+            try:
+                with open(path) as f:
+                    request = json.load(f)
+                if not isinstance(request, dict):
+                    raise ValueError("not a JSON object")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable recording request {name}: {e}")
+                request = None
+
+            # Requested recordings bypass the cooldown whatever reason they carry
+            if request is not None:
+                reason = request.get('reason') or TRIGGER_API
+                if self.trigger(reason, request.get('metadata'), coalesce=False) is None:
+                    continue
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stop(self, timeout=10.0):
+        """Finish queued recordings and stop the writer thread."""
+        if not self._running:
+            return
+        self._running = False
+        self._jobs.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            expired = list(self._ring)
+            self._ring.clear()
+        self._unref(expired)
+        logger.info(f"Frame recorder stopped ({self.getStats()})")
+
+    def getStats(self):
+        """
+        Get recorder counters.
+
+        Returns:
+            dict: Buffered/recorded/skipped frame counts and saved/coalesced/dropped clips
+        """
+        return {
+            'buffered_frames': len(self._ring),
+            'frames_recorded': self.frames_recorded,
+            'frames_skipped': self.frames_skipped,
+            'recordings_saved': self.recordings_saved,
+            'triggers_coalesced': self.triggers_coalesced,
+            'jobs_dropped': self.jobs_dropped,
+            'write_errors': self.write_errors,
+            'pending_jobs': self._jobs.qsize(),
+        }
+
+    # ----- Writer thread -----
+
+    def _writer_loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            try:
+                self._write_job(job)
+                self.recordings_saved += 1
+            except Exception as e:
+                self.write_errors += 1
+                logger.error(f"Failed to write recording {job['directory']}: {e}")
+            finally:
+                self._unref(job['frames'])
+
+    def _write_job(self, job):
+        directory = job['directory']
+        frames = job['frames']
+        os.makedirs(directory, exist_ok=True)
+
+        if self.file_format == 'mp4':
+            files = [self._write_video(directory, frames)]
+        else:
+            files = self._write_jpegs(directory, frames)
+
+        metadata = {
+            'reason': job['reason'],
+            'triggered_at': job['triggered_at'],
+            'frame_count': len(frames),
+            'frame_timestamps': [round(entry.timestamp, 3) for entry in frames],
+            'files': files,
+            'metadata': job['metadata'],
+        }
+        with open(os.path.join(directory, 'metadata.json'), 'w') as f:
+            json.dump(metadata, f, indent=2, default=str)
+
+        logger.info(f"Saved recording {directory} ({len(frames)} frames)")
+
+    def _write_jpegs(self, directory, frames):
+        import cv2
+
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        files = []
+        for index, entry in enumerate(frames, start=1):
+            name = f"frame_{index:04d}.jpg"
+            if not cv2.imwrite(os.path.join(directory, name), entry.data, params):
+                raise IOError(f"cv2.imwrite failed for {name}")
+            files.append(name)
+        return files
+
+    def _write_video(self, directory, frames):
+        import cv2
+        import numpy as np
+
+        # Play back at the rate frames were actually recorded
+        span = frames[-1].timestamp - frames[0].timestamp
+        fps = (len(frames) - 1) / span if len(frames) > 1 and span > 0 else 1.0
+        height, width = frames[0].data.shape[:2]
+
+        name = 'clip.mp4'
+        writer = cv2.VideoWriter(
+            os.path.join(directory, name), cv2.VideoWriter_fourcc(*'mp4v'), max(fps, 0.1), (width, height)
+        )
+        if not writer.isOpened():
+            raise IOError("cv2.VideoWriter could not open mp4 output")
+        try:
+            for entry in frames:
+                data = entry.data
+                if data.shape[:2] != (height, width):
+                    data = cv2.resize(data, (width, height))
+                writer.write(np.ascontiguousarray(data))
+        finally:
+            writer.release()
+        return name
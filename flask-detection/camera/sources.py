@@ -0,0 +1,436 @@
+"""
+Pluggable frame sources for the detection loop.
+
+Every source duck-types the parts of cv2.VideoCapture the pipeline uses
+(read, grab, retrieve, isOpened, release), so captureFrame() and FrameGrabber
+work unchanged whether frames come from a webcam, a recorded video, a
+directory of images or a network/GStreamer stream.
+
+Selected in main.py via CAMERA_SOURCE:
+- "0", "1", ...            live camera index (falls back to CAMERA_INDEX)
+- path/to/video.mp4        video file replay
+- path/to/frames/          image directory replay (sorted by filename)
+- rtsp://..., http://...   network stream
+- "... ! appsink"          GStreamer pipeline string
+
+Replay sources decode on a background prefetch thread. In real-time mode they
+are paced at the source frame rate and drop frames a slow consumer misses,
+like a live camera; in fast mode every frame is delivered in order as quickly
+as the consumer asks, which makes throughput runs deterministic.
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from shared.logger import logger  # noqa: E402
+
+from camera.buffer_pool import getBufferPool  # noqa: E402
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+_END_OF_STREAM = object()
+
+
+class FrameSource:
+    """
+    Base class for frame sources (VideoCapture-compatible interface).
+
+    Attributes:
+        live (bool): True for sources that produce frames on their own clock
+            (cameras, streams) rather than on demand (files, directories)
+        prefetched (bool): True if frames are already drained/decoded on a
+            background thread (no FrameGrabber needed)
+        frames_read (int): Frames handed out to the consumer
+    """
+
+    live = False
+    prefetched = False
+
+    def __init__(self, description):
+        self.description = description
+        self.frames_read = 0
+        self._pending = None
+        self._pending_retrieved = False
+
+    @property
+    def fps(self):
+        """Nominal frame rate of the source (0.0 if unknown)."""
+        return 0.0
+
+    def isOpened(self):
+        raise NotImplementedError
+
+    def isExhausted(self):
+        """Return True once a finite source has delivered its last frame."""
+        return False
+
+    def _next_frame(self, timeout):
+        """Return the next decoded BGR frame, or None if unavailable."""
+        raise NotImplementedError
+
+    def grab(self):
+        """Advance to the next frame (decoded later by retrieve())."""
+        frame = self._next_frame(timeout=1.0)
+        if frame is None:
+            return False
+        # Recycle the previous frame unless it was handed out by reference
+        if self._pending is not None and not self._pending_retrieved:
+            getBufferPool().release(self._pending)
+        self._pending = frame
+        self._pending_retrieved = False
+        return True
+
+    def retrieve(self, image=None):
+        """
+        Return the frame selected by the last grab().
+
+        Args:
+            image (numpy.ndarray): Optional output buffer; when its shape
+                matches, the frame is copied into it and the decode buffer
+                is recycled on the next grab()
+        """
+        if self._pending is None:
+            return False, None
+        self.frames_read += 1
+
+        if image is not None and image.shape == self._pending.shape and image.dtype == self._pending.dtype:
+            np.copyto(image, self._pending)
+            return True, image
+
+        if self._pending_retrieved:
+            return True, self._pending.copy()
+        self._pending_retrieved = True
+        return True, self._pending
+
+    def read(self, image=None):
+        """Grab and retrieve in one call, like cv2.VideoCapture.read()."""
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def release(self):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.description})"
+
+
+class LiveCameraSource(FrameSource):
+    """Live camera by device index (wraps initCamera())."""
+
+    live = True
+
+    def __init__(self, camera_index=0):
+        super().__init__(f"camera {camera_index}")
+        from camera.capture import initCamera
+
+        self.capture = initCamera(camera_index)
+
+    @property
+    def fps(self):
+        return self.capture.get(cv2.CAP_PROP_FPS) if self.capture is not None else 0.0
+
+    def isOpened(self):
+        return self.capture is not None and self.capture.isOpened()
+
+    def grab(self):
+        return self.capture.grab()
+
+    def retrieve(self, image=None):
+        ok, frame = self.capture.retrieve(image) if image is not None else self.capture.retrieve()
+        if ok:
+            self.frames_read += 1
+        return ok, frame
+
+    def read(self, image=None):
+        ok, frame = self.capture.read(image) if image is not None else self.capture.read()
+        if ok:
+            self.frames_read += 1
+        return ok, frame
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+
+
+class PrefetchSource(FrameSource):
+    """
+    Base for sources decoded on a background thread into a bounded queue.
+
+    Subclasses implement _open(), _decode_next() and _rewind().
+    """
+
+    prefetched = True
+
+    def __init__(self, description, realtime=True, loop=False, fps=None, prefetch=4):
+        """
+        Args:
+            description (str): Human-readable source description
+            realtime (bool): Pace at source fps and drop late frames (False = as fast as possible)
+            loop (bool): Restart from the beginning at end of stream
+            fps (float): Override the source frame rate used for pacing
+            prefetch (int): Max decoded frames buffered ahead of the consumer
+        """
+        super().__init__(description)
+        self.realtime = realtime
+        self.loop = loop
+        self._fps_override = fps
+        self.prefetch = max(1, int(prefetch))
+
+        self.frames_decoded = 0
+        self.frames_dropped = 0
+
+        self._queue = queue.Queue(maxsize=self.prefetch)
+        self._running = False
+        self._exhausted = False
+        self._thread = None
+
+    @property
+    def fps(self):
+        return self._fps_override or self._native_fps() or 30.0
+
+    def _native_fps(self):
+        return 0.0
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _decode_next(self):
+        """Return the next BGR frame, or None at end of stream."""
+        raise NotImplementedError
+
+    def _rewind(self):
+        """Seek back to the first frame; return False if unsupported."""
+        return False
+
+    def _close(self):
+        pass
+
+    def open(self):
+        """Open the underlying source and start the prefetch thread."""
+        if not self._open():
+            logger.error(f"Failed to open frame source: {self.description}")
+            return False
+
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._prefetch_loop,
+            name=f"{type(self).__name__}-prefetch",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(
+            f"Opened {self} ({'real-time' if self.realtime else 'fast'} playback, "
+            f"{self.fps:.1f} fps, prefetch {self.prefetch})"
+        )
+        return True
+
+    def isOpened(self):
+        return self._running or not self._queue.empty()
+
+    def isExhausted(self):
+        return self._exhausted and self._queue.empty()
+
+    def _put(self, item):
+        """Queue a decoded frame; in real-time mode drop the oldest when full."""
+        while self._running:
+            if self.realtime and item is not _END_OF_STREAM:
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        dropped = self._queue.get_nowait()
+                        self.frames_dropped += 1
+                        if dropped is not _END_OF_STREAM:
+                            getBufferPool().release(dropped)
+                    except queue.Empty:
+                        pass
+            else:
+                try:
+                    self._queue.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+    def _prefetch_loop(self):
+        # Live streams arrive on their own clock; only replays need pacing
+        interval = 1.0 / self.fps if self.realtime and not self.live else 0.0
+        next_due = time.monotonic()
+
+        while self._running:
+            frame = self._decode_next()
+
+            if frame is None:
+                if self.loop and self._rewind():
+                    continue
+                self._exhausted = True
+                self._put(_END_OF_STREAM)
+                break
+
+            self.frames_decoded += 1
+
+            if interval:
+                # Present frames on the source clock, like a live camera
+                delay = next_due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_due = max(next_due + interval, time.monotonic() - interval)
+
+            self._put(frame)
+
+        self._close()
+
+    def _next_frame(self, timeout):
+        if self.isExhausted():
+            return None
+        try:
+            item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if item is _END_OF_STREAM:
+            self._running = False
+            return None
+        return item
+
+    def release(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        logger.info(
+            f"Released {self} (decoded {self.frames_decoded}, read {self.frames_read}, "
+            f"dropped {self.frames_dropped})"
+        )
+
+
+class VideoCaptureSource(PrefetchSource):
+    """Video file, network stream or GStreamer pipeline via cv2.VideoCapture."""
+
+    def __init__(self, uri, **kwargs):
+        super().__init__(uri, **kwargs)
+        self.uri = uri
+        self.capture = None
+        self.live = not os.path.isfile(uri)
+        self._frame_shape = None
+
+    def _native_fps(self):
+        return self.capture.get(cv2.CAP_PROP_FPS) if self.capture is not None else 0.0
+
+    def _open(self):
+        backend = cv2.CAP_GSTREAMER if '!' in self.uri else cv2.CAP_ANY
+        self.capture = cv2.VideoCapture(self.uri, backend)
+        return self.capture.isOpened()
+
+    def _decode_next(self):
+        # Decode into pooled buffers recycled by consumers via Frame.release()
+        if self._frame_shape is not None:
+            buffer = getBufferPool().acquire(self._frame_shape)
+            ok, frame = self.capture.read(buffer)
+            if frame is not buffer:
+                getBufferPool().release(buffer)
+        else:
+            ok, frame = self.capture.read()
+        if not ok or frame is None:
+            return None
+        self._frame_shape = frame.shape
+        return frame
+
+    def _rewind(self):
+        if self.live:
+            return False
+        return self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def _close(self):
+        if self.capture is not None:
+            self.capture.release()
+
+
+class ImageDirectorySource(PrefetchSource):
+    """Directory of still images replayed in filename order."""
+
+    def __init__(self, directory, **kwargs):
+        super().__init__(directory, **kwargs)
+        self.directory = directory
+        self.paths = []
+        self._index = 0
+
+    def _open(self):
+        self.paths = sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.paths:
+            logger.error(f"No images found in {self.directory}")
+        return bool(self.paths)
+
+    def _decode_next(self):
+        while self._index < len(self.paths):
+            path = self.paths[self._index]
+            self._index += 1
+            frame = cv2.imread(path, cv2.IMREAD_COLOR)
+            if frame is not None:
+                return frame
+            logger.warning(f"Skipping unreadable image: {path}")
+        return None
+
+    def _rewind(self):
+        self._index = 0
+        return True
+
+
+def openFrameSource(spec, realtime=True, loop=False, fps=None, prefetch=4):
+    """
+    Open a frame source from a CAMERA_SOURCE specification.
+
+    Args:
+        spec (str | int): Camera index, video path, image directory, URL or GStreamer pipeline
+        realtime (bool): Real-time pacing for replay sources (False = as fast as possible)
+        loop (bool): Loop replay sources at end of stream
+        fps (float): Override frame rate for pacing (image directories default to 30)
+        prefetch (int): Prefetch queue depth for replay sources
+
+    Returns:
+        FrameSource: Opened source, or None if it could not be opened
+    """
+    spec = str(spec).strip()
+
+    if spec.lstrip('-').isdigit():
+        source = LiveCameraSource(int(spec))
+        return source if source.isOpened() else None
+
+    options = dict(realtime=realtime, loop=loop, fps=fps, prefetch=prefetch)
+
+    if os.path.isdir(spec):
+        source = ImageDirectorySource(spec, **options)
+    else:
+        source = VideoCaptureSource(spec, **options)
+
+    return source if source.open() else None
+
+
+def openFrameSourceFromEnv():
+    """
+    Open the frame source configured by environment variables.
+
+    Uses CAMERA_SOURCE (falls back to CAMERA_INDEX), CAMERA_SOURCE_REALTIME,
+    CAMERA_SOURCE_LOOP, CAMERA_SOURCE_FPS and CAMERA_SOURCE_PREFETCH.
+    """
+    spec = os.getenv('CAMERA_SOURCE') or os.getenv('CAMERA_INDEX', '0')
+    fps = os.getenv('CAMERA_SOURCE_FPS')
+
+    return openFrameSource(
+        spec,
+        realtime=os.getenv('CAMERA_SOURCE_REALTIME', 'true').lower() == 'true',
+        loop=os.getenv('CAMERA_SOURCE_LOOP', 'false').lower() == 'true',
+        fps=float(fps) if fps else None,
+        prefetch=int(os.getenv('CAMERA_SOURCE_PREFETCH', 4)),
+    )
@@ -0,0 +1,263 @@
+"""
+Temporal confidence aggregation across frames.
+
+processFrame() splits detections by the confidence of a single frame, so one
+blurry frame puts an item in the pending queue and the customer has to approve
+it. The aggregator keeps the last `window` confidences of every key (a track id,
+or a class id when tracking is off) in a fixed-size numpy ring buffer and only
+promotes a key once the evidence agrees:
+
+- vote: basket when `votes` of the last `window` confidences reach the
+  threshold; pending once the window is full without that.
+- ema: basket when the exponential moving average reaches the threshold after
+  `votes` observations; pending once the window is full and the average stays
+  below it.
+
+Until then the key is held back and nothing is sent to the backend.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from detection.detector import DEFAULT_DETECTION_FLOOR
+from models.detections import DetectionBatch
+from shared.logger import logger
+
+AGGREGATION_METHODS = ('vote', 'ema')
+
+# Decision codes returned by ConfidenceAggregator.decide()
+HOLD = 0
+BASKET = 1
+PENDING = 2
+
+
+class ConfidenceAggregator:
+    """
+    Sliding-window confidence evidence per track or class.
+
+    Usage:
+        aggregator = ConfidenceAggregator(method='vote', window=5, votes=3)
+        aggregator.observe([track_id], [0.55])
+        decision = aggregator.decide([track_id])[0]   # HOLD, BASKET or PENDING
+
+    Attributes:
+        promoted_basket: Decisions that sent a key to the basket
+        promoted_pending: Decisions that sent a key to pending
+        held: Decisions deferred for lack of evidence
+    """
+
+    def __init__(self, method='vote', window=5, votes=3, alpha=0.5,
+                 confidence_threshold=0.7, floor=DEFAULT_DETECTION_FLOOR, capacity=64):
+        """
+        Initialize aggregator.
+
+        Args:
+            method (str): 'vote' (k-of-n) or 'ema'
+            window (int): Confidences kept per key (n)
+            votes (int): High-confidence votes needed for basket (k); minimum
+                observations before an EMA decision
+            alpha (float): EMA weight of the newest confidence
+            confidence_threshold (float): Basket threshold
+            floor (float): Confidences below this never count as evidence
+            capacity (int): Initial number of key rows (grows as needed)
+        """
+        if method not in AGGREGATION_METHODS:
+            raise ValueError(f"Unknown aggregation method '{method}', expected one of {AGGREGATION_METHODS}")
+        window = int(window)
+        votes = int(votes)
+        if not 1 <= votes <= window:
+            raise ValueError(f"votes must be between 1 and window ({window}), got {votes}")
+
+        self.method = method
+        self.window = window
+        self.votes = votes
+        self.alpha = float(alpha)
+        self.confidence_threshold = float(confidence_threshold)
+        self.floor = float(floor)
+
+        # One ring buffer row per key; NaN marks empty slots
+        self.history = np.full((capacity, window), np.nan, dtype=np.float64)
+        self.heads = np.zeros(capacity, dtype=np.int64)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.ema = np.zeros(capacity, dtype=np.float64)
+        self._rows = {}
+        self._free = list(range(capacity - 1, -1, -1))
+
+        self.observations = 0
+        self.promoted_basket = 0
+        self.promoted_pending = 0
+        self.held = 0
+
+    @classmethod
+    def fromEnv(cls, confidence_threshold=0.7):
+        """
+        Build an aggregator from environment variables.
+
+        Args:
+            confidence_threshold (float): Basket threshold
+
+        Returns:
+            ConfidenceAggregator: Configured aggregator, or None if
+                CONFIDENCE_AGGREGATION is 'off'
+        """
+        method = os.getenv('CONFIDENCE_AGGREGATION', 'off').lower()
+        if method == 'off':
+            return None
+
+        return cls(
+            method=method,
+            window=int(os.getenv('CONFIDENCE_WINDOW', 5)),
+            votes=int(os.getenv('CONFIDENCE_VOTES', 3)),
+            alpha=float(os.getenv('CONFIDENCE_EMA_ALPHA', 0.5)),
+            confidence_threshold=confidence_threshold,
+        )
+
+    def _row(self, key):
+        row = self._rows.get(key)
+        if row is not None:
+            return row
+
+        if not self._free:
+            capacity = len(self.heads)
+            self.history = np.vstack([self.history, np.full_like(self.history, np.nan)])
+            self.heads = np.concatenate([self.heads, np.zeros(capacity, dtype=np.int64)])
+            self.counts = np.concatenate([self.counts, np.zeros(capacity, dtype=np.int64)])
+            self.ema = np.concatenate([self.ema, np.zeros(capacity)])
+            self._free = list(range(2 * capacity - 1, capacity - 1, -1))
+
+        row = self._free.pop()
+        self._rows[key] = row
+        return row
+
+    def observe(self, keys, confidences):
+        """
+        Record one frame of confidences.
+
+        Args:
+            keys: Track or class ids seen on this frame (unique)
+            confidences: Confidence per key
+        """
+        if len(keys) == 0:
+            return
+
+        rows = np.array([self._row(int(key)) for key in keys], dtype=np.int64)
+        confidences = np.asarray(confidences, dtype=np.float64)
+
+        self.history[rows, self.heads[rows]] = confidences
+        self.heads[rows] = (self.heads[rows] + 1) % self.window
+        self.ema[rows] = np.where(
+            self.counts[rows] == 0,
+            confidences,
+            self.alpha * confidences + (1 - self.alpha) * self.ema[rows],
+        )
+        self.counts[rows] += 1
+        self.observations += len(rows)
+
+    def decide(self, keys):
+        """
+        Promote keys whose evidence is conclusive.
+
+        Args:
+            keys: Track or class ids
+
+        Returns:
+            numpy.ndarray: HOLD, BASKET or PENDING per key
+        """
+        decisions = np.full(len(keys), HOLD, dtype=np.int64)
+        known = np.array([int(key) in self._rows for key in keys], dtype=bool)
+        if not known.any():
+            self.held += len(keys)
+            return decisions
+
+        rows = np.array([self._rows[int(key)] for key in np.asarray(keys)[known]], dtype=np.int64)
+        full = self.counts[rows] >= self.window
+
+        if self.method == 'vote':
+            window = self.history[rows]
+            high = np.sum(window >= self.confidence_threshold, axis=1) >= self.votes
+            evident = np.sum(window >= self.floor, axis=1) >= self.votes
+            pending = ~high & full & evident
+        else:
+            high = (self.counts[rows] >= self.votes) & (self.ema[rows] >= self.confidence_threshold)
+            pending = ~high & full & (self.ema[rows] >= self.floor)
+
+        decisions[known] = np.select([high, pending], [BASKET, PENDING], HOLD)
+
+        self.promoted_basket += int(np.sum(decisions == BASKET))
+        self.promoted_pending += int(np.sum(decisions == PENDING))
+        self.held += int(np.sum(decisions == HOLD))
+        return decisions
+
+    def forget(self, keys):
+        """
+        Drop the history of keys (e.g. deleted tracks).
+
+        Args:
+            keys: Track or class ids
+        """
+        for key in keys:
+            row = self._rows.pop(int(key), None)
+            if row is None:
+                continue
+            self.history[row] = np.nan
+            self.heads[row] = 0
+            self.counts[row] = 0
+            self.ema[row] = 0.0
+            self._free.append(row)
+
+    def routeByClass(self, high_conf, low_conf):
+        """
+        Re-split one frame of detections by per-class evidence (no tracker).
+
+        Each class present on the frame contributes its highest confidence;
+        all of its detections then go to basket or pending by the class
+        decision, or are held back.
+
+        Args:
+            high_conf: High confidence DetectionBatch (or detection dicts)
+            low_conf: Low confidence DetectionBatch (or detection dicts)
+
+        Returns:
+            tuple: (high_conf, low_conf) DetectionBatch after aggregation
+        """
+        detections = DetectionBatch.concat([high_conf, low_conf])
+        class_ids, _, max_conf, _ = detections.groupByClass()
+
+        self.observe(class_ids, max_conf)
+        decisions = self.decide(class_ids)
+
+        # Classes that left the frame start over next time
+        present = set(class_ids.tolist())
+        self.forget([key for key in self._rows if key not in present])
+
+        # Broadcast the per-class decision back to the rows
+        row_decisions = decisions[np.searchsorted(class_ids, detections.class_id)]
+        routed_high = detections[row_decisions == BASKET]
+        routed_low = detections[row_decisions == PENDING]
+        held = len(detections) - len(routed_high) - len(routed_low)
+        if held:
+            logger.debug(f"Aggregator holding {held} detections for more evidence")
+        return routed_high, routed_low
+
+    def getStats(self):
+        """
+        Get aggregation counters.
+
+        Returns:
+            dict: Method, tracked keys and promotion/hold counts
+        """
+        decided = self.promoted_basket + self.promoted_pending
+        return {
+            'method': self.method,
+            'window': self.window,
+            'keys': len(self._rows),
+            'observations': self.observations,
+            'promoted_basket': self.promoted_basket,
+            'promoted_pending': self.promoted_pending,
+            'held': self.held,
+            'pending_rate': round(self.promoted_pending / decided, 3) if decided else 0.0,
+        }
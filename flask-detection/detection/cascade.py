@@ -0,0 +1,176 @@
+"""
+Two-stage cascade inference.
+
+Most frames show an empty basket or large, obvious items that YOLO finds just
+as well at a small input size. The cascade runs a cheap low-resolution pass
+first and only re-runs the frame at full resolution when the cheap answer is
+not good enough for routing:
+
+- 'pending': a detection falls in the pending band (floor <= conf < threshold),
+  where the basket-vs-pending decision is most sensitive to resolution
+- 'empty': nothing was found on a frame the motion gate passed because of
+  motion, so something entered the basket and an empty first pass may be a
+  missed item
+
+Frames whose first pass has only high-confidence detections, or is empty
+without motion (no motion gate, the first frame, periodic max_skips refreshes,
+or rerun_on_empty off), are accepted from stage 1: an empty basket stays a
+single cheap pass.
+
+The low-resolution pass needs a model with dynamic input shapes (torch,
+onnxruntime or openvino exports); TorchScript artifacts are traced at one size.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from shared.logger import logger
+
+RERUN_PENDING = 'pending'
+RERUN_EMPTY = 'empty'
+
+
+class InferenceCascade:
+    """
+    Decide per frame whether a low-resolution result is final.
+
+    Usage:
+        cascade = InferenceCascade(first_imgsz=320)
+        high_conf, low_conf = processFrame(frame, model, threshold, cascade=cascade)
+        cascade.getStats()['stage1_hit_rate']
+
+    Safe to share between inference worker threads.
+    """
+
+    def __init__(self, first_imgsz=320, full_imgsz=None, rerun_on_empty=True):
+        """
+        Initialize cascade.
+
+        Args:
+            first_imgsz (int): Input size of the cheap first pass (multiple of 32)
+            full_imgsz (int): Input size of the second pass (None = the size
+                the model was loaded with, YOLO_IMGSZ)
+            rerun_on_empty (bool): Re-run frames with motion but no detections
+                at full size
+        """
+        if int(first_imgsz) <= 0 or int(first_imgsz) % 32:
+            raise ValueError(f"Cascade first-pass size must be a positive multiple of 32, got {first_imgsz}")
+
+        self.first_imgsz = int(first_imgsz)
+        self.full_imgsz = int(full_imgsz) if full_imgsz else None
+        self.rerun_on_empty = rerun_on_empty
+
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.stage1_accepted = 0
+        self.reruns = {RERUN_PENDING: 0, RERUN_EMPTY: 0}
+        self._stage1_ms_total = 0.0
+        self._stage2_ms_total = 0.0
+
+    @classmethod
+    def fromEnv(cls):
+        """
+        Build a cascade from environment variables.
+
+        Returns:
+            InferenceCascade: Configured cascade, or None if INFERENCE_CASCADE_ENABLED is not 'true'
+        """
+        if os.getenv('INFERENCE_CASCADE_ENABLED', 'false').lower() != 'true':
+            return None
+
+        full_imgsz = os.getenv('INFERENCE_CASCADE_FULL_IMGSZ')
+        return cls(
+            first_imgsz=int(os.getenv('INFERENCE_CASCADE_IMGSZ', 320)),
+            full_imgsz=int(full_imgsz) if full_imgsz else None,
+            rerun_on_empty=os.getenv('INFERENCE_CASCADE_RERUN_EMPTY', 'true').lower() == 'true',
+        )
+
+    def rerunReason(self, detections, threshold, detection_floor, motion=False):
+        """
+        Return why a first-pass result needs the full-resolution pass.
+
+        Args:
+            detections: Detections or detection dicts from the first pass
+            threshold (float): High confidence threshold
+            detection_floor (float): Minimum confidence kept
+            motion (bool): The motion gate saw motion in this frame
+
+        Returns:
+            str: RERUN_PENDING, RERUN_EMPTY, or None if the result is final
+        """
+        if hasattr(detections, 'confidence'):
+            confidence = detections.confidence
+        else:
+            confidence = np.array([float(d.get('confidence', 0.0)) for d in detections])
+
+        confidence = confidence[confidence >= detection_floor]
+        if confidence.size == 0:
+            return RERUN_EMPTY if self.rerun_on_empty and motion else None
+        if (confidence < threshold).any():
+            return RERUN_PENDING
+        return None
+
+    def run(self, infer, threshold, detection_floor, motion=False):
+        """
+        Run the cascade for one frame.
+
+        Args:
+            infer: Callable (imgsz) -> detections; imgsz None means full size
+            threshold (float): High confidence threshold
+            detection_floor (float): Minimum confidence kept
+            motion (bool): The motion gate saw motion in this frame (allows
+                the re-run of an empty first pass)
+
+        Returns:
+            Detections from the stage that was accepted
+        """
+        start_time = time.time()
+        detections = infer(self.first_imgsz)
+        stage1_ms = (time.time() - start_time) * 1000
+
+        reason = self.rerunReason(detections, threshold, detection_floor, motion)
+        stage2_ms = 0.0
+        if reason is not None:
+            start_time = time.time()
+            detections = infer(self.full_imgsz)
+            stage2_ms = (time.time() - start_time) * 1000
+            logger.debug(f"Cascade re-ran frame at full size ({reason})")
+
+        with self._lock:
+            self.frames += 1
+            self._stage1_ms_total += stage1_ms
+            if reason is None:
+                self.stage1_accepted += 1
+            else:
+                self.reruns[reason] += 1
+                self._stage2_ms_total += stage2_ms
+
+        return detections
+
+    def getStats(self):
+        """
+        Get per-stage counters.
+
+        Returns:
+            dict: Frame count, stage 1 hit rate (accepted without a second
+                pass), rerun counts by reason and mean time per stage
+        """
+        with self._lock:
+            reruns = sum(self.reruns.values())
+            return {
+                'frames': self.frames,
+                'stage1_accepted': self.stage1_accepted,
+                'stage1_hit_rate': round(self.stage1_accepted / self.frames, 3) if self.frames else 0.0,
+                'stage2_runs': reruns,
+                'stage2_rate': round(reruns / self.frames, 3) if self.frames else 0.0,
+                'reruns_pending': self.reruns[RERUN_PENDING],
+                'reruns_empty': self.reruns[RERUN_EMPTY],
+                'mean_stage1_ms': round(self._stage1_ms_total / self.frames, 1) if self.frames else 0.0,
+                'mean_stage2_ms': round(self._stage2_ms_total / reruns, 1) if reruns else 0.0,
+            }
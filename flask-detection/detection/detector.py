@@ -1,5 +1,4 @@
-from collections import Counter
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Tuple
 import sys
 import os
 
@@ -7,6 +6,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
 
 from shared.logger import logger
+from models.detections import DetectionBatch
 from models.yolo_detector import runInference, getProductFromClass
 
 DEFAULT_DETECTION_FLOOR = 0.3
@@ -17,80 +17,116 @@ def _round_confidence(value: float) -> float:
     return round(float(value), 4)
 
 
-def _group_by_class(detections: Iterable[Dict]) -> Dict[int, List[Dict]]:
-    """Group detections by class ID for aggregation."""
-    grouped: Dict[int, List[Dict]] = {}
-    for detection in detections:
-        class_id = detection.get('class_id')
-        if class_id is None:
-            logger.debug("Skipping detection without class_id: %s", detection)
-            continue
-        grouped.setdefault(class_id, []).append(detection)
-    return grouped
-
-
-def _format_basket_payload(product: Dict, detections: List[Dict], device_id: str) -> Dict:
+def _format_basket_payload(product: Dict, quantity: int, max_conf: float, device_id: str) -> Dict:
     """Build payload for basket routing."""
-    confidences = [float(d.get('confidence', 0.0)) for d in detections]
-    max_conf = max(confidences) if confidences else 0.0
     return {
         "productId": product["product_id"],
-        "quantity": len(detections),
+        "quantity": int(quantity),
         "confidence": _round_confidence(max_conf),
         "deviceId": device_id,
     }
 
 
-def _format_pending_payload(product: Dict, detections: List[Dict], device_id: str) -> Dict:
+def _format_pending_payload(product: Dict, quantity: int, avg_conf: float, device_id: str) -> Dict:
     """Build payload for pending routing."""
-    confidences = [float(d.get('confidence', 0.0)) for d in detections]
-    avg_conf = sum(confidences) / len(confidences) if confidences else 0.0
     return {
         "productId": product["product_id"],
         "name": product["product_name"],
-        "quantity": len(detections),
+        "quantity": int(quantity),
         "confidence": _round_confidence(avg_conf),
         "deviceId": device_id,
     }
 
 
-def processFrame(frame, model, threshold: float = 0.7, detection_floor: float = DEFAULT_DETECTION_FLOOR):
+def _clamp_thresholds(threshold: float, detection_floor: float) -> Tuple[float, float]:
+    """Clamp threshold/floor to [0, 1] and keep the floor at or below the threshold."""
+    detection_floor = max(0.0, min(1.0, detection_floor))
+    threshold = max(0.0, min(1.0, threshold))
+
+    if detection_floor > threshold:
+        logger.warning(
+            "Detection floor %.2f is above threshold %.2f; adjusting floor to threshold",
+            detection_floor,
+            threshold,
+        )
+        detection_floor = threshold
+
+    return threshold, detection_floor
+
+
+def processFrame(
+    frame,
+    model,
+    threshold: float = 0.7,
+    detection_floor: float = DEFAULT_DETECTION_FLOOR,
+    roi=None,
+    classes=None,
+    cascade=None,
+    motion=False,
+):
     """
     Process a camera frame through YOLO detection.
 
     Args:
-        frame: OpenCV image (numpy array)
+        frame: Frame or OpenCV image (numpy array, BGR)
         model: YOLO model instance
         threshold: Confidence threshold (default 0.7)
         detection_floor: Minimum confidence to keep detections (default 0.3)
+        roi: Optional RegionOfInterest; only the crop is inferred and boxes
+            are mapped back to full-frame coordinates
+        classes: Optional class IDs to run NMS on (e.g. getClassFilter());
+            other classes are dropped inside the model
+        cascade: Optional InferenceCascade; the frame is inferred at a small
+            size first and only re-run at full size when the result has
+            pending-band detections, or is empty although motion was seen
+        motion: True if the motion gate passed this frame because of motion
+            (MotionGate.motion_detected)
 
     Returns:
         tuple: (high_confidence_detections, low_confidence_detections)
     """
-    detection_floor = max(0.0, min(1.0, detection_floor))
-    threshold = max(0.0, min(1.0, threshold))
+    threshold, detection_floor = _clamp_thresholds(threshold, detection_floor)
 
-    if detection_floor > threshold:
-        logger.warning(
-            "Detection floor %.2f is above threshold %.2f; adjusting floor to threshold",
-            detection_floor,
-            threshold,
-        )
-        detection_floor = threshold
+    # Run YOLO inference with floor confidence to capture low-confidence detections
+    inference_kwargs = {'confidence_threshold': detection_floor}
+    if classes is not None:
+        inference_kwargs['classes'] = classes
+
+    source, offset = roi.crop(frame) if roi is not None else (frame, None)
+
+    if cascade is not None:
+        def infer(imgsz):
+            if imgsz is None:
+                return runInference(model, source, **inference_kwargs)
+            return runInference(model, source, imgsz=imgsz, **inference_kwargs)
 
-    # 1. Run YOLO inference with floor confidence to capture low-confidence detections
-    detections = runInference(model, frame, confidence_threshold=detection_floor)
+        detections = cascade.run(infer, threshold, detection_floor, motion)
+    else:
+        detections = runInference(model, source, **inference_kwargs)
 
-    # 2. Separate by confidence
-    high_conf = []
-    low_conf = []
+    if roi is not None:
+        detections = roi.mapDetections(detections, offset)
 
-    for detection in detections:
-        confidence = float(detection.get('confidence', 0.0))
-        if confidence >= threshold:
-            high_conf.append(detection)
-        elif confidence >= detection_floor:
-            low_conf.append(detection)
+    return splitByConfidence(detections, threshold, detection_floor)
+
+
+def splitByConfidence(detections, threshold: float = 0.7, detection_floor: float = DEFAULT_DETECTION_FLOOR):
+    """
+    Split raw detections into high and low confidence batches.
+
+    Args:
+        detections: DetectionBatch or detection dicts from runInference()
+        threshold: Confidence threshold (default 0.7)
+        detection_floor: Minimum confidence to keep detections (default 0.3)
+
+    Returns:
+        tuple: (high_confidence_detections, low_confidence_detections) as
+            DetectionBatch (iterate for dicts)
+    """
+    threshold, detection_floor = _clamp_thresholds(threshold, detection_floor)
+
+    # Threshold the confidence column in bulk
+    high_conf, low_conf = DetectionBatch.fromDicts(detections).split(threshold, detection_floor)
 
     logger.debug(
         "Frame processed with threshold=%.2f floor=%.2f → %d high, %d low",
@@ -108,7 +144,7 @@ def countItems(detections):
     Count quantity of each detected class.
 
     Args:
-        detections: List of detection dicts with 'class_id' key
+        detections: DetectionBatch or list of detection dicts with 'class_id' key
 
     Returns:
         dict: {class_id: count}
@@ -117,49 +153,58 @@ def countItems(detections):
         Input: [{'class_id': 47}, {'class_id': 47}, {'class_id': 46}]
         Output: {47: 2, 46: 1}  # 2 apples, 1 banana
     """
-    if not detections:
-        return {}
-
-    class_ids = [d['class_id'] for d in detections]
-    counts = Counter(class_ids)
-    return dict(counts)
+    class_ids, counts, _, _ = DetectionBatch.fromDicts(detections).groupByClass()
+    return dict(zip(class_ids.tolist(), counts.tolist()))
 
 
-def routeDetections(high_conf, low_conf, mapping, device_id):
+def routeDetections(high_conf, low_conf, mapping, device_id, tracker=None, aggregator=None):
     """
     Route detections to basket (high conf) or pending (low conf).
 
+    With a tracker only items whose track was confirmed on this frame are
+    routed, so an item that stays in the basket is sent once instead of on
+    every frame (the backend adds each basket quantity to the existing row).
+    Without one, an aggregator decides basket vs pending per class from the
+    last few frames instead of this frame alone.
+
     Args:
-        high_conf: List of high confidence detections
-        low_conf: List of low confidence detections
+        high_conf: High confidence DetectionBatch (or list of dicts)
+        low_conf: Low confidence DetectionBatch (or list of dicts)
         mapping: COCO-to-product mapping dict
         device_id: Device ID from backend registration
+        tracker: Optional ObjectTracker (aggregates per track itself)
+        aggregator: Optional ConfidenceAggregator, used when tracker is None
 
     Returns:
         tuple: (basket_payloads, pending_payloads)
     """
 
+    if tracker is not None:
+        high_conf, low_conf = tracker.update(high_conf, low_conf)
+    elif aggregator is not None:
+        high_conf, low_conf = aggregator.routeByClass(high_conf, low_conf)
+
     basket_payloads = []
     pending_payloads = []
 
-    high_grouped = _group_by_class(high_conf)
-    low_grouped = _group_by_class(low_conf)
-
-    for class_id, detections in high_grouped.items():
+    # One bincount per batch; Python work is per class, not per detection
+    class_ids, counts, max_conf, _ = DetectionBatch.fromDicts(high_conf).groupByClass()
+    for class_id, quantity, confidence in zip(class_ids.tolist(), counts.tolist(), max_conf.tolist()):
         product = getProductFromClass(class_id, mapping)
         if product is None:
             logger.warning("Unmapped class %s in high confidence detections", class_id)
             continue
 
-        basket_payloads.append(_format_basket_payload(product, detections, device_id))
+        basket_payloads.append(_format_basket_payload(product, quantity, confidence, device_id))
 
-    for class_id, detections in low_grouped.items():
+    class_ids, counts, _, mean_conf = DetectionBatch.fromDicts(low_conf).groupByClass()
+    for class_id, quantity, confidence in zip(class_ids.tolist(), counts.tolist(), mean_conf.tolist()):
         product = getProductFromClass(class_id, mapping)
         if product is None:
             logger.warning("Unmapped class %s in low confidence detections", class_id)
             continue
 
-        pending_payloads.append(_format_pending_payload(product, detections, device_id))
+        pending_payloads.append(_format_pending_payload(product, quantity, confidence, device_id))
 
     logger.info(
         "Routed detections → basket: %d, pending: %d (device %s)",
@@ -0,0 +1,310 @@
+"""
+Inference worker pool with a bounded job queue.
+
+Capture submits frames to the pool and gets back a future per frame; worker
+threads run inference (torch and onnxruntime release the GIL inside the
+forward pass) while the main loop keeps capturing, routing and sending
+results. Each worker owns its own model instance since Ultralytics predictors
+are not thread-safe.
+
+Overflow policies when the queue is full:
+- 'drop_oldest': cancel the oldest queued frame and enqueue the new one
+  (freshest results, like a live camera)
+- 'drop_newest': cancel the new frame (keeps the already queued work)
+- 'block': wait until a worker frees a slot (backpressure on capture)
+
+Dropped futures are cancelled, and their frames are released back to the
+buffer pool.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from shared.logger import logger
+
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+
+class InferenceFuture(Future):
+    """
+    Future for one frame's inference result.
+
+    Attributes:
+        frame: Frame submitted for inference (owned by the consumer once done)
+        frame_seq: Frame sequence number given at submit time
+        timestamp: Capture timestamp given at submit time
+        motion: Motion flag given at submit time (passed to infer)
+        submitted_at: time.monotonic() when the frame was queued
+        started_at: time.monotonic() when a worker picked it up (None if dropped)
+    """
+
+    def __init__(self, frame, frame_seq, timestamp, motion=False):
+        super().__init__()
+        self.frame = frame
+        self.frame_seq = frame_seq
+        self.timestamp = timestamp
+        self.motion = motion
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def dropped(self):
+        return self.cancelled()
+
+
+class InferencePool:
+    """
+    Thread pool running inference jobs from a bounded queue.
+
+    Usage:
+        pool = InferencePool(
+            lambda model, frame, motion: processFrame(frame, model, motion=motion), modelFactory, workers=2
+        )
+        pool.start()
+        pool.submit(frame, frame_seq, time.monotonic())
+        future = pool.popCompleted(timeout=0.5)
+        if future is not None:
+            high_conf, low_conf = future.result()
+        pool.stop()
+    """
+
+    def __init__(self, infer, model_factory, workers=2, max_queue=4, overflow='drop_oldest',
+                 release_dropped=True):
+        """
+        Initialize inference pool.
+
+        Args:
+            infer: Callable (model, frame, motion) -> result run on a worker
+                thread; motion is the flag given to submit()
+            model_factory: Callable (worker_index) -> model, called once per worker
+            workers (int): Number of worker threads
+            max_queue (int): Max frames waiting for a worker
+            overflow (str): 'drop_oldest', 'drop_newest' or 'block'
+            release_dropped (bool): Call frame.release() on dropped frames
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self.infer = infer
+        self.model_factory = model_factory
+        self.workers = max(1, int(workers))
+        self.max_queue = max(1, int(max_queue))
+        self.overflow = overflow
+        self.release_dropped = release_dropped
+
+        self._queue = deque()
+        self._in_order = deque()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._running = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._wait_ms_total = 0.0
+        self._infer_ms_total = 0.0
+
+    @classmethod
+    def fromEnv(cls, infer, model_factory):
+        """
+        Build a pool from environment variables.
+
+        Returns:
+            InferencePool: Configured pool, or None if INFERENCE_WORKERS is 0 (inline inference)
+        """
+        workers = int(os.getenv('INFERENCE_WORKERS', 0))
+        if workers <= 0:
+            return None
+
+        return cls(
+            infer,
+            model_factory,
+            workers=workers,
+            max_queue=int(os.getenv('INFERENCE_QUEUE_SIZE', 4)),
+            overflow=os.getenv('INFERENCE_OVERFLOW', 'drop_oldest'),
+        )
+
+    def start(self):
+        """Start worker threads (each loads its model via model_factory)."""
+        if self._running:
+            return
+        self._running = True
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker_loop, args=(index,), name=f"InferencePool-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(
+            f"Inference pool started ({self.workers} workers, queue {self.max_queue}, "
+            f"overflow {self.overflow})"
+        )
+
+    def _drop(self, future):
+        """Cancel a queued future and release its frame."""
+        future.cancel()
+        self.dropped += 1
+        if self.release_dropped and hasattr(future.frame, 'release'):
+            future.frame.release()
+        logger.debug(f"Inference queue full, dropped frame {future.frame_seq}")
+
+    def submit(self, frame, frame_seq, timestamp=None, timeout=None, motion=False):
+        """
+        Queue a frame for inference.
+
+        Args:
+            frame: Frame to run inference on
+            frame_seq (int): Frame sequence number (carried on the future)
+            timestamp (float): Capture timestamp (time.monotonic() if None)
+            timeout (float): Max seconds to wait with the 'block' policy
+                (None = wait indefinitely); the frame is dropped on timeout
+            motion (bool): The motion gate saw motion in this frame
+
+        Returns:
+            InferenceFuture: Cancelled immediately if the frame was dropped
+        """
+        future = InferenceFuture(frame, frame_seq, time.monotonic() if timestamp is None else timestamp, motion)
+
+        with self._cond:
+            self.submitted += 1
+
+            if len(self._queue) >= self.max_queue:
+                if self.overflow == 'drop_newest':
+                    self._drop(future)
+                    return future
+                if self.overflow == 'drop_oldest':
+                    self._drop(self._queue.popleft())
+                else:
+                    deadline = None if timeout is None else time.monotonic() + timeout
+                    while self._running and len(self._queue) >= self.max_queue:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            self._drop(future)
+                            return future
+                        self._cond.wait(remaining)
+
+            self._queue.append(future)
+            self._in_order.append(future)
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify_all()
+
+        return future
+
+    def popCompleted(self, timeout=0.0):
+        """
+        Return the oldest submitted frame's future once it is done.
+
+        Results come back in submission order so routing and dispatch see
+        frames in capture order; dropped frames are skipped.
+
+        Args:
+            timeout (float): Max seconds to wait for the oldest frame (0 = poll)
+
+        Returns:
+            InferenceFuture: Done future (result() or exception()), or None
+        """
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                while self._in_order and self._in_order[0].cancelled():
+                    self._in_order.popleft()
+
+                if self._in_order and self._in_order[0].done():
+                    return self._in_order.popleft()
+
+                remaining = deadline - time.monotonic()
+                if not self._in_order or remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def pending(self):
+        """Return the number of frames queued or being processed."""
+        with self._cond:
+            return sum(1 for future in self._in_order if not future.done())
+
+    def _worker_loop(self, index):
+        try:
+            model = self.model_factory(index)
+        except Exception as e:
+            logger.error(f"Inference worker {index} failed to load model: {e}")
+            return
+
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running and not self._queue:
+                    return
+                future = self._queue.popleft()
+                # Wake a blocked submit() now that a slot is free
+                self._cond.notify_all()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            future.started_at = time.monotonic()
+            try:
+                result = self.infer(model, future.frame, future.motion)
+            except Exception as e:
+                logger.error(f"Inference failed for frame {future.frame_seq}: {e}")
+                future.finished_at = time.monotonic()
+                with self._cond:
+                    self.failed += 1
+                    self._cond.notify_all()
+                future.set_exception(e)
+                continue
+
+            future.finished_at = time.monotonic()
+            with self._cond:
+                self.completed += 1
+                self._wait_ms_total += (future.started_at - future.submitted_at) * 1000
+                self._infer_ms_total += (future.finished_at - future.started_at) * 1000
+                future.set_result(result)
+                self._cond.notify_all()
+
+    def stop(self, timeout=5.0):
+        """Stop workers after the in-flight jobs; queued frames are dropped."""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            while self._queue:
+                self._drop(self._queue.popleft())
+            self._cond.notify_all()
+
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logger.info(f"Inference pool stopped ({self.getStats()})")
+
+    def getStats(self):
+        """
+        Get pool counters.
+
+        Returns:
+            dict: Submitted/completed/failed/dropped counts, queue depth and
+                mean queue wait and inference time
+        """
+        with self._cond:
+            finished = self.completed
+            return {
+                'workers': self.workers,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'queue_depth': len(self._queue),
+                'max_depth': self.max_depth,
+                'mean_wait_ms': round(self._wait_ms_total / finished, 1) if finished else 0.0,
+                'mean_infer_ms': round(self._infer_ms_total / finished, 1) if finished else 0.0,
+            }
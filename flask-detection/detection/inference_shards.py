@@ -0,0 +1,661 @@
+"""
+Multi-process inference sharding.
+
+InferenceShardPool runs inference in N worker processes instead of threads,
+so each shard gets its own interpreter and torch intra-op thread pool. Oversized
+thread pools in one process fight over the same cores; N smaller pools with a
+fixed torch.set_num_threads() (and optionally pinned to disjoint CPU sets)
+scale throughput with cores on CPU-only devices.
+
+Frames reach the workers through one SharedFrameRing per shard (the frame bus
+protocol), so only small request/result tuples are pickled. Each worker loads
+its model through loadModel() exactly like the main process (same
+YOLO_ENGINE/YOLO_PRECISION resolution), then serves requests until told to
+stop.
+
+The pool has the same interface as InferencePool (submit/popCompleted/
+pending/stop/getStats, overflow policies, in-order results), so the detection
+loop can use either.
+
+Dispatch policies:
+- 'least_loaded': send to the shard with the fewest frames in flight
+- 'round_robin': send to shards in turn (skipping shards that are full)
+
+Benchmark frames/s against worker count with:
+    python -m detection.inference_shards --workers 1,2,4 --frames 200
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from shared.logger import logger  # noqa: E402
+
+from camera.frame import BGR, Frame, toColorSpace  # noqa: E402
+from camera.frame_bus import SharedFrameRing  # noqa: E402
+from detection.inference_pool import InferencePool  # noqa: E402
+
+DISPATCH_POLICIES = ('least_loaded', 'round_robin')
+
+
+def planCpuAffinity(workers, cpus=None):
+    """
+    Split the available CPUs into disjoint contiguous sets, one per worker.
+
+    Args:
+        workers (int): Number of worker processes
+        cpus (list): CPU ids to split (this process's affinity if None)
+
+    Returns:
+        list: One sorted CPU id list per worker, or None entries when there
+            are fewer CPUs than workers (no pinning)
+    """
+    if cpus is None:
+        if not hasattr(os, 'sched_getaffinity'):
+            return [None] * workers
+        cpus = os.sched_getaffinity(0)
+
+    cpus = sorted(cpus)
+    if len(cpus) < workers:
+        return [None] * workers
+
+    return [sorted(int(cpu) for cpu in chunk) for chunk in np.array_split(cpus, workers)]
+
+
+def pinWorker(threads, cpus=None):
+    """
+    Fix this process's inference thread count and CPU affinity.
+
+    Must run before torch is imported for OMP_NUM_THREADS to take effect;
+    torch.set_num_threads() is applied as well when torch is available.
+
+    Args:
+        threads (int): Intra-op threads for torch/OpenMP
+        cpus (list): CPU ids to pin to (None = leave affinity alone)
+    """
+    threads = max(1, int(threads))
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            logger.warning(f"Could not pin inference worker to CPUs {cpus}: {e}")
+
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+
+
+def serveShardRequests(index, requests, results, infer):
+    """
+    Request loop shared by shard worker processes.
+
+    Each request is (ring_name, ring_seq, motion); the frame is read as a
+    zero-copy view of the shard's ring slot and infer(frame, motion) is run on
+    it. Results are
+    posted as (index, ring_seq, ok, payload, inference_ms) where payload is
+    the result, or the error message if infer raised. A None request stops
+    the loop.
+
+    Args:
+        index (int): Shard index reported with every result
+        requests: multiprocessing.Queue of requests
+        results: multiprocessing.Queue shared by all shards
+        infer: Callable (Frame, motion) -> picklable result
+    """
+    ring = None
+    try:
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+
+            ring_name, ring_seq, motion = request
+            if ring is None or ring.name != ring_name:
+                if ring is not None:
+                    ring.close()
+                ring = SharedFrameRing.attach(ring_name)
+
+            view, _ = ring.acquireSequence(ring_seq, timeout=1.0)
+            if view is None:
+                results.put((index, ring_seq, False, f"frame {ring_seq} no longer in ring", 0.0))
+                continue
+
+            start_time = time.time()
+            try:
+                payload = infer(Frame(view, BGR), motion)
+                ok = True
+            except Exception as e:
+                payload = f"{type(e).__name__}: {e}"
+                ok = False
+            finally:
+                view = None
+                ring.release()
+
+            results.put((index, ring_seq, ok, payload, (time.time() - start_time) * 1000))
+    finally:
+        if ring is not None:
+            ring.close()
+
+
+def runInferenceShard(index, requests, results, threads, cpus, confidence_threshold=0.7,
+                      model_path='yolo11s.pt', device=None):
+    """
+    Process target: one inference shard.
+
+    Pins threads/CPUs, loads the model through a ModelManager (hot-swapped on
+    reload requests like the main process) and returns
+    processFrame() results, i.e. (high_conf, low_conf), for every frame. The
+    DETECTION_ROI crop, the product class filter (unless YOLO_CLASS_FILTER
+    is 'false') and the inference cascade (INFERENCE_CASCADE_ENABLED) are
+    applied as in the main process.
+
+    Args:
+        index (int): Shard index
+        requests: multiprocessing.Queue of (ring_name, ring_seq, motion) requests
+        results: multiprocessing.Queue shared by all shards
+        threads (int): torch intra-op threads for this shard
+        cpus (list): CPU ids to pin to (None = no pinning)
+        confidence_threshold (float): High confidence threshold for processFrame()
+        model_path (str): Path to YOLO model file
+        device (str): Device to run on (None = auto-detect)
+    """
+    pinWorker(threads, cpus)
+
+    from detection.cascade import InferenceCascade
+    from detection.detector import processFrame
+    from detection.roi import RegionOfInterest
+    from models.yolo_detector import ModelManager, getClassFilter
+
+    model_manager = ModelManager.fromEnv(model_path, device)
+    model_manager.load()
+    roi = RegionOfInterest.fromEnv()
+    cascade = InferenceCascade.fromEnv()
+    class_filter_enabled = os.getenv('YOLO_CLASS_FILTER', 'true').lower() == 'true'
+
+    logger.info(f"Inference shard {index} ready ({threads} threads, CPUs {cpus or 'any'})")
+
+    def infer(frame, motion):
+        model_manager.poll()
+        classes = getClassFilter() if class_filter_enabled else None
+        with model_manager.use() as model:
+            return processFrame(
+                frame, model, confidence_threshold, roi=roi, classes=classes, cascade=cascade, motion=motion
+            )
+
+    serveShardRequests(index, requests, results, infer)
+    if cascade is not None:
+        logger.info(f"Inference shard {index} cascade stats: {cascade.getStats()}")
+    logger.info(f"Inference shard {index} stopped")
+
+
+class InferenceShardPool(InferencePool):
+    """
+    Inference pool backed by worker processes.
+
+    Usage:
+        pool = InferenceShardPool(workers=2, threads_per_worker=2, cpu_affinity=True)
+        pool.start()
+        pool.submit(frame, frame_seq, time.monotonic())
+        future = pool.popCompleted(timeout=0.5)
+        if future is not None:
+            high_conf, low_conf = future.result()
+        pool.stop()
+    """
+
+    def __init__(self, workers=2, threads_per_worker=None, cpu_affinity=False, dispatch='least_loaded',
+                 max_inflight=2, max_queue=4, overflow='drop_oldest', release_dropped=True,
+                 worker_target=None, worker_kwargs=None):
+        """
+        Initialize shard pool.
+
+        Args:
+            workers (int): Number of worker processes
+            threads_per_worker (int): torch threads per worker (default: CPUs // workers)
+            cpu_affinity (bool): Pin each worker to its own CPU set (Linux only)
+            dispatch (str): 'least_loaded' or 'round_robin'
+            max_inflight (int): Max frames sent to one worker and not yet returned
+            max_queue (int): Max frames waiting for a worker with capacity
+            overflow (str): 'drop_oldest', 'drop_newest' or 'block'
+            release_dropped (bool): Call frame.release() on dropped frames
+            worker_target: Process target (default runInferenceShard)
+            worker_kwargs (dict): Extra keyword arguments for the worker target
+        """
+        if dispatch not in DISPATCH_POLICIES:
+            raise ValueError(f"Unknown dispatch policy: {dispatch}")
+
+        super().__init__(None, None, workers=workers, max_queue=max_queue, overflow=overflow,
+                         release_dropped=release_dropped)
+
+        cpu_count = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+        self.threads_per_worker = max(1, int(threads_per_worker or (cpu_count or 1) // self.workers))
+        self.cpu_affinity = cpu_affinity
+        self.dispatch = dispatch
+        self.max_inflight = max(1, int(max_inflight))
+        self.worker_target = worker_target or runInferenceShard
+        self.worker_kwargs = worker_kwargs or {}
+
+        self._shards = []
+        self._results = None
+        self._collector = None
+        self._next_shard = 0
+
+    @classmethod
+    def fromEnv(cls, confidence_threshold=0.7, model_path='yolo11s.pt', device=None):
+        """
+        Build a shard pool from environment variables.
+
+        Returns:
+            InferenceShardPool: Configured pool, or None if INFERENCE_PROCESSES is 0
+        """
+        workers = int(os.getenv('INFERENCE_PROCESSES', 0))
+        if workers <= 0:
+            return None
+
+        threads = int(os.getenv('INFERENCE_THREADS_PER_PROCESS', 0))
+        return cls(
+            workers=workers,
+            threads_per_worker=threads or None,
+            cpu_affinity=os.getenv('INFERENCE_CPU_AFFINITY', 'false').lower() == 'true',
+            dispatch=os.getenv('INFERENCE_DISPATCH', 'least_loaded'),
+            max_queue=int(os.getenv('INFERENCE_QUEUE_SIZE', 4)),
+            overflow=os.getenv('INFERENCE_OVERFLOW', 'drop_oldest'),
+            worker_kwargs={
+                'confidence_threshold': confidence_threshold,
+                'model_path': model_path,
+                'device': device,
+            },
+        )
+
+    def start(self):
+        """Spawn worker processes (each loads its own model)."""
+        if self._running:
+            return
+
+        import multiprocessing
+
+        ctx = multiprocessing.get_context('spawn')
+        affinity = planCpuAffinity(self.workers) if self.cpu_affinity else [None] * self.workers
+
+        self._results = ctx.Queue()
+        self._running = True
+
+        for index in range(self.workers):
+            requests = ctx.Queue()
+            process = ctx.Process(
+                target=self.worker_target,
+                args=(index, requests, self._results, self.threads_per_worker, affinity[index]),
+                kwargs=self.worker_kwargs,
+                name=f"ShopShadow-inference-{index}",
+                daemon=True,
+            )
+            process.start()
+            self._shards.append({
+                'index': index,
+                'process': process,
+                'requests': requests,
+                'ring': None,
+                'inflight': {},
+                'dispatched': 0,
+                'cpus': affinity[index],
+            })
+
+        self._collector = threading.Thread(target=self._collect_loop, name='InferenceShardPool-results',
+                                           daemon=True)
+        self._collector.start()
+
+        logger.info(
+            f"Inference shard pool started ({self.workers} processes x {self.threads_per_worker} threads, "
+            f"{self.dispatch}, affinity {'on' if self.cpu_affinity else 'off'})"
+        )
+
+    def submit(self, frame, frame_seq, timestamp=None, timeout=None, motion=False):
+        """Queue a frame and hand it to a worker if one has capacity (see InferencePool.submit)."""
+        future = super().submit(frame, frame_seq, timestamp, timeout, motion)
+        with self._cond:
+            self._dispatch()
+        return future
+
+    def _pick_shard(self):
+        """Return the shard the next frame goes to, or None if all are full (lock held)."""
+        available = [
+            shard for shard in self._shards
+            if shard['process'].is_alive() and len(shard['inflight']) < self.max_inflight
+        ]
+        if not available:
+            return None
+
+        if self.dispatch == 'least_loaded':
+            # Ties go to the shard after the last one used, so idle shards share the work
+            return min(
+                available,
+                key=lambda shard: (len(shard['inflight']), (shard['index'] - self._next_shard) % self.workers),
+            )
+
+        for offset in range(self.workers):
+            shard = self._shards[(self._next_shard + offset) % self.workers]
+            if shard in available:
+                return shard
+        return None
+
+    def _prepare_ring(self, shard, shape):
+        """
+        Make the shard's frame ring hold frames of shape (lock held).
+
+        The ring is created on first use. A frame of another size (camera
+        reconnected at a new resolution) must not be resized into the slot,
+        since the boxes would come back in the wrong coordinates, so the ring
+        is recreated at the new shape once the shard's in-flight frames have
+        drained; the worker re-attaches by the new ring name.
+
+        Returns:
+            bool: True if the ring fits, False while in-flight frames drain
+        """
+        ring = shard['ring']
+        if ring is not None and ring.shape == tuple(shape):
+            return True
+        if ring is not None:
+            if shard['inflight']:
+                return False
+            logger.info(f"Frame shape changed to {tuple(shape)}, recreating ring of shard {shard['index']}")
+            ring.close()
+            ring.unlink()
+
+        # Slots beyond the in-flight limit so a queued frame is never overwritten
+        shard['ring'] = SharedFrameRing.create(slots=self.max_inflight + 2, shape=tuple(shape), max_readers=1)
+        return True
+
+    def _dispatch(self):
+        """Move queued frames to workers with capacity (lock held)."""
+        while self._running and self._queue:
+            shard = self._pick_shard()
+            if shard is None:
+                return
+            # A frame of a new size waits until the shard's ring can be recreated
+            if not self._prepare_ring(shard, self._queue[0].frame.shape):
+                return
+
+            future = self._queue.popleft()
+            self._cond.notify_all()
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            future.started_at = time.monotonic()
+            try:
+                data = toColorSpace(future.frame, BGR)
+                ring = shard['ring']
+                if data.shape != ring.shape:
+                    raise ValueError(f"frame shape {data.shape} does not match shard ring {ring.shape}")
+                ring_seq = ring.write(data)
+                if ring_seq < 0:
+                    raise RuntimeError(f"shard {shard['index']} ring has no free slot")
+            except Exception as e:
+                logger.error(f"Could not dispatch frame {future.frame_seq}: {e}")
+                future.finished_at = time.monotonic()
+                self.failed += 1
+                future.set_exception(e)
+                continue
+
+            shard['inflight'][ring_seq] = future
+            shard['dispatched'] += 1
+            shard['requests'].put((ring.name, ring_seq, future.motion))
+            self._next_shard = (shard['index'] + 1) % self.workers
+
+    def _fail_dead_shards(self):
+        """Fail in-flight frames of workers that exited (lock held)."""
+        for shard in self._shards:
+            if shard['inflight'] and not shard['process'].is_alive():
+                logger.error(f"Inference shard {shard['index']} exited with frames in flight")
+                for future in shard['inflight'].values():
+                    future.finished_at = time.monotonic()
+                    self.failed += 1
+                    future.set_exception(RuntimeError(f"inference shard {shard['index']} exited"))
+                shard['inflight'].clear()
+                self._cond.notify_all()
+
+    def _collect_loop(self):
+        while True:
+            try:
+                index, ring_seq, ok, payload, inference_ms = self._results.get(timeout=0.5)
+            except queue.Empty:
+                with self._cond:
+                    self._fail_dead_shards()
+                    if not self._running and not any(shard['inflight'] for shard in self._shards):
+                        return
+                    self._dispatch()
+                continue
+
+            with self._cond:
+                future = self._shards[index]['inflight'].pop(ring_seq, None)
+                if future is None:
+                    continue
+
+                future.finished_at = time.monotonic()
+                if ok:
+                    self.completed += 1
+                    self._wait_ms_total += (future.started_at - future.submitted_at) * 1000
+                    self._infer_ms_total += inference_ms
+                    future.set_result(payload)
+                else:
+                    logger.error(f"Inference failed for frame {future.frame_seq} in shard {index}: {payload}")
+                    self.failed += 1
+                    future.set_exception(RuntimeError(payload))
+
+                self._dispatch()
+                self._cond.notify_all()
+
+    def stop(self, timeout=5.0):
+        """Stop workers after the in-flight frames; queued frames are dropped."""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            while self._queue:
+                self._drop(self._queue.popleft())
+            self._cond.notify_all()
+
+        for shard in self._shards:
+            shard['requests'].put(None)
+        for shard in self._shards:
+            shard['process'].join(timeout)
+            if shard['process'].is_alive():
+                logger.warning(f"{shard['process'].name} did not stop, terminating")
+                shard['process'].terminate()
+                shard['process'].join(timeout)
+
+        if self._collector is not None:
+            self._collector.join(timeout)
+            self._collector = None
+
+        for shard in self._shards:
+            if shard['ring'] is not None:
+                shard['ring'].close()
+                shard['ring'].unlink()
+        logger.info(f"Inference shard pool stopped ({self.getStats()})")
+        self._shards = []
+
+    def getStats(self):
+        """
+        Get pool counters.
+
+        Returns:
+            dict: InferencePool counters plus per-shard dispatch counts
+        """
+        stats = super().getStats()
+        with self._cond:
+            stats['dispatch'] = self.dispatch
+            stats['threads_per_worker'] = self.threads_per_worker
+            stats['dispatched'] = [shard['dispatched'] for shard in self._shards]
+            stats['inflight'] = sum(len(shard['inflight']) for shard in self._shards)
+        return stats
+
+
+def loadBenchmarkFrames(source=None, count=100, shape=(480, 640, 3)):
+    """
+    Load frames for the throughput benchmark.
+
+    Args:
+        source (str): Image directory or video file (synthetic frames if None)
+        count (int): Max frames to load
+        shape (tuple): Synthetic frame shape
+
+    Returns:
+        list: BGR numpy frames
+    """
+    import cv2
+
+    if source is None:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(min(count, 16))]
+
+    if os.path.isdir(source):
+        from models.quantize import collectCalibrationFrames
+
+        frames = [cv2.imread(path) for path in collectCalibrationFrames(source, count)]
+        return [frame for frame in frames if frame is not None]
+
+    capture = cv2.VideoCapture(source)
+    frames = []
+    try:
+        while len(frames) < count:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(frame)
+    finally:
+        capture.release()
+    return frames
+
+
+def benchmarkShards(frames, worker_counts=(1, 2, 4), total_frames=200, threads_per_worker=None,
+                    cpu_affinity=True, dispatch='least_loaded', worker_target=None, worker_kwargs=None):
+    """
+    Measure inference throughput (frames/s) for each worker count.
+
+    Frames are cycled until total_frames have been inferred; the pool blocks
+    instead of dropping so every frame is counted. Model loading is excluded
+    by warming up every shard first.
+
+    Args:
+        frames (list): BGR numpy frames to cycle through
+        worker_counts (iterable): Worker process counts to measure
+        total_frames (int): Frames inferred per measurement
+        threads_per_worker (int): torch threads per worker (default: CPUs // workers)
+        cpu_affinity (bool): Pin workers to disjoint CPU sets
+        dispatch (str): Dispatch policy
+        worker_target: Process target (default runInferenceShard)
+        worker_kwargs (dict): Extra keyword arguments for the worker target
+
+    Returns:
+        list: One dict per worker count (workers, threads_per_worker, frames,
+            seconds, fps, mean_infer_ms, failed)
+    """
+    if not frames:
+        raise ValueError("No benchmark frames")
+
+    results = []
+    for workers in worker_counts:
+        pool = InferenceShardPool(
+            workers=workers,
+            threads_per_worker=threads_per_worker,
+            cpu_affinity=cpu_affinity,
+            dispatch=dispatch,
+            max_queue=workers * 2,
+            overflow='block',
+            worker_target=worker_target,
+            worker_kwargs=worker_kwargs,
+        )
+        pool.start()
+        try:
+            # Warm-up: one frame per in-flight slot, loads the model in every shard
+            for index in range(workers * pool.max_inflight):
+                pool.submit(frames[index % len(frames)], index)
+            while pool.pending():
+                pool.popCompleted(timeout=1.0)
+            while pool.popCompleted() is not None:
+                pass
+            warm = pool.getStats()
+
+            start_time = time.perf_counter()
+            done = 0
+            for index in range(total_frames):
+                pool.submit(frames[index % len(frames)], index)
+                while pool.popCompleted() is not None:
+                    done += 1
+            while done < total_frames:
+                if pool.popCompleted(timeout=1.0) is not None:
+                    done += 1
+                elif not pool.pending():
+                    break
+            seconds = time.perf_counter() - start_time
+
+            stats = pool.getStats()
+            inferred = stats['completed'] - warm['completed']
+            results.append({
+                'workers': workers,
+                'threads_per_worker': pool.threads_per_worker,
+                'frames': inferred,
+                'seconds': round(seconds, 3),
+                'fps': round(inferred / seconds, 2) if seconds > 0 else 0.0,
+                'mean_infer_ms': stats['mean_infer_ms'],
+                'failed': stats['failed'] - warm['failed'],
+            })
+            logger.info(f"Benchmark {workers} workers: {results[-1]['fps']} frames/s")
+        finally:
+            pool.stop()
+
+    return results
+
+
+def main(argv=None):
+    """Command line entry point for the shard throughput benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark multi-process inference throughput')
+    parser.add_argument('--workers', default='1,2,4', help='Comma-separated worker counts')
+    parser.add_argument('--frames', type=int, default=200, help='Frames inferred per worker count')
+    parser.add_argument('--source', help='Image directory or video file (synthetic frames if omitted)')
+    parser.add_argument('--model', default='yolo11s.pt', help='Model weights')
+    parser.add_argument('--threads', type=int, help='torch threads per worker (default: CPUs // workers)')
+    parser.add_argument('--dispatch', choices=DISPATCH_POLICIES, default='least_loaded')
+    parser.add_argument('--no-affinity', action='store_true', help='Do not pin workers to CPU sets')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    frames = loadBenchmarkFrames(args.source, args.frames)
+    results = benchmarkShards(
+        frames,
+        worker_counts=[int(count) for count in args.workers.split(',') if count.strip()],
+        total_frames=args.frames,
+        threads_per_worker=args.threads,
+        cpu_affinity=not args.no_affinity,
+        dispatch=args.dispatch,
+        worker_kwargs={'model_path': args.model},
+    )
+
+    print(f"{'workers':>7} {'threads':>7} {'frames':>6} {'fps':>8} {'infer ms':>9}")
+    for row in results:
+        print(
+            f"{row['workers']:>7} {row['threads_per_worker']:>7} {row['frames']:>6} "
+            f"{row['fps']:>8.2f} {row['mean_infer_ms']:>9.1f}"
+        )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
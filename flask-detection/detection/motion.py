@@ -0,0 +1,197 @@
+"""
+Motion-gated inference.
+
+A cart camera mostly looks at an unchanged basket. The motion gate compares a
+downsampled grayscale copy of each frame against a reference and only lets the
+frame through to YOLO when enough pixels changed; otherwise the last detection
+result is reused.
+
+Methods:
+- 'diff': compare against the frame that was last sent to inference
+- 'background': compare against an exponential running-average background
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from shared.logger import logger
+from camera.frame import BGR, RGB, Frame
+
+MOTION_METHODS = ('diff', 'background')
+
+
+class MotionGate:
+    """
+    Decide whether a frame needs inference based on scene change.
+
+    Usage:
+        if gate.check(frame):
+            result = processFrame(frame, model, threshold)
+            gate.storeResult(result)
+        else:
+            result = gate.last_result
+    """
+
+    def __init__(
+        self,
+        method='diff',
+        scale_width=160,
+        pixel_threshold=25,
+        area_threshold=0.01,
+        background_alpha=0.05,
+        max_skips=12,
+    ):
+        """
+        Initialize motion gate.
+
+        Args:
+            method (str): 'diff' or 'background'
+            scale_width (int): Width of the downsampled grayscale comparison frame
+            pixel_threshold (int): Per-pixel intensity delta counted as changed (0-255)
+            area_threshold (float): Fraction of changed pixels that counts as motion
+            background_alpha (float): Running-average update rate for 'background'
+            max_skips (int): Force inference after this many consecutive skips (0 = never)
+        """
+        if method not in MOTION_METHODS:
+            raise ValueError(f"Unknown motion gate method: {method}")
+
+        self.method = method
+        self.scale_width = max(8, int(scale_width))
+        self.pixel_threshold = pixel_threshold
+        self.area_threshold = area_threshold
+        self.background_alpha = background_alpha
+        self.max_skips = max_skips
+
+        self._reference = None
+        self._consecutive_skips = 0
+        self.last_result = None
+        self.last_motion_ratio = None
+        # True when the last check() passed the frame because of motion (not
+        # for the first frame or a max_skips refresh)
+        self.motion_detected = False
+
+        self.frames_checked = 0
+        self.inferences_run = 0
+        self.inferences_skipped = 0
+        self.forced_inferences = 0
+
+    @classmethod
+    def fromEnv(cls):
+        """
+        Build a motion gate from environment variables.
+
+        Returns:
+            MotionGate: Configured gate, or None if MOTION_GATE_ENABLED is not 'true'
+        """
+        if os.getenv('MOTION_GATE_ENABLED', 'false').lower() != 'true':
+            return None
+
+        return cls(
+            method=os.getenv('MOTION_GATE_METHOD', 'diff'),
+            scale_width=int(os.getenv('MOTION_GATE_SCALE_WIDTH', 160)),
+            pixel_threshold=int(os.getenv('MOTION_GATE_PIXEL_THRESHOLD', 25)),
+            area_threshold=float(os.getenv('MOTION_GATE_AREA_THRESHOLD', 0.01)),
+            background_alpha=float(os.getenv('MOTION_GATE_BACKGROUND_ALPHA', 0.05)),
+            max_skips=int(os.getenv('MOTION_GATE_MAX_SKIPS', 12)),
+        )
+
+    def _downsample(self, frame):
+        """Return a small float32 grayscale copy of the frame."""
+        if isinstance(frame, Frame):
+            data, color_space = frame.data, frame.color_space
+        else:
+            data, color_space = np.asarray(frame), BGR
+
+        height, width = data.shape[:2]
+        scaled_height = max(1, int(height * self.scale_width / width))
+        small = cv2.resize(data, (self.scale_width, scaled_height), interpolation=cv2.INTER_AREA)
+
+        if small.ndim == 3:
+            code = cv2.COLOR_RGB2GRAY if color_space == RGB else cv2.COLOR_BGR2GRAY
+            small = cv2.cvtColor(small, code)
+
+        return small.astype(np.float32)
+
+    def check(self, frame):
+        """
+        Check whether a frame should go through inference.
+
+        Args:
+            frame: Frame or numpy array (BGR)
+
+        Returns:
+            bool: True if inference should run, False to reuse last_result
+        """
+        self.frames_checked += 1
+        self.motion_detected = False
+        gray = self._downsample(frame)
+
+        if self._reference is None or self._reference.shape != gray.shape or self.last_result is None:
+            self._reference = gray
+            self._consecutive_skips = 0
+            self.inferences_run += 1
+            return True
+
+        changed = np.abs(gray - self._reference) > self.pixel_threshold
+        self.last_motion_ratio = float(np.count_nonzero(changed)) / changed.size
+        motion = self.last_motion_ratio >= self.area_threshold
+
+        if self.method == 'background':
+            # Absorb slow lighting drift into the background model
+            cv2.accumulateWeighted(gray, self._reference, self.background_alpha)
+
+        if motion:
+            if self.method == 'diff':
+                self._reference = gray
+            self._consecutive_skips = 0
+            self.inferences_run += 1
+            self.motion_detected = True
+            logger.debug(f"Motion detected ({self.last_motion_ratio:.3f} changed), running inference")
+            return True
+
+        if self.max_skips and self._consecutive_skips >= self.max_skips:
+            # Periodic refresh so a missed change cannot persist indefinitely
+            if self.method == 'diff':
+                self._reference = gray
+            self._consecutive_skips = 0
+            self.inferences_run += 1
+            self.forced_inferences += 1
+            logger.debug(f"No motion for {self.max_skips} checks, forcing inference")
+            return True
+
+        self._consecutive_skips += 1
+        self.inferences_skipped += 1
+        logger.debug(f"No motion ({self.last_motion_ratio:.3f} changed), skipping inference")
+        return False
+
+    def storeResult(self, result):
+        """Store the detection result to reuse while the scene is static."""
+        self.last_result = result
+
+    def reset(self):
+        """Drop the reference frame and cached result (next check runs inference)."""
+        self._reference = None
+        self._consecutive_skips = 0
+        self.last_result = None
+
+    def getStats(self):
+        """
+        Get gate counters.
+
+        Returns:
+            dict: Checked/run/skipped/forced counts and skip ratio
+        """
+        skip_ratio = self.inferences_skipped / self.frames_checked if self.frames_checked else 0.0
+        return {
+            'frames_checked': self.frames_checked,
+            'inferences_run': self.inferences_run,
+            'inferences_skipped': self.inferences_skipped,
+            'forced_inferences': self.forced_inferences,
+            'skip_ratio': round(skip_ratio, 3),
+            'last_motion_ratio': self.last_motion_ratio,
+        }
@@ -0,0 +1,334 @@
+"""
+Basket state reconciliation against the backend.
+
+Routing items one POST at a time is a blind increment: the detection service
+never learns what the backend basket holds, a lost response may be resent and
+added twice, and a restart sends everything again. BasketReconciler instead
+keeps two baskets per device, product id → quantity:
+
+- desired: what the camera currently sees in the basket (tracked items routed
+  to the basket, or the high confidence detections of the frame without a
+  tracker)
+- acknowledged: what the backend confirmed; POST /api/basket/items answers with
+  the new row quantity, which is taken as the acknowledged total
+
+sync() sends only the difference, so backend traffic follows basket changes
+instead of the frame rate, and an item that is briefly hidden (a hand over the
+basket, a lighting dip) is not added again when it reappears.
+
+The acknowledged basket belongs to one shopping session, which ends on signals
+from the backend, never because the camera sees nothing:
+
+- a different device id (new registration): its basket is empty
+- a restart: re-registering the saved device id issues a new pairing code and
+  marks the device disconnected, so the shopper pairs again and a new session
+  starts. The acknowledged basket (saved with the device id after every
+  change) is only restored if the backend still reports the device connected.
+- an add answered with action 'created' for a product the session already
+  holds: that row was emptied (checkout, or removed in the app), so the
+  product is counted from zero and the rest of it is sent on the next sync
+- optionally (reset_seconds, off by default), a basket seen empty for several
+  minutes, for checkouts the device never sends an add after
+
+Retry safety: a request whose outcome is unknown (sent but unanswered) is
+never resent blindly. Its quantity is counted as acknowledged and the product
+is marked unverified until the next response for that product reports the real
+row total.
+
+Limitation: devices cannot remove basket items (DELETE /api/basket/items/:id
+needs a user token), so quantities the camera no longer sees are reported as
+unsynced removals (getStats, logs) and are not sent. They are not re-added if
+the items reappear. Items added to the row by other paths (approved pending
+items) show up the same way once a response reports the larger total.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from api.backend_client import ADD_APPLIED, ADD_UNKNOWN
+from models.detections import DetectionBatch
+from models.yolo_detector import getProductFromClass
+from shared.logger import logger
+
+
+class BasketReconciler:
+    """
+    Diff-based basket sync for one device.
+
+    Usage:
+        reconciler = BasketReconciler(backend, state_file='basket_state.json')
+        device_id = backend.registerDevice(device_id=reconciler.saved_device_id)
+        reconciler.attach(device_id, resumed=backend.device_status == 'connected')
+        reconciler.setDesired(tracker.basketItems(), mapping)
+        reconciler.sync()
+
+    Attributes:
+        desired: Product id → quantity seen in the basket
+        acknowledged: Product id → quantity confirmed by the backend
+        unverified: Products with a send of unknown outcome
+    """
+
+    def __init__(self, backend, state_file=None, reset_seconds=0):
+        """
+        Initialize reconciler.
+
+        Args:
+            backend: BackendClient (uses addBasketItem())
+            state_file (str): JSON file persisting the acknowledged basket
+                across restarts (None = in memory only)
+            reset_seconds (float): Seconds the basket must be seen empty
+                before the session is treated as ended (0 = never)
+        """
+        self.backend = backend
+        self.state_file = state_file
+        self.reset_seconds = max(0.0, float(reset_seconds))
+        self.device_id = None
+        self.saved_device_id = None
+
+        self.desired = {}
+        self.acknowledged = {}
+        self.unverified = set()
+        self._confidence = {}
+        self._saved_acknowledged = {}
+        self._saved_unverified = set()
+        self._reported_removals = {}
+        self._empty_since = None
+
+        self.syncs = 0
+        self.resets = 0
+        self.adds_sent = 0
+        self.items_added = 0
+        self.failed_adds = 0
+        self.unknown_adds = 0
+
+        self._load()
+
+    @classmethod
+    def fromEnv(cls, backend):
+        """
+        Build a reconciler from environment variables.
+
+        Args:
+            backend: BackendClient
+
+        Returns:
+            BasketReconciler: Configured reconciler, or None if
+                BASKET_RECONCILER_ENABLED is not 'true'
+        """
+        if os.getenv('BASKET_RECONCILER_ENABLED', 'false').lower() != 'true':
+            return None
+
+        return cls(
+            backend,
+            state_file=os.getenv('BASKET_STATE_FILE', 'basket_state.json') or None,
+            reset_seconds=float(os.getenv('BASKET_RESET_SECONDS', '0')),
+        )
+
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+            self.saved_device_id = state.get('device_id')
+            self._saved_acknowledged = {
+                product_id: int(quantity) for product_id, quantity in state.get('acknowledged', {}).items()
+            }
+            self._saved_unverified = set(state.get('unverified', []))
+            logger.info(
+                f"Loaded basket state for device {self.saved_device_id}: "
+                f"{sum(self._saved_acknowledged.values())} items"
+            )
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable basket state {self.state_file}: {e}")
+
+    def _save(self):
+        if not self.state_file:
+            return
+        state = {
+            'device_id': self.device_id,
+            'acknowledged': self.acknowledged,
+            'unverified': sorted(self.unverified),
+            'updated': time.time(),
+        }
+        temp_path = f"{self.state_file}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.state_file)
+        except OSError as e:
+            logger.warning(f"Could not save basket state: {e}")
+
+    def attach(self, device_id, resumed=False):
+        """
+        Bind to the registered device.
+
+        The saved acknowledged basket is restored only if the backend
+        re-registered the saved device and its session is still connected;
+        otherwise a new session starts with an empty basket.
+
+        Args:
+            device_id (str): Device ID from registerDevice()
+            resumed (bool): The backend reports the device still connected
+                (BackendClient.device_status == 'connected')
+        """
+        if device_id == self.saved_device_id and resumed:
+            self.acknowledged = dict(self._saved_acknowledged)
+            self.unverified = set(self._saved_unverified)
+        else:
+            if device_id != self.saved_device_id and self.saved_device_id is not None:
+                logger.info(f"Device changed ({self.saved_device_id} → {device_id}), starting with an empty basket")
+            elif self._saved_acknowledged:
+                logger.info(f"Device {device_id} needs pairing again, starting a new basket session")
+            self.acknowledged = {}
+            self.unverified = set()
+        self._empty_since = None
+        self.device_id = device_id
+        self._save()
+
+    def reset(self, reason):
+        """
+        End the basket session: the backend basket was emptied.
+
+        Args:
+            reason (str): Why the session ended (logged)
+        """
+        logger.info(f"Basket session ended ({reason}), dropping {sum(self.acknowledged.values())} acknowledged items")
+        self.acknowledged = {}
+        self.unverified = set()
+        self._reported_removals = {}
+        self._empty_since = None
+        self.resets += 1
+        self._save()
+
+    def setDesired(self, items, mapping):
+        """
+        Set the desired basket from detected items.
+
+        Args:
+            items: DetectionBatch (or detection dicts), one row per item
+            mapping: COCO-to-product mapping
+
+        Returns:
+            dict: Desired product id → quantity
+        """
+        desired = {}
+        confidence = {}
+        class_ids, counts, max_conf, _ = DetectionBatch.fromDicts(items).groupByClass()
+        for class_id, quantity, best in zip(class_ids.tolist(), counts.tolist(), max_conf.tolist()):
+            product = getProductFromClass(class_id, mapping)
+            if product is None:
+                continue
+            product_id = product['product_id']
+            desired[product_id] = desired.get(product_id, 0) + quantity
+            confidence[product_id] = max(confidence.get(product_id, 0.0), best)
+
+        self.desired = desired
+        self._confidence.update(confidence)
+
+        if desired or not self.reset_seconds:
+            self._empty_since = None
+        elif self._empty_since is None:
+            self._empty_since = time.monotonic()
+        elif self.acknowledged and time.monotonic() - self._empty_since >= self.reset_seconds:
+            self.reset(f"basket empty for {self.reset_seconds:.0f}s")
+        return desired
+
+    def diff(self):
+        """
+        Compute the minimal changes that make the backend match the camera.
+
+        Returns:
+            dict: Product id → quantity to add (> 0) or remove (< 0)
+        """
+        changes = {}
+        for product_id in set(self.desired) | set(self.acknowledged):
+            delta = self.desired.get(product_id, 0) - self.acknowledged.get(product_id, 0)
+            if delta:
+                changes[product_id] = delta
+        return changes
+
+    def sync(self):
+        """
+        Send the pending additions to the backend.
+
+        Returns:
+            dict: Product id → quantity added by this call
+        """
+        if self.device_id is None:
+            logger.error("Basket reconciler not attached to a device")
+            return {}
+
+        self.syncs += 1
+        added = {}
+        changed = False
+        removals = {}
+
+        for product_id, delta in sorted(self.diff().items()):
+            if delta < 0:
+                removals[product_id] = -delta
+                continue
+
+            outcome, data = self.backend.addBasketItem(product_id, delta, self._confidence.get(product_id, 0.0))
+            self.adds_sent += 1
+
+            if outcome == ADD_APPLIED:
+                if (data or {}).get('action') == 'created' and self.acknowledged.get(product_id):
+                    # The row this session added is gone (checkout or removal)
+                    logger.info(f"Backend row for {product_id} was emptied, counting from zero")
+                    self.acknowledged[product_id] = 0
+                expected = self.acknowledged.get(product_id, 0) + delta
+                total = int((data or {}).get('quantity', expected))
+                if total != expected:
+                    logger.warning(
+                        f"Backend holds {total}x {product_id}, expected {expected}; "
+                        "taking the backend quantity"
+                    )
+                self.acknowledged[product_id] = total
+                self.unverified.discard(product_id)
+                self.items_added += delta
+                added[product_id] = delta
+                changed = True
+            elif outcome == ADD_UNKNOWN:
+                # May have been applied: count it rather than risk a duplicate
+                self.acknowledged[product_id] = self.acknowledged.get(product_id, 0) + delta
+                self.unverified.add(product_id)
+                self.unknown_adds += 1
+                changed = True
+                logger.warning(f"Unconfirmed add of {delta}x {product_id}; not resending")
+            else:
+                self.failed_adds += 1
+
+        if removals != self._reported_removals:
+            if removals:
+                logger.warning(f"Items left the basket but cannot be removed by the device: {removals}")
+            self._reported_removals = removals
+
+        if changed:
+            self._save()
+        return added
+
+    def getStats(self):
+        """
+        Get reconciler counters and basket sizes.
+
+        Returns:
+            dict: Desired/acknowledged item totals, unsynced removals,
+                unverified products, session resets and add counters
+        """
+        return {
+            'syncs': self.syncs,
+            'resets': self.resets,
+            'desired_items': sum(self.desired.values()),
+            'acknowledged_items': sum(self.acknowledged.values()),
+            'unsynced_removals': sum(self._reported_removals.values()),
+            'unverified': sorted(self.unverified),
+            'adds_sent': self.adds_sent,
+            'items_added': self.items_added,
+            'failed_adds': self.failed_adds,
+            'unknown_adds': self.unknown_adds,
+        }
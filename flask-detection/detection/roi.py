@@ -0,0 +1,208 @@
+"""
+Region-of-interest cropping for inference.
+
+The basket occupies only part of the camera frame. A RegionOfInterest crops
+each frame to the basket before it is letterboxed and sent to YOLO, then maps
+the resulting bounding boxes back to full-frame coordinates so visualization
+and any downstream geometry keep working on the original frame.
+
+ROI format (normalized 0.0-1.0 coordinates, configured via DETECTION_ROI):
+- Rectangle: "x1,y1,x2,y2"                      e.g. "0.15,0.2,0.85,1.0"
+- Polygon:   "x,y;x,y;x,y[;...]" (3+ points)    e.g. "0.1,1;0.25,0.2;0.75,0.2;0.9,1"
+
+Rectangles are cropped as a zero-copy view. Polygons are cropped to their
+bounding rectangle with pixels outside the polygon blacked out, and detections
+whose center lies outside the polygon are dropped. cv2 is only imported for
+polygon ROIs.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from shared.logger import logger
+from camera.frame import BGR, Frame
+from models.detections import Detections
+
+
+class RegionOfInterest:
+    """Normalized rectangle or polygon applied to frames before inference."""
+
+    def __init__(self, points):
+        """
+        Args:
+            points: Sequence of normalized (x, y) vertices. Two points are
+                treated as the opposite corners of a rectangle.
+        """
+        points = np.clip(np.asarray(points, dtype=np.float64), 0.0, 1.0)
+        if points.ndim != 2 or points.shape[1] != 2 or len(points) < 2:
+            raise ValueError(f"ROI needs at least two (x, y) points, got {points.tolist()}")
+
+        self.is_polygon = len(points) >= 3
+        if not self.is_polygon:
+            (x1, y1), (x2, y2) = points
+            points = np.array([[min(x1, x2), min(y1, y2)], [max(x1, x2), max(y1, y2)]])
+            if points[1, 0] <= points[0, 0] or points[1, 1] <= points[0, 1]:
+                raise ValueError(f"ROI rectangle has zero area: {points.tolist()}")
+        self.points = points
+
+        # Pixel geometry cached per frame size
+        self._cached_size = None
+        self._bounds = None
+        self._polygon_px = None
+        self._mask = None
+
+    @classmethod
+    def parse(cls, spec):
+        """
+        Parse an ROI string ("x1,y1,x2,y2" or "x,y;x,y;x,y;...").
+
+        Returns:
+            RegionOfInterest, or None for an empty spec
+        """
+        spec = (spec or '').strip()
+        if not spec:
+            return None
+
+        if ';' in spec:
+            points = [[float(v) for v in pair.split(',')] for pair in spec.split(';') if pair.strip()]
+        else:
+            values = [float(v) for v in spec.split(',')]
+            if len(values) != 4:
+                raise ValueError(f"ROI rectangle needs 4 values, got {spec!r}")
+            points = [values[:2], values[2:]]
+
+        return cls(points)
+
+    @classmethod
+    def fromEnv(cls):
+        """Build the ROI from DETECTION_ROI (None if unset or invalid)."""
+        spec = os.getenv('DETECTION_ROI', '')
+        try:
+            roi = cls.parse(spec)
+        except ValueError as e:
+            logger.error(f"Invalid DETECTION_ROI {spec!r}: {e}; using full frame")
+            return None
+        if roi is not None:
+            logger.info(f"Detection ROI: {roi}")
+        return roi
+
+    def __repr__(self):
+        kind = 'polygon' if self.is_polygon else 'rect'
+        return f"RegionOfInterest({kind}, {np.round(self.points, 3).tolist()})"
+
+    def _geometry(self, width, height):
+        """Pixel bounds (x1, y1, x2, y2), polygon and crop mask for a frame size."""
+        if self._cached_size != (width, height):
+            scaled = self.points * np.array([width, height])
+            x1, y1 = np.floor(scaled.min(axis=0)).astype(int)
+            x2, y2 = np.ceil(scaled.max(axis=0)).astype(int)
+            self._bounds = (max(0, x1), max(0, y1), min(width, x2), min(height, y2))
+
+            if self.is_polygon:
+                import cv2
+
+                bx1, by1, bx2, by2 = self._bounds
+                self._polygon_px = np.round(scaled).astype(np.int32)
+                mask = np.zeros((by2 - by1, bx2 - bx1), dtype=np.uint8)
+                cv2.fillPoly(mask, [self._polygon_px - np.array([bx1, by1], dtype=np.int32)], 255)
+                self._mask = mask
+
+            self._cached_size = (width, height)
+        return self._bounds
+
+    def crop(self, frame, apply_mask=True):
+        """
+        Crop a frame to the ROI.
+
+        Args:
+            frame: Frame or numpy array (BGR)
+            apply_mask (bool): Black out pixels outside a polygon ROI (copies
+                the crop); rectangles are always a zero-copy view
+
+        Returns:
+            tuple: (cropped Frame, (offset_x, offset_y))
+        """
+        if isinstance(frame, Frame):
+            data, color_space = frame.data, frame.color_space
+        else:
+            data, color_space = frame, BGR
+
+        height, width = data.shape[:2]
+        x1, y1, x2, y2 = self._geometry(width, height)
+        cropped = data[y1:y2, x1:x2]
+
+        if self.is_polygon and apply_mask:
+            import cv2
+
+            cropped = cv2.bitwise_and(cropped, cropped, mask=self._mask)
+
+        return Frame(cropped, color_space), (x1, y1)
+
+    def contains(self, x, y):
+        """Return True if a full-frame pixel coordinate lies inside the ROI."""
+        if self._cached_size is None:
+            return True
+        if not self.is_polygon:
+            x1, y1, x2, y2 = self._bounds
+            return x1 <= x < x2 and y1 <= y < y2
+
+        import cv2
+
+        return cv2.pointPolygonTest(self._polygon_px, (float(x), float(y)), False) >= 0
+
+    def mapDetections(self, detections, offset):
+        """
+        Shift crop-relative bounding boxes back to full-frame coordinates.
+
+        Detection dicts are updated in place (a Detections is translated in
+        bulk); for polygon ROIs, detections whose box center falls outside the
+        polygon are dropped.
+
+        Args:
+            detections: Detections or detection dicts from runInference() on the crop
+            offset (tuple): (offset_x, offset_y) returned by crop()
+
+        Returns:
+            Detections or list: Same type as the input, with full-frame boxes
+        """
+        offset_x, offset_y = offset
+
+        if isinstance(detections, Detections):
+            mapped = detections.translated(offset_x, offset_y)
+            if self.is_polygon and len(mapped):
+                inside = np.array([self.contains(x, y) for x, y in mapped.centers()])
+                mapped = mapped[inside]
+            return mapped
+
+        mapped = []
+
+        for detection in detections:
+            bbox = detection.get('bbox')
+            if bbox is not None and len(bbox) == 4:
+                x1, y1, x2, y2 = bbox
+                detection['bbox'] = [
+                    round(x1 + offset_x, 1),
+                    round(y1 + offset_y, 1),
+                    round(x2 + offset_x, 1),
+                    round(y2 + offset_y, 1),
+                ]
+                if self.is_polygon:
+                    center_x = (detection['bbox'][0] + detection['bbox'][2]) / 2
+                    center_y = (detection['bbox'][1] + detection['bbox'][3]) / 2
+                    if not self.contains(center_x, center_y):
+                        continue
+            mapped.append(detection)
+
+        return mapped
+
+    def outline(self, width, height):
+        """Return the ROI outline as an int32 pixel polygon for drawing."""
+        self._geometry(width, height)
+        if self.is_polygon:
+            return self._polygon_px
+        x1, y1, x2, y2 = self._bounds
+        return np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.int32)
@@ -0,0 +1,348 @@
+"""
+Multi-object tracking across detection frames.
+
+POST /api/basket/items adds the sent quantity to the basket row, so routing
+every visible item on every frame re-adds a static apple each iteration. The
+tracker gives each physical item a persistent track id and reports a track
+exactly once, when it is confirmed, so the backend only hears about items that
+were actually placed.
+
+Association (ByteTrack-style, vectorized with numpy):
+1. High-confidence detections are matched to existing tracks of the same class
+   by IoU, falling back to centroid distance for items that moved further than
+   their box size between frames (frames can be seconds apart).
+2. Tracks still unmatched are matched to low-confidence detections, so an item
+   whose confidence dips for a frame keeps its track instead of being re-added.
+3. Unmatched detections start tentative tracks. A tentative track is confirmed
+   after min_hits consecutive matches (a single noisy frame never reaches the
+   backend) and dropped as soon as it misses a frame. Confirmed tracks survive
+   max_age missed frames (occlusion by a hand) before they are deleted.
+
+A confirmed track is routed to the basket if any of its matches was a
+high-confidence detection, otherwise to pending. With a ConfidenceAggregator
+the decision waits instead until the track's confidences over several frames
+are conclusive, so one blurry frame does not send an item to pending.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from detection.aggregator import BASKET, PENDING
+from models.detections import DetectionBatch
+from shared.logger import logger
+
+_EMPTY_BOXES = np.empty((0, 4), dtype=np.float64)
+
+
+def boxIou(boxes_a, boxes_b):
+    """
+    Pairwise IoU of two sets of xyxy boxes.
+
+    Args:
+        boxes_a: Array (M, 4)
+        boxes_b: Array (N, 4)
+
+    Returns:
+        numpy.ndarray: IoU matrix (M, N)
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+def _greedy_match(affinity):
+    """Greedily pair rows and columns by descending affinity (> 0 only)."""
+    matches = []
+    if affinity.size == 0:
+        return matches
+
+    affinity = affinity.copy()
+    while True:
+        row, col = np.unravel_index(np.argmax(affinity), affinity.shape)
+        if affinity[row, col] <= 0:
+            return matches
+        matches.append((int(row), int(col)))
+        affinity[row, :] = 0
+        affinity[:, col] = 0
+
+
+class ObjectTracker:
+    """
+    Track detections across frames and report newly confirmed items.
+
+    Usage:
+        tracker = ObjectTracker()
+        new_basket, new_pending = tracker.update(high_conf, low_conf)
+
+    Attributes:
+        tracks_created: Tracks started (tentative or not)
+        tracks_confirmed: Tracks seen on min_hits consecutive frames
+        tracks_removed: Tracks deleted after max_age missed frames
+    """
+
+    def __init__(self, iou_threshold=0.3, centroid_threshold=0.5, min_hits=2, max_age=3, aggregator=None):
+        """
+        Initialize tracker.
+
+        Args:
+            iou_threshold (float): Minimum IoU for a box match
+            centroid_threshold (float): Max centroid distance, as a fraction of
+                the track's box diagonal, for the fallback match (0 disables)
+            min_hits (int): Consecutive matches before a track is confirmed
+            max_age (int): Missed frames before a confirmed track is deleted
+            aggregator: Optional ConfidenceAggregator deciding basket vs pending
+                per track
+        """
+        self.iou_threshold = float(iou_threshold)
+        self.centroid_threshold = float(centroid_threshold)
+        self.min_hits = max(1, int(min_hits))
+        self.max_age = max(0, int(max_age))
+        self.aggregator = aggregator
+
+        # Track state as parallel columns
+        self.boxes = _EMPTY_BOXES
+        self.class_ids = np.empty(0, dtype=np.int64)
+        self.track_ids = np.empty(0, dtype=np.int64)
+        self.hits = np.empty(0, dtype=np.int64)
+        self.misses = np.empty(0, dtype=np.int64)
+        self.confirmed = np.empty(0, dtype=bool)
+        self.seen_high = np.empty(0, dtype=bool)
+        self.routed = np.empty(0, dtype=bool)
+        self.in_basket = np.empty(0, dtype=bool)
+        self.best_confidence = np.empty(0, dtype=np.float64)
+
+        self._next_id = 1
+        self.updates = 0
+        self.tracks_created = 0
+        self.tracks_confirmed = 0
+        self.tracks_removed = 0
+
+    @classmethod
+    def fromEnv(cls, aggregator=None):
+        """
+        Build a tracker from environment variables.
+
+        Args:
+            aggregator: Optional ConfidenceAggregator
+
+        Returns:
+            ObjectTracker: Configured tracker, or None if TRACKER_ENABLED is 'false'
+        """
+        if os.getenv('TRACKER_ENABLED', 'true').lower() != 'true':
+            return None
+
+        return cls(
+            iou_threshold=float(os.getenv('TRACKER_IOU_THRESHOLD', 0.3)),
+            centroid_threshold=float(os.getenv('TRACKER_CENTROID_THRESHOLD', 0.5)),
+            min_hits=int(os.getenv('TRACKER_MIN_HITS', 2)),
+            max_age=int(os.getenv('TRACKER_MAX_AGE', 3)),
+            aggregator=aggregator,
+        )
+
+    def _affinity(self, track_rows, det_boxes, det_classes):
+        """Match score between tracks (rows) and detections; 0 means no match."""
+        track_boxes = self.boxes[track_rows]
+        iou = boxIou(track_boxes, det_boxes)
+        same_class = self.class_ids[track_rows][:, None] == det_classes[None, :]
+
+        affinity = np.where(iou >= self.iou_threshold, iou, 0.0)
+
+        if self.centroid_threshold > 0:
+            track_centers = (track_boxes[:, :2] + track_boxes[:, 2:]) / 2
+            det_centers = (det_boxes[:, :2] + det_boxes[:, 2:]) / 2
+            distance = np.linalg.norm(track_centers[:, None, :] - det_centers[None, :, :], axis=2)
+            diagonal = np.linalg.norm(track_boxes[:, 2:] - track_boxes[:, :2], axis=1)[:, None]
+            relative = np.divide(distance, diagonal, out=np.full_like(distance, np.inf), where=diagonal > 0)
+
+            # Always ranks below a real IoU match
+            fallback = (1 - relative / self.centroid_threshold) * self.iou_threshold / 2
+            use_fallback = (affinity == 0) & (relative <= self.centroid_threshold)
+            affinity = np.where(use_fallback, np.maximum(fallback, 1e-6), affinity)
+
+        return np.where(same_class, affinity, 0.0)
+
+    def _associate(self, track_rows, det_index, det_boxes, det_classes):
+        """Match a subset of tracks to a subset of detections; returns (track_row, det) pairs."""
+        if len(track_rows) == 0 or len(det_index) == 0:
+            return []
+        affinity = self._affinity(track_rows, det_boxes[det_index], det_classes[det_index])
+        return [(track_rows[row], det_index[col]) for row, col in _greedy_match(affinity)]
+
+    def update(self, high_conf, low_conf=()):
+        """
+        Advance the tracker by one frame.
+
+        Args:
+            high_conf: High confidence DetectionBatch (or detection dicts)
+            low_conf: Low confidence DetectionBatch (or detection dicts)
+
+        Returns:
+            tuple: (new_basket, new_pending) DetectionBatch of the tracks routed
+                on this frame, carrying their track ids
+        """
+        high_conf = DetectionBatch.fromDicts(high_conf)
+        detections = DetectionBatch.concat([high_conf, low_conf])
+        is_high = np.arange(len(detections)) < len(high_conf)
+        det_boxes = detections.xyxy
+        det_classes = detections.class_id
+        self.updates += 1
+
+        all_rows = np.arange(len(self.track_ids))
+
+        # Stage 1: high confidence detections against every track
+        matches = self._associate(all_rows, np.flatnonzero(is_high), det_boxes, det_classes)
+        matched_rows = {row for row, _ in matches}
+
+        # Stage 2: remaining tracks against low confidence detections
+        remaining = np.array([row for row in all_rows if row not in matched_rows], dtype=np.int64)
+        matches += self._associate(remaining, np.flatnonzero(~is_high), det_boxes, det_classes)
+
+        matched = np.zeros(len(self.track_ids), dtype=bool)
+        track_detection = np.full(len(self.track_ids), -1, dtype=np.int64)
+        for row, det in matches:
+            matched[row] = True
+            track_detection[row] = det
+            self.boxes[row] = det_boxes[det]
+            self.seen_high[row] |= is_high[det]
+            self.best_confidence[row] = max(self.best_confidence[row], detections.confidence[det])
+
+        self.hits = np.where(matched, self.hits + 1, self.hits)
+        self.misses = np.where(matched, 0, self.misses + 1)
+
+        # Tentative tracks die on their first miss; confirmed ones after max_age
+        keep = matched | (self.confirmed & (self.misses <= self.max_age))
+        self.tracks_removed += int((self.confirmed & ~keep).sum())
+        if self.aggregator is not None:
+            self.aggregator.forget(self.track_ids[~keep])
+        self._keep(keep)
+        track_detection = track_detection[keep]
+
+        # Unmatched detections start tentative tracks
+        new_index = np.setdiff1d(np.arange(len(detections)), track_detection)
+        if len(new_index):
+            self._add(
+                det_boxes[new_index], det_classes[new_index], is_high[new_index], detections.confidence[new_index]
+            )
+            track_detection = np.concatenate([track_detection, new_index])
+
+        seen = self.misses == 0
+        newly_confirmed = ~self.confirmed & seen & (self.hits >= self.min_hits)
+        self.confirmed |= newly_confirmed
+        self.tracks_confirmed += int(newly_confirmed.sum())
+
+        # Route each confirmed track once, when its category is known
+        to_route = self.confirmed & ~self.routed & seen
+        if self.aggregator is None:
+            to_basket = to_route & self.seen_high
+            to_pending = to_route & ~self.seen_high
+        else:
+            seen_rows = np.flatnonzero(seen)
+            self.aggregator.observe(
+                self.track_ids[seen_rows],
+                detections.confidence[track_detection[seen_rows]],
+            )
+            decisions = np.zeros(len(self.track_ids), dtype=np.int64)
+            decisions[to_route] = self.aggregator.decide(self.track_ids[to_route])
+            to_basket = decisions == BASKET
+            to_pending = decisions == PENDING
+        self.routed |= to_basket | to_pending
+        self.in_basket |= to_basket
+
+        new_basket = detections[track_detection[to_basket]].withTrackIds(self.track_ids[to_basket])
+        new_pending = detections[track_detection[to_pending]].withTrackIds(self.track_ids[to_pending])
+
+        if new_basket or new_pending:
+            logger.debug(f"Tracker confirmed {len(new_basket)} basket, {len(new_pending)} pending tracks")
+
+        return new_basket, new_pending
+
+    def _keep(self, mask):
+        self.boxes = self.boxes[mask]
+        self.class_ids = self.class_ids[mask]
+        self.track_ids = self.track_ids[mask]
+        self.hits = self.hits[mask]
+        self.misses = self.misses[mask]
+        self.confirmed = self.confirmed[mask]
+        self.seen_high = self.seen_high[mask]
+        self.routed = self.routed[mask]
+        self.in_basket = self.in_basket[mask]
+        self.best_confidence = self.best_confidence[mask]
+
+    def _add(self, boxes, class_ids, seen_high, confidence):
+        count = len(class_ids)
+        self.boxes = np.vstack([self.boxes, boxes])
+        self.class_ids = np.concatenate([self.class_ids, class_ids])
+        self.track_ids = np.concatenate([self.track_ids, np.arange(self._next_id, self._next_id + count)])
+        self.hits = np.concatenate([self.hits, np.ones(count, dtype=np.int64)])
+        self.misses = np.concatenate([self.misses, np.zeros(count, dtype=np.int64)])
+        self.confirmed = np.concatenate([self.confirmed, np.zeros(count, dtype=bool)])
+        self.seen_high = np.concatenate([self.seen_high, seen_high])
+        self.routed = np.concatenate([self.routed, np.zeros(count, dtype=bool)])
+        self.in_basket = np.concatenate([self.in_basket, np.zeros(count, dtype=bool)])
+        self.best_confidence = np.concatenate([self.best_confidence, confidence])
+        self._next_id += count
+        self.tracks_created += count
+
+    def activeTracks(self):
+        """
+        Get confirmed tracks currently in view (or recently occluded).
+
+        Returns:
+            list: Dicts with track_id, class_id, bbox and misses
+        """
+        return [
+            {
+                'track_id': int(track_id),
+                'class_id': int(class_id),
+                'bbox': box.tolist(),
+                'misses': int(misses),
+            }
+            for track_id, class_id, box, misses in zip(
+                self.track_ids[self.confirmed], self.class_ids[self.confirmed],
+                self.boxes[self.confirmed], self.misses[self.confirmed],
+            )
+        ]
+
+    def basketItems(self):
+        """
+        Get the tracks routed to the basket that are still alive.
+
+        This is the desired basket for BasketReconciler: an item leaves it once
+        its track expires and counts once again if it is tracked anew.
+
+        Returns:
+            DetectionBatch: One row per item (best confidence seen, track ids)
+        """
+        mask = self.in_basket
+        return DetectionBatch(
+            self.boxes[mask], self.best_confidence[mask], self.class_ids[mask], track_id=self.track_ids[mask]
+        )
+
+    def getStats(self):
+        """
+        Get tracker counters.
+
+        Returns:
+            dict: Active/tentative track counts and created/confirmed/removed totals
+        """
+        return {
+            'updates': self.updates,
+            'active_tracks': int(self.confirmed.sum()),
+            'tentative_tracks': int((~self.confirmed).sum()),
+            'tracks_created': self.tracks_created,
+            'tracks_confirmed': self.tracks_confirmed,
+            'tracks_removed': self.tracks_removed,
+        }
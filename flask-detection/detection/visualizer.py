@@ -7,13 +7,20 @@ import cv2
 import numpy as np
 from typing import List, Dict
 
+from camera.buffer_pool import getBufferPool
+from camera.frame import BGR, RGB, toColorSpace
+
 
 def drawDetections(frame, detections, mapping=None, show_confidence=True):
     """
     Draw bounding boxes and labels on frame for detected objects.
 
+    BGR-tagged Frames (as returned by captureFrame) are annotated in place, so
+    no per-frame conversion copy is made; RGB Frames and untagged numpy arrays
+    (legacy RGB input) are converted to a new BGR array first.
+
     Args:
-        frame: OpenCV image (numpy array, RGB format)
+        frame: Frame, or OpenCV image (numpy array, RGB format)
         detections: List of detection dicts with 'bbox', 'class_name', 'confidence'
         mapping: Optional COCO-to-product mapping to show product names
         show_confidence: Whether to show confidence scores (default True)
@@ -24,8 +31,8 @@ def drawDetections(frame, detections, mapping=None, show_confidence=True):
     if frame is None:
         return None
 
-    # Convert RGB to BGR for OpenCV display
-    display_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+    # OpenCV draws and displays BGR; convert only if the input is not BGR
+    display_frame = toColorSpace(frame, BGR, assume=RGB)
 
     # Define colors for different confidence levels
     HIGH_CONF_COLOR = (0, 255, 0)   # Green for high confidence (>0.7)
@@ -135,16 +142,19 @@ def addInfoOverlay(frame, info_text, position='top-left'):
     Add informational text overlay to frame.
 
     Args:
-        frame: OpenCV image (BGR format)
+        frame: Frame, or OpenCV image (numpy array, BGR format)
         info_text: List of strings to display
         position: Position on frame ('top-left', 'top-right', 'bottom-left', 'bottom-right')
 
     Returns:
-        numpy.ndarray: Frame with info overlay
+        numpy.ndarray: Frame with info overlay (BGR format)
     """
     if frame is None or not info_text:
         return frame
 
+    # Draw on the BGR pixel data (no copy when the frame is already BGR)
+    frame = toColorSpace(frame, BGR)
+
     height, width = frame.shape[:2]
     font = cv2.FONT_HERSHEY_SIMPLEX
     font_scale = 0.5
@@ -161,8 +171,10 @@ def addInfoOverlay(frame, info_text, position='top-left'):
     else:  # bottom-right
         x, y = width - 200, height - (len(info_text) * line_height) - 10
 
-    # Draw semi-transparent background
-    overlay = frame.copy()
+    # Draw semi-transparent background on a pooled scratch copy
+    pool = getBufferPool()
+    overlay = pool.acquireLike(frame)
+    np.copyto(overlay, frame)
     bg_height = len(info_text) * line_height + 10
     bg_width = 190
 
@@ -176,6 +188,7 @@ def addInfoOverlay(frame, info_text, position='top-left'):
 
     # Blend overlay
     cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
+    pool.release(overlay)
 
     # Draw text lines
     for i, text in enumerate(info_text):
@@ -193,6 +206,28 @@ def addInfoOverlay(frame, info_text, position='top-left'):
     return frame
 
 
+def drawRegionOfInterest(frame, roi, color=(255, 200, 0)):
+    """
+    Outline the detection region of interest on a frame.
+
+    Args:
+        frame: Frame, or OpenCV image (numpy array, BGR format)
+        roi: RegionOfInterest (no-op if None)
+        color: BGR outline color
+
+    Returns:
+        numpy.ndarray: Frame with ROI outline (BGR format)
+    """
+    if frame is None or roi is None:
+        return frame
+
+    frame = toColorSpace(frame, BGR)
+    height, width = frame.shape[:2]
+    cv2.polylines(frame, [roi.outline(width, height)], True, color, 1, cv2.LINE_AA)
+
+    return frame
+
+
 def createVisualizationWindow(window_name='ShopShadow Detection'):
     """
     Create and configure visualization window.
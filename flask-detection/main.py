@@ -3,47 +3,217 @@ Main detection loop orchestration.
 Entry point for ShopShadow Flask Detection Service.
 """
 
+import multiprocessing
+import queue
 import signal
 import sys
 import time
 import os
+import numpy as np
 from dotenv import load_dotenv
 
 # Add parent directory to path for shared modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from camera.capture import initCamera, captureFrame, releaseCamera
-from detection.detector import processFrame, routeDetections
+from camera.buffer_pool import getBufferPool
+from camera.capture import CameraSupervisor, releaseCamera, runFrameBusProducer
+from camera.frame import BGR, Frame
+from camera.frame_bus import SharedFrameRing
+from camera.recorder import TRIGGER_LOW_CONFIDENCE, TRIGGER_ROUTING_FAILURE, FrameRecorder
+from detection.aggregator import ConfidenceAggregator
+from detection.cascade import InferenceCascade
+from detection.detector import DEFAULT_DETECTION_FLOOR, processFrame, routeDetections, splitByConfidence
+from detection.inference_pool import InferencePool
+from detection.inference_shards import InferenceShardPool
+from detection.motion import MotionGate
+from detection.reconciler import BasketReconciler
+from detection.roi import RegionOfInterest
+from detection.tracker import ObjectTracker
 from detection.visualizer import (
     drawDetections,
+    drawRegionOfInterest,
     showFrame,
     addInfoOverlay,
     createVisualizationWindow,
     destroyVisualizationWindow
 )
 from api.backend_client import BackendClient
-from models.yolo_detector import loadModel, loadMapping
+from models.yolo_detector import (
+    ModelManager,
+    getClassFilter,
+    getLoadStats,
+    loadMapping,
+    requestModelSwap,
+    runInferenceWorker,
+)
 from shared.logger import logger
 
 
-# Global camera reference for shutdown handler
+# Global camera supervisor reference for shutdown handler
 camera = None
+frame_bus = None
+inference_pool = None
+model_manager = None
+recorder = None
 show_visualization = False
 WINDOW_NAME = 'ShopShadow Detection'
 
+# Frame bus reader ids (one pinned slot each)
+FRAME_BUS_INFERENCE_READER = 0
+FRAME_BUS_DISPLAY_READER = 1
+
+
+def startFrameBus(detection_floor):
+    """
+    Start capture and inference processes around a shared-memory frame ring.
+
+    Capture (camera decode), inference (torch) and this process (routing,
+    HTTP, display) each get their own interpreter and GIL. Frames stay in the
+    ring; only small detection lists cross process boundaries.
+
+    Args:
+        detection_floor (float): Confidence floor passed to the inference worker
+
+    Returns:
+        dict: Frame bus state (ring, queues, processes)
+    """
+    ctx = multiprocessing.get_context('spawn')
+
+    ring = SharedFrameRing.create(
+        slots=int(os.getenv('FRAME_BUS_SLOTS', 4)),
+        shape=(int(os.getenv('FRAME_BUS_HEIGHT', 480)), int(os.getenv('FRAME_BUS_WIDTH', 640)), 3),
+        max_readers=2,
+    )
+
+    bus = {
+        'ring': ring,
+        'stop_event': ctx.Event(),
+        'requests': ctx.Queue(),
+        'results': ctx.Queue(),
+        'timeout': float(os.getenv('FRAME_BUS_TIMEOUT', 60)),
+        'last_seq': 0,
+        'pending': False,
+    }
+
+    producer = ctx.Process(
+        target=runFrameBusProducer,
+        args=(ring.name, bus['stop_event']),
+        name='ShopShadow-capture',
+        daemon=True,
+    )
+    worker = ctx.Process(
+        target=runInferenceWorker,
+        args=(ring.name, bus['requests'], bus['results'], detection_floor),
+        kwargs={'reader_id': FRAME_BUS_INFERENCE_READER, 'stop_event': bus['stop_event']},
+        name='ShopShadow-inference',
+        daemon=True,
+    )
+    producer.start()
+    worker.start()
+    bus['producer'] = producer
+    bus['worker'] = worker
+
+    logger.info(f"Frame bus started ({ring.name}, {ring.slots} slots of {ring.shape})")
+    return bus
+
+
+def nextFrameBusResult(bus, prefetch=False):
+    """
+    Request inference on the next fresh frame and wait for the result.
+
+    Args:
+        bus (dict): State from startFrameBus()
+        prefetch (bool): Immediately queue the following request so inference
+            overlaps routing (throughput mode, DETECTION_INTERVAL=0)
+
+    Returns:
+        tuple: (frame_seq, timestamp_ns, detections, inference_ms), or None on timeout.
+        detections is None when the worker's motion gate skipped the frame.
+    """
+    if not bus['pending']:
+        bus['requests'].put(bus['last_seq'])
+        bus['pending'] = True
+
+    try:
+        result = bus['results'].get(timeout=bus['timeout'])
+    except queue.Empty:
+        return None
+
+    bus['pending'] = False
+    bus['last_seq'] = result[0]
+
+    if prefetch:
+        bus['requests'].put(bus['last_seq'])
+        bus['pending'] = True
+
+    return result
+
+
+def readFrameBusFrame(bus, frame_seq):
+    """Copy the newest frame at or after frame_seq out of the ring for display."""
+    ring = bus['ring']
+    view, _, _ = ring.acquire(FRAME_BUS_DISPLAY_READER, after_seq=frame_seq - 1, timeout=0.1)
+    if view is None:
+        return None
+    try:
+        # Pooled copy: the display path draws in place, the ring slot is read-only
+        pool = getBufferPool()
+        display = pool.acquireLike(view)
+        np.copyto(display, view)
+        return Frame(display, BGR, pool=pool)
+    finally:
+        view = None
+        ring.release(FRAME_BUS_DISPLAY_READER)
+
+
+def stopFrameBus(bus):
+    """Stop frame bus processes and free the shared memory ring."""
+    bus['stop_event'].set()
+    bus['requests'].put(None)
+
+    for process in (bus['worker'], bus['producer']):
+        process.join(timeout=5)
+        if process.is_alive():
+            logger.warning(f"{process.name} did not stop, terminating")
+            process.terminate()
+
+    bus['ring'].close()
+    bus['ring'].unlink()
+    logger.info("Frame bus stopped")
+
+
+def reload_handler(signum, frame):
+    """SIGHUP: hot-swap the model in this process and every inference worker."""
+    logger.info("Reload signal received, requesting model reload")
+    requestModelSwap(os.getenv('MODEL_RELOAD_FILE', 'model_reload.json'), reason='signal')
+
 
 def shutdown_handler(signum, frame):
     """Handle graceful shutdown on SIGINT/SIGTERM."""
-    global show_visualization
+    global frame_bus, inference_pool, recorder, show_visualization
 
     logger.info("=" * 60)
     logger.info("Shutdown signal received, cleaning up...")
     logger.info("=" * 60)
 
     if camera is not None:
-        releaseCamera(camera)
+        camera.stop()
+        releaseCamera()
         logger.info("Camera released")
 
+    if frame_bus is not None:
+        stopFrameBus(frame_bus)
+        frame_bus = None
+
+    if inference_pool is not None:
+        inference_pool.stop()
+        inference_pool = None
+
+    # Finish recordings already handed to the writer thread
+    if recorder is not None:
+        recorder.stop()
+        recorder = None
+
     # Close visualization window if open
     if show_visualization:
         destroyVisualizationWindow(WINDOW_NAME)
@@ -59,7 +229,10 @@ def shutdown_handler(signum, frame):
 
 def main():
     """Main detection loop."""
-    global camera, show_visualization
+    global camera, frame_bus, inference_pool, model_manager, recorder, show_visualization
+
+    # Start of the time-to-first-detection metric
+    startup_time = time.time()
 
     # Load environment variables
     load_dotenv()
@@ -72,22 +245,47 @@ def main():
         # ===== 1. COMPONENT INITIALIZATION =====
         logger.info("Initializing components...")
 
-        # Camera
-        camera_index = int(os.getenv('CAMERA_INDEX', 0))
-        logger.info(f"Initializing camera (index {camera_index})...")
-        camera = initCamera(camera_index)
-        if camera is None:
-            logger.error("Failed to initialize camera")
-            sys.exit(1)
-        logger.info("✅ Camera initialized")
-
-        # YOLO model
-        logger.info("Loading YOLO model...")
-        model = loadModel()
-        if model is None:
-            logger.error("Failed to load YOLO model")
-            sys.exit(1)
-        logger.info("✅ YOLO model loaded")
+        frame_bus_enabled = os.getenv('FRAME_BUS_ENABLED', 'false').lower() == 'true'
+        model = None
+
+        # Dispute recorder, fed by the capture path at RECORDER_FPS
+        recorder = FrameRecorder.fromEnv()
+        if recorder is not None:
+            recorder.start()
+
+        if frame_bus_enabled:
+            # Capture and inference run in their own processes
+            logger.info("Starting multi-process frame bus...")
+            frame_bus = startFrameBus(DEFAULT_DETECTION_FLOOR)
+            logger.info("✅ Capture and inference processes started")
+        else:
+            # Camera (or replay source selected by CAMERA_SOURCE), opened and
+            # supervised on a background thread so probing overlaps model loading
+            camera_source = os.getenv('CAMERA_SOURCE') or os.getenv('CAMERA_INDEX', '0')
+            logger.info(f"Initializing frame source ({camera_source})...")
+            camera = CameraSupervisor.fromEnv(recorder=recorder).start()
+
+            # Inference worker processes (INFERENCE_PROCESSES) load their own
+            # models, so this process only loads one for inline or thread-pool
+            # inference
+            inference_pool = InferenceShardPool.fromEnv(float(os.getenv('CONFIDENCE_THRESHOLD', 0.7)))
+            if inference_pool is not None:
+                inference_pool.start()
+            else:
+                # YOLO model
+                # Swapped in the background on file change, SIGHUP or POST /model/reload
+                logger.info("Loading YOLO model...")
+                model_manager = ModelManager.fromEnv()
+                model = model_manager.load()
+                if model is None:
+                    logger.error("Failed to load YOLO model")
+                    sys.exit(1)
+                logger.info("✅ YOLO model loaded")
+
+            if camera.waitUntilAvailable(timeout=float(os.getenv('CAMERA_STARTUP_TIMEOUT', 10))):
+                logger.info(f"✅ Frame source initialized: {camera.source}")
+            else:
+                logger.warning("Camera not available yet, detection will start once it connects")
 
         # COCO mapping
         logger.info("Loading COCO-to-product mapping...")
@@ -110,17 +308,60 @@ def main():
         logger.info("✅ Backend client initialized")
 
         # ===== 2. DEVICE REGISTRATION =====
+        # Basket reconciler re-registers its saved device; its saved basket is
+        # only resumed if the device is still paired (a refresh usually unpairs it)
+        reconciler = BasketReconciler.fromEnv(backend)
+        saved_device_id = reconciler.saved_device_id if reconciler is not None else None
+
         logger.info("Registering device with backend...")
-        device_id = backend.registerDevice()
+        device_id = None
+        if saved_device_id:
+            try:
+                device_id = backend.registerDevice(device_id=saved_device_id)
+            except RuntimeError as e:
+                logger.warning(f"Could not re-register device {saved_device_id}, registering a new one: {e}")
+        if device_id is None:
+            device_id = backend.registerDevice()
         if device_id is None:
             logger.error("Failed to register device")
             sys.exit(1)
         logger.info(f"✅ Device registered: {device_id}")
+        if reconciler is not None:
+            reconciler.attach(device_id, resumed=backend.device_status == 'connected')
 
         # ===== 3. DETECTION CONFIGURATION =====
         confidence_threshold = float(os.getenv('CONFIDENCE_THRESHOLD', 0.7))
         detection_interval = int(os.getenv('DETECTION_INTERVAL', 5))
         show_visualization = os.getenv('SHOW_VISUALIZATION', 'false').lower() == 'true'
+        # In frame bus mode the inference worker applies its own motion gate
+        motion_gate = MotionGate.fromEnv() if frame_bus is None else None
+        roi = RegionOfInterest.fromEnv()
+        # Low-resolution first pass, full resolution only when routing needs it
+        cascade = InferenceCascade.fromEnv() if frame_bus is None else None
+        # Decide basket vs pending on several frames of evidence, not one
+        aggregator = ConfidenceAggregator.fromEnv(confidence_threshold)
+        # Route each physical item once instead of on every frame
+        tracker = ObjectTracker.fromEnv(aggregator=aggregator)
+        # Only decode classes that map to products (follows mapping file edits)
+        class_filter_enabled = os.getenv('YOLO_CLASS_FILTER', 'true').lower() == 'true'
+
+        # Optional worker threads so capture and dispatch overlap inference;
+        # the first worker thread uses the loaded model, the others load their
+        # own (worker processes were started with the camera)
+        class_filter = None
+
+        def inferInPool(slot, worker_frame, motion):
+            with model_manager.use(slot) as worker_model:
+                return processFrame(
+                    worker_frame, worker_model, confidence_threshold, roi=roi, classes=class_filter,
+                    cascade=cascade, motion=motion,
+                )
+
+        if frame_bus is None and inference_pool is None:
+            # Workers borrow their model slot from the manager for each frame
+            inference_pool = InferencePool.fromEnv(inferInPool, lambda index: index)
+            if inference_pool is not None:
+                inference_pool.start()
 
         logger.info("=" * 60)
         logger.info("Configuration:")
@@ -128,6 +369,37 @@ def main():
         logger.info(f"  Detection Interval: {detection_interval}s")
         logger.info(f"  Device ID: {device_id}")
         logger.info(f"  Show Visualization: {show_visualization}")
+        logger.info(f"  Motion Gate: {motion_gate.method if motion_gate else 'disabled'}")
+        logger.info(f"  Detection ROI: {roi if roi else 'full frame'}")
+        if model_manager is not None:
+            logger.info(
+                f"  Model Reload: {'file watch, ' if model_manager.watch else ''}SIGHUP, POST /model/reload"
+            )
+        logger.info(
+            f"  Inference Cascade: "
+            f"{f'{cascade.first_imgsz}px first pass' if cascade else 'disabled'}"
+        )
+        logger.info(
+            f"  Object Tracker: "
+            f"{f'confirm after {tracker.min_hits} frames, expire after {tracker.max_age}' if tracker else 'disabled'}"
+        )
+        logger.info(
+            f"  Confidence Aggregation: "
+            f"{f'{aggregator.method} over {aggregator.window} frames' if aggregator else 'disabled'}"
+        )
+        logger.info(f"  Basket Reconciler: {reconciler.state_file if reconciler else 'disabled'}")
+        logger.info(f"  Class Filter: {getClassFilter(mapping) if class_filter_enabled else 'disabled'}")
+        logger.info(f"  Frame Recorder: {recorder.file_format if recorder else 'disabled'}")
+        logger.info(f"  Frame Bus: {'enabled' if frame_bus is not None else 'disabled'}")
+        if isinstance(inference_pool, InferenceShardPool):
+            logger.info(
+                f"  Inference Workers: {inference_pool.workers} processes "
+                f"({inference_pool.threads_per_worker} threads each, {inference_pool.dispatch})"
+            )
+        else:
+            logger.info(
+                f"  Inference Workers: {inference_pool.workers if inference_pool else 'inline'}"
+            )
         logger.info("=" * 60)
 
         # ===== 3.5. VISUALIZATION WINDOW =====
@@ -144,6 +416,10 @@ def main():
         logger.info("=" * 60)
 
         iteration = 0
+        frames_processed = 0
+        run_start = time.time()
+        first_detection_time = None
+        bus_detections = ([], [])
 
         while True:
             iteration += 1
@@ -151,26 +427,151 @@ def main():
 
             logger.info(f"--- Iteration {iteration} ---")
 
-            # Capture frame
-            frame = captureFrame(camera)
-            if frame is None:
-                logger.warning("Failed to capture frame, skipping iteration")
-                time.sleep(detection_interval)
-                continue
+            # Pick up edits to the mapping file (cheap mtime check)
+            mapping = loadMapping('config/coco_to_products.json')
+            class_filter = getClassFilter(mapping) if class_filter_enabled else None
 
-            logger.info("Frame captured")
+            # Start a background model reload if one was requested (the loop
+            # keeps running on the current model until the swap)
+            if model_manager is not None:
+                model_manager.poll()
 
-            # Run detection
-            high_conf, low_conf = processFrame(frame, model, confidence_threshold)
+            if frame_bus is not None:
+                # Inference on the freshest frame in the shared ring (other process)
+                result = nextFrameBusResult(frame_bus, prefetch=detection_interval == 0)
+                if result is None and not frame_bus['producer'].is_alive():
+                    elapsed = time.time() - run_start
+                    logger.info(
+                        f"Frame bus producer exited: {frames_processed} frames in {elapsed:.2f}s "
+                        f"({frames_processed / elapsed if elapsed else 0.0:.2f} frames/s)"
+                    )
+                    break
+                if result is None:
+                    logger.warning("No result from inference worker, skipping iteration")
+                    continue
+
+                frame_seq, _, detections, inference_ms = result
+                frames_processed += 1
+
+                if detections is None:
+                    high_conf, low_conf = bus_detections
+                    logger.info(f"Static scene in frame {frame_seq}, reusing last detections")
+                else:
+                    high_conf, low_conf = splitByConfidence(detections, confidence_threshold)
+                    bus_detections = (high_conf, low_conf)
+                    logger.info(f"Frame {frame_seq} inferred in worker ({inference_ms:.0f}ms)")
+
+                needs_frame = show_visualization or recorder is not None
+                frame = readFrameBusFrame(frame_bus, frame_seq) if needs_frame else None
+            else:
+                # Skip inference entirely while the supervisor is reconnecting
+                if not camera.isAvailable() and not camera.isExhausted():
+                    logger.warning(f"Camera unavailable ({camera.state}), skipping iteration")
+                    time.sleep(detection_interval)
+                    continue
+
+                # Capture frame (latest grabbed frame when the grabber is running)
+                frame = camera.captureFrame()
+                if frame is None and camera.isExhausted():
+                    elapsed = time.time() - run_start
+                    logger.info(
+                        f"Frame source exhausted: {frames_processed} frames in {elapsed:.2f}s "
+                        f"({frames_processed / elapsed if elapsed else 0.0:.2f} frames/s)"
+                    )
+                    break
+                if frame is None:
+                    logger.warning("Failed to capture frame, skipping iteration")
+                    time.sleep(detection_interval)
+                    continue
+
+                logger.info("Frame captured")
+                frames_processed += 1
+                logger.debug(f"Camera stats: {camera.getStats()}")
+                if camera.grabber is not None:
+                    logger.debug(f"Frame grabber stats: {camera.grabber.getStats()}")
+
+                # Run detection (reuse last result when the motion gate sees a static scene)
+                # Motion outside the ROI (e.g. shelves) does not trigger inference
+                gate_frame = roi.crop(frame, apply_mask=False)[0] if roi is not None else frame
+                infer = motion_gate is None or motion_gate.check(gate_frame)
+                # Only real motion lets the cascade re-run an empty first pass
+                motion = infer and motion_gate is not None and motion_gate.motion_detected
+                if inference_pool is not None:
+                    # Results come back for older frames than the one just gated,
+                    # so pool mode never reuses a cached result: a static frame
+                    # is not submitted and only frames in flight are routed
+                    if infer:
+                        inference_pool.submit(frame, frames_processed, time.monotonic(), motion=motion)
+                    else:
+                        frame.release()
+                    # Continue with the oldest finished frame
+                    future = inference_pool.popCompleted(timeout=detection_interval)
+                    if future is None:
+                        if infer:
+                            logger.info(f"Inference in flight ({inference_pool.pending()} pending)")
+                        else:
+                            logger.info(
+                                f"Static scene, nothing in flight "
+                                f"({motion_gate.inferences_skipped} inferences skipped)"
+                            )
+                            time.sleep(detection_interval)
+                        continue
+                    frame = future.frame
+                    if future.exception() is not None:
+                        frame.release()
+                        continue
+                    high_conf, low_conf = future.result()
+                    logger.info(
+                        f"Frame {future.frame_seq} inferred in pool "
+                        f"({(future.finished_at - future.started_at) * 1000:.0f}ms)"
+                    )
+                    if motion_gate is not None:
+                        # Only arms the gate (check() skips once a result exists)
+                        motion_gate.storeResult((high_conf, low_conf))
+                elif infer:
+                    with model_manager.use() as model:
+                        high_conf, low_conf = processFrame(
+                            frame, model, confidence_threshold, roi=roi, classes=class_filter,
+                            cascade=cascade, motion=motion,
+                        )
+                    if motion_gate is not None:
+                        motion_gate.storeResult((high_conf, low_conf))
+                else:
+                    high_conf, low_conf = motion_gate.last_result
+                    logger.info(
+                        f"Static scene, reusing last detections "
+                        f"({motion_gate.inferences_skipped} inferences skipped)"
+                    )
             logger.info(f"Detections: {len(high_conf)} high confidence, {len(low_conf)} low confidence")
 
+            if first_detection_time is None:
+                # Cold start metric: process start → first inference result
+                first_detection_time = time.time() - startup_time
+                load_stats = getLoadStats()
+                load_info = (
+                    f" (model ready in {load_stats['load_ms'] / 1000:.2f}s, "
+                    f"artifact cache {load_stats.get('artifact_cache', 'unused')})"
+                    if 'load_ms' in load_stats else ""
+                )
+                logger.info(f"⏱️  Time to first detection: {first_detection_time:.2f}s{load_info}")
+
+            # Dispute recordings: the camera supervisor feeds the recorder; in
+            # frame bus mode capture runs in another process, so keep a clean
+            # copy of each inferred frame (before overlays are drawn)
+            if recorder is not None:
+                if frame_bus is not None and frame is not None:
+                    recorder.record(frame)
+                if low_conf:
+                    recorder.trigger(TRIGGER_LOW_CONFIDENCE, {'detections': list(low_conf)})
+
             # Visualize detections if enabled
-            if show_visualization:
+            if show_visualization and frame is not None:
                 # Combine all detections for visualization
                 all_detections = high_conf + low_conf
 
                 # Draw detections on frame
                 display_frame = drawDetections(frame, all_detections, mapping, show_confidence=True)
+                display_frame = drawRegionOfInterest(display_frame, roi)
 
                 # Add info overlay
                 info_lines = [
@@ -180,6 +581,8 @@ def main():
                     f"Total: {len(all_detections)}",
                     f"Device: {device_id[:8]}...",
                 ]
+                if motion_gate is not None:
+                    info_lines.append(f"Skipped: {motion_gate.inferences_skipped}")
                 display_frame = addInfoOverlay(display_frame, info_lines, position='top-left')
 
                 # Show frame
@@ -195,9 +598,18 @@ def main():
                 high_conf,
                 low_conf,
                 mapping,
-                device_id
+                device_id,
+                tracker=tracker,
+                aggregator=aggregator
             )
 
+            # Basket reconciler: send the difference to the acknowledged basket
+            # instead of per-frame basket payloads
+            if reconciler is not None:
+                reconciler.setDesired(tracker.basketItems() if tracker is not None else high_conf, mapping)
+                reconciler.sync()
+                basket_payloads = []
+
             # Send to backend
             # High confidence → basket
             for payload in basket_payloads:
@@ -219,6 +631,8 @@ def main():
                         payload['productId'],
                         payload.get('deviceId'),
                     )
+                    if recorder is not None:
+                        recorder.trigger(TRIGGER_ROUTING_FAILURE, {'payload': payload})
 
             # Low confidence → pending
             for payload in pending_payloads:
@@ -241,10 +655,33 @@ def main():
                         payload['name'],
                         payload.get('deviceId'),
                     )
+                    if recorder is not None:
+                        recorder.trigger(TRIGGER_ROUTING_FAILURE, {'payload': payload})
+
+            # Hand the frame buffer back to the pool for the next capture
+            if frame is not None:
+                frame.release()
 
             # Log loop timing
             loop_time = time.time() - loop_start
             logger.info(f"Iteration completed in {loop_time:.2f}s")
+            if motion_gate is not None:
+                logger.debug(f"Motion gate stats: {motion_gate.getStats()}")
+            if cascade is not None:
+                logger.debug(f"Cascade stats: {cascade.getStats()}")
+            if tracker is not None:
+                logger.debug(f"Tracker stats: {tracker.getStats()}")
+            if aggregator is not None:
+                logger.debug(f"Aggregator stats: {aggregator.getStats()}")
+            if reconciler is not None:
+                logger.debug(f"Basket reconciler stats: {reconciler.getStats()}")
+            if model_manager is not None:
+                logger.debug(f"Model manager stats: {model_manager.getStats()}")
+            logger.debug(f"Buffer pool stats: {getBufferPool().getStats()}")
+            if recorder is not None:
+                logger.debug(f"Recorder stats: {recorder.getStats()}")
+            if inference_pool is not None:
+                logger.debug(f"Inference pool stats: {inference_pool.getStats()}")
 
             if loop_time > detection_interval:
                 logger.warning(f"Loop time ({loop_time:.2f}s) exceeded interval ({detection_interval}s)")
@@ -261,12 +698,28 @@ def main():
         import traceback
         traceback.print_exc()
         if camera is not None:
-            releaseCamera(camera)
+            camera.stop()
+            releaseCamera()
         sys.exit(1)
 
     finally:
         if camera is not None:
-            releaseCamera(camera)
+            camera.stop()
+            releaseCamera()
+
+        if frame_bus is not None:
+            stopFrameBus(frame_bus)
+            frame_bus = None
+
+        # Shard processes and their frame rings outlive the loop otherwise
+        if inference_pool is not None:
+            inference_pool.stop()
+            inference_pool = None
+
+        # Write clips already queued before the process exits
+        if recorder is not None:
+            recorder.stop()
+            recorder = None
 
         # Close visualization window
         if show_visualization:
@@ -277,6 +730,8 @@ if __name__ == '__main__':
     # Register signal handlers for graceful shutdown
     signal.signal(signal.SIGINT, shutdown_handler)
     signal.signal(signal.SIGTERM, shutdown_handler)
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, reload_handler)
 
     # Run main loop
     main()
@@ -1,4 +1,6 @@
 # Models package
-from .yolo_detector import YOLODetector, loadModel, runInference
+from .detections import DetectionBatch, Detections
+from .product_lookup import ProductLookup
+from .yolo_detector import YOLODetector, loadModel, runInference, runInferenceBatch
 
-__all__ = ['YOLODetector', 'loadModel', 'runInference']
+__all__ = ['DetectionBatch', 'Detections', 'ProductLookup', 'YOLODetector', 'loadModel', 'runInference', 'runInferenceBatch']
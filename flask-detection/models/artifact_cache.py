@@ -0,0 +1,218 @@
+"""
+Persistent cache of exported model artifacts.
+
+Exporting weights for onnxruntime, OpenVINO or TorchScript takes seconds to
+minutes on a Raspberry Pi. ArtifactCache keeps every export under a key built
+from the weights' content hash, the engine, the input size, the device and (for
+INT8 models from models.quantize) the precision, so
+later starts (and other machines sharing the directory) load the prebuilt
+artifact directly. Editing or replacing the weights changes the hash, so a
+stale export or quantized model is never picked up.
+
+Layout:
+    <cache_dir>/<stem>-<sha256[:12]>-<engine>-<imgsz>-<device>[-int8]/
+        yolo11s.onnx | yolo11s_openvino_model/ | yolo11s.torchscript
+        manifest.json   (written last; entries without it are ignored)
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from shared.logger import logger
+
+MANIFEST_NAME = 'manifest.json'
+
+# (abspath, size, mtime_ns) -> sha256 hex digest
+_hash_cache = {}
+
+
+def hashModelFile(model_path, chunk_size=1 << 20):
+    """
+    SHA-256 of a weights file, memoized per (path, size, mtime).
+
+    Args:
+        model_path: Path to the weights file
+        chunk_size: Read size in bytes
+
+    Returns:
+        str: Hex digest
+    """
+    stat = os.stat(model_path)
+    memo_key = (os.path.abspath(model_path), stat.st_size, stat.st_mtime_ns)
+    digest = _hash_cache.get(memo_key)
+    if digest is not None:
+        return digest
+
+    sha = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+
+    digest = sha.hexdigest()
+    _hash_cache[memo_key] = digest
+    return digest
+
+
+def artifactKey(model_path, engine, imgsz, device, precision='fp32'):
+    """
+    Cache key for one export of a weights file.
+
+    Args:
+        model_path: Path to the weights file
+        engine: Inference engine the artifact is for
+        imgsz: Export input size
+        device: Device the artifact was built for ('cpu', 'cuda:0', ...)
+        precision: 'fp32' (plain export) or 'int8' (quantized model)
+
+    Returns:
+        str: Directory-safe key
+    """
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    device_name = re.sub(r'[^A-Za-z0-9]+', '', str(device or 'cpu'))
+    key = f"{stem}-{hashModelFile(model_path)[:12]}-{engine}-{int(imgsz)}-{device_name}"
+    return key if precision == 'fp32' else f"{key}-{precision}"
+
+
+class ArtifactCache:
+    """
+    Directory of exported model artifacts keyed by artifactKey().
+
+    Usage:
+        cache = ArtifactCache.fromEnv()
+        path = cache.lookup(model_path, 'openvino', 640, 'cpu')
+        if path is None:
+            path = cache.store(model_path, 'openvino', 640, 'cpu', exported_path)
+    """
+
+    def __init__(self, cache_dir='model_cache'):
+        """
+        Initialize artifact cache.
+
+        Args:
+            cache_dir (str): Directory holding cache entries (created on store)
+        """
+        self.cache_dir = cache_dir
+
+    @classmethod
+    def fromEnv(cls):
+        """
+        Build a cache from environment variables.
+
+        Returns:
+            ArtifactCache: Cache in MODEL_CACHE_DIR (default 'model_cache'), or
+                None if MODEL_CACHE_DIR is set to an empty string
+        """
+        cache_dir = os.getenv('MODEL_CACHE_DIR', 'model_cache')
+        if not cache_dir:
+            return None
+        return cls(cache_dir)
+
+    def entryDir(self, key):
+        """Return the directory for a cache key."""
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, model_path, engine, imgsz, device, precision='fp32'):
+        """
+        Find a cached artifact.
+
+        Args:
+            model_path: Path to the source weights
+            engine: Inference engine
+            imgsz: Export input size
+            device: Target device
+            precision: 'fp32' or 'int8'
+
+        Returns:
+            str: Path of the cached artifact, or None on a miss (or if the
+                weights file does not exist yet)
+        """
+        if not os.path.exists(model_path):
+            return None
+
+        directory = self.entryDir(artifactKey(model_path, engine, imgsz, device, precision))
+        try:
+            with open(os.path.join(directory, MANIFEST_NAME)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        artifact_path = os.path.join(directory, manifest.get('artifact', ''))
+        if not manifest.get('artifact') or not os.path.exists(artifact_path):
+            logger.warning(f"Model cache entry {directory} is missing its artifact, ignoring")
+            return None
+        return artifact_path
+
+    def store(self, model_path, engine, imgsz, device, artifact_path, metadata=None, precision='fp32'):
+        """
+        Move a freshly exported artifact into the cache.
+
+        Args:
+            model_path: Path to the source weights
+            engine: Inference engine
+            imgsz: Export input size
+            device: Target device
+            artifact_path: Exported file or directory (moved into the cache)
+            metadata (dict): Extra JSON-serializable manifest fields
+            precision: 'fp32' or 'int8'
+
+        Returns:
+            str: Path of the cached artifact
+        """
+        key = artifactKey(model_path, engine, imgsz, device, precision)
+        directory = self.entryDir(key)
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+        os.makedirs(directory)
+
+        name = os.path.basename(str(artifact_path).rstrip('/\\'))
+        cached_path = os.path.join(directory, name)
+        shutil.move(str(artifact_path), cached_path)
+
+        manifest = {
+            'artifact': name,
+            'key': key,
+            'source': os.path.abspath(model_path),
+            'sha256': hashModelFile(model_path),
+            'engine': engine,
+            'imgsz': int(imgsz),
+            'device': str(device),
+            'precision': precision,
+            'created_at': time.time(),
+            **(metadata or {}),
+        }
+        tmp_path = os.path.join(directory, MANIFEST_NAME + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(directory, MANIFEST_NAME))
+
+        logger.info(f"Cached {engine} model artifact: {cached_path}")
+        return cached_path
+
+    def entries(self):
+        """
+        List complete cache entries.
+
+        Returns:
+            list: Manifest dicts, newest first
+        """
+        manifests = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return manifests
+
+        for name in names:
+            try:
+                with open(os.path.join(self.cache_dir, name, MANIFEST_NAME)) as f:
+                    manifests.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sorted(manifests, key=lambda manifest: manifest.get('created_at', 0), reverse=True)
@@ -0,0 +1,270 @@
+"""
+Columnar detection results.
+
+DetectionBatch holds one frame's YOLO output as numpy columns (boxes,
+confidences, class ids, optional track ids) built from a single transfer of the
+Ultralytics boxes tensor, with thresholding and rounding done in bulk. It flows
+unchanged from runInference() through processFrame(), the tracker and
+routeDetections(), where the confidence split, per-class grouping and max/mean
+aggregation are numpy operations instead of per-detection dicts.
+
+It still behaves like the list of detection dicts runInference() used to
+return: iterating, indexing with an int, len(), + and comparison with a list
+all work on dicts of the form
+
+    {'class_id': 47, 'class_name': 'apple', 'confidence': 0.92, 'bbox': [x1, y1, x2, y2]}
+
+(plus 'track_id' once the tracker has assigned one). Detections is kept as an
+alias of DetectionBatch.
+"""
+
+import numpy as np
+
+_EMPTY_NAMES = {}
+_NO_BOX = (0.0, 0.0, 0.0, 0.0)
+
+
+class DetectionBatch:
+    """
+    Columnar detections for one frame.
+
+    Attributes:
+        xyxy: float64 array (N, 4), boxes rounded to 0.1 px
+        confidence: float64 array (N,), rounded to 3 decimals
+        class_id: int64 array (N,)
+        names: Mapping of class id to class name (model.names)
+        track_id: int64 array (N,) assigned by ObjectTracker, or None
+    """
+
+    __slots__ = ('xyxy', 'confidence', 'class_id', 'names', 'track_id')
+
+    def __init__(self, xyxy, confidence, class_id, names=None, track_id=None):
+        self.xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)
+        self.confidence = np.asarray(confidence, dtype=np.float64).reshape(-1)
+        self.class_id = np.asarray(class_id, dtype=np.int64).reshape(-1)
+        self.names = names if names is not None else _EMPTY_NAMES
+        self.track_id = None if track_id is None else np.asarray(track_id, dtype=np.int64).reshape(-1)
+
+    @classmethod
+    def empty(cls, names=None):
+        """Return a Detections with no rows."""
+        return cls(np.empty((0, 4)), np.empty(0), np.empty(0, dtype=np.int64), names)
+
+    @classmethod
+    def fromResult(cls, result, names, confidence_threshold=None):
+        """
+        Build Detections from one Ultralytics result.
+
+        Args:
+            result: Ultralytics Results object (uses result.boxes.data, N x 6:
+                x1, y1, x2, y2, confidence, class)
+            names: model.names
+            confidence_threshold: Optional extra confidence filter
+
+        Returns:
+            Detections
+        """
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return cls.empty(names)
+
+        # One device → host transfer for all boxes
+        data = boxes.data
+        data = data.cpu().numpy() if hasattr(data, 'cpu') else np.asarray(data)
+
+        if confidence_threshold is not None:
+            data = data[data[:, 4] >= confidence_threshold]
+
+        return cls(
+            np.round(data[:, :4].astype(np.float64), 1),
+            np.round(data[:, 4].astype(np.float64), 3),
+            data[:, 5].astype(np.int64),
+            names,
+        )
+
+    @classmethod
+    def fromDicts(cls, detections, names=None):
+        """
+        Build a DetectionBatch from an iterable of detection dicts.
+
+        A DetectionBatch is returned as is. Dicts without a class_id are
+        skipped; a missing bbox or confidence defaults to zeros.
+        """
+        if isinstance(detections, cls):
+            return detections
+
+        detections = [d for d in detections if d.get('class_id') is not None]
+        if not detections:
+            return cls.empty(names)
+
+        if names is None:
+            names = {int(d['class_id']): d.get('class_name', str(d['class_id'])) for d in detections}
+
+        track_id = None
+        if all('track_id' in d for d in detections):
+            track_id = [d['track_id'] for d in detections]
+
+        return cls(
+            [d.get('bbox') or _NO_BOX for d in detections],
+            [d.get('confidence', 0.0) for d in detections],
+            [d['class_id'] for d in detections],
+            names,
+            track_id,
+        )
+
+    @classmethod
+    def concat(cls, batches, names=None):
+        """
+        Concatenate batches (or lists of detection dicts) row-wise.
+
+        Track ids are kept only if every batch has them.
+        """
+        batches = [cls.fromDicts(batch) for batch in batches]
+        if names is None:
+            names = next((batch.names for batch in batches if batch.names), None)
+        if not batches:
+            return cls.empty(names)
+
+        track_id = None
+        if all(batch.track_id is not None for batch in batches):
+            track_id = np.concatenate([batch.track_id for batch in batches])
+
+        return cls(
+            np.concatenate([batch.xyxy for batch in batches]),
+            np.concatenate([batch.confidence for batch in batches]),
+            np.concatenate([batch.class_id for batch in batches]),
+            names,
+            track_id,
+        )
+
+    def __len__(self):
+        return len(self.class_id)
+
+    def __bool__(self):
+        return len(self.class_id) > 0
+
+    def _class_name(self, class_id):
+        try:
+            return self.names[class_id]
+        except (KeyError, IndexError, TypeError):
+            return str(class_id)
+
+    def __iter__(self):
+        # Bulk conversion to Python scalars, then cheap per-row dicts
+        track_ids = self.track_id.tolist() if self.track_id is not None else None
+        for index, (class_id, confidence, bbox) in enumerate(zip(
+            self.class_id.tolist(), self.confidence.tolist(), self.xyxy.tolist()
+        )):
+            detection = {
+                'class_id': class_id,
+                'class_name': self._class_name(class_id),
+                'confidence': confidence,
+                'bbox': bbox,
+            }
+            if track_ids is not None:
+                detection['track_id'] = track_ids[index]
+            yield detection
+
+    def __getitem__(self, index):
+        """
+        Int index → detection dict; slice, boolean mask or index array → DetectionBatch.
+        """
+        if isinstance(index, (int, np.integer)):
+            class_id = int(self.class_id[index])
+            detection = {
+                'class_id': class_id,
+                'class_name': self._class_name(class_id),
+                'confidence': float(self.confidence[index]),
+                'bbox': self.xyxy[index].tolist(),
+            }
+            if self.track_id is not None:
+                detection['track_id'] = int(self.track_id[index])
+            return detection
+        return DetectionBatch(
+            self.xyxy[index], self.confidence[index], self.class_id[index], self.names,
+            None if self.track_id is None else self.track_id[index],
+        )
+
+    def __add__(self, other):
+        if isinstance(other, (DetectionBatch, list, tuple)):
+            return DetectionBatch.concat([self, other], self.names)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, (list, tuple)):
+            return DetectionBatch.concat([other, self], self.names)
+        return NotImplemented
+
+    def __eq__(self, other):
+        if isinstance(other, DetectionBatch):
+            return (
+                np.array_equal(self.class_id, other.class_id)
+                and np.array_equal(self.confidence, other.confidence)
+                and np.array_equal(self.xyxy, other.xyxy)
+            )
+        if isinstance(other, (list, tuple)):
+            return self.toList() == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"DetectionBatch({len(self)} boxes)"
+
+    def toList(self):
+        """Return the detections as a list of dicts (legacy format)."""
+        return list(self)
+
+    def translated(self, offset_x, offset_y):
+        """Return a copy with boxes shifted by (offset_x, offset_y) pixels."""
+        offset = np.array([offset_x, offset_y, offset_x, offset_y], dtype=np.float64)
+        return DetectionBatch(
+            np.round(self.xyxy + offset, 1), self.confidence, self.class_id, self.names, self.track_id
+        )
+
+    def withTrackIds(self, track_id):
+        """Return a copy carrying the given track ids (one per row)."""
+        return DetectionBatch(self.xyxy, self.confidence, self.class_id, self.names, track_id)
+
+    def split(self, threshold, floor=0.0):
+        """
+        Split by confidence in one pass over the confidence column.
+
+        Args:
+            threshold: Rows at or above go to the first batch
+            floor: Rows below are dropped
+
+        Returns:
+            tuple: (high, low) DetectionBatch
+        """
+        high = self.confidence >= threshold
+        low = ~high & (self.confidence >= floor)
+        return self[high], self[low]
+
+    def groupByClass(self):
+        """
+        Aggregate rows per class with bincount.
+
+        Returns:
+            tuple: (class_ids, counts, max_confidence, mean_confidence) arrays,
+                one entry per class in ascending class id order
+        """
+        class_ids, inverse = np.unique(self.class_id, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(class_ids))
+        sums = np.bincount(inverse, weights=self.confidence, minlength=len(class_ids))
+
+        max_confidence = np.zeros(len(class_ids))
+        np.maximum.at(max_confidence, inverse, self.confidence)
+
+        mean_confidence = np.divide(sums, counts, out=np.zeros(len(class_ids)), where=counts > 0)
+        return class_ids, counts, max_confidence, mean_confidence
+
+    def centers(self):
+        """Return box centers as a float64 array (N, 2)."""
+        return np.column_stack(
+            ((self.xyxy[:, 0] + self.xyxy[:, 2]) / 2, (self.xyxy[:, 1] + self.xyxy[:, 3]) / 2)
+        )
+
+
+# Pre-DetectionBatch name, still used throughout the models package
+Detections = DetectionBatch
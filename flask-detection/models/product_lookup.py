@@ -0,0 +1,101 @@
+"""
+Compiled COCO class → product lookup.
+
+loadMapping() compiles config/coco_to_products.json into a ProductLookup once
+per file version. Lookups are then an index into a per-class array of
+precomputed product records, instead of converting the class id to a string
+and hashing it on every call, and the mapped-class bitmask filters a whole
+column of class ids in one numpy operation.
+
+ProductLookup is still the mapping dict loadMapping() used to return (string
+keys, product dicts as values), made read-only so the compiled tables cannot go
+stale.
+"""
+
+from types import MappingProxyType
+
+import numpy as np
+
+# Classes in the COCO dataset YOLO11s is trained on
+COCO_CLASS_COUNT = 80
+
+
+class ProductLookup(dict):
+    """
+    Read-only COCO mapping with array-indexed product records.
+
+    Attributes:
+        products: Tuple indexed by class id; read-only product record or None
+        mapped: Bool array indexed by class id, True for mapped classes
+        class_ids: Sorted tuple of mapped class ids
+    """
+
+    def __init__(self, mapping):
+        """
+        Compile a mapping.
+
+        Args:
+            mapping: Dict of COCO class id (str or int) → product details
+        """
+        super().__init__((str(class_id), product) for class_id, product in mapping.items())
+
+        by_class = {int(class_id): MappingProxyType(dict(product)) for class_id, product in self.items()}
+        size = max([COCO_CLASS_COUNT] + [class_id + 1 for class_id in by_class])
+
+        products = [None] * size
+        for class_id, product in by_class.items():
+            products[class_id] = product
+
+        self.products = tuple(products)
+        self.mapped = np.array([product is not None for product in products], dtype=bool)
+        self.mapped.flags.writeable = False
+        self.class_ids = tuple(sorted(by_class))
+
+    @classmethod
+    def compile(cls, mapping):
+        """Return mapping as a ProductLookup (unchanged if it already is one)."""
+        if isinstance(mapping, cls):
+            return mapping
+        return cls(mapping)
+
+    def lookup(self, class_id):
+        """
+        Get the product record for a class id.
+
+        Args:
+            class_id: COCO class id (int)
+
+        Returns:
+            Read-only product record, or None if the class is not mapped
+        """
+        if 0 <= class_id < len(self.products):
+            return self.products[class_id]
+        return None
+
+    def mask(self, class_ids):
+        """
+        Vectorized mapped-class test.
+
+        Args:
+            class_ids: Array of class ids
+
+        Returns:
+            numpy.ndarray: Bool array, True where the class maps to a product
+        """
+        class_ids = np.asarray(class_ids, dtype=np.int64)
+        in_range = (class_ids >= 0) & (class_ids < len(self.mapped))
+        result = np.zeros(class_ids.shape, dtype=bool)
+        result[in_range] = self.mapped[class_ids[in_range]]
+        return result
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("ProductLookup is read-only; edit config/coco_to_products.json instead")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (ProductLookup, (dict(self),))
+
+    def __repr__(self):
+        return f"ProductLookup({len(self.class_ids)} mapped classes)"
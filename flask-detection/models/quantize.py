@@ -0,0 +1,551 @@
+"""
+INT8 Post-Training Quantization for YOLO11s
+============================================
+
+Produces an INT8 model artifact from yolo11s.pt, calibrated on real cart frames
+(e.g. a FrameRecorder output directory), and reports how it compares to the
+FP32 export on the same frames so each deployment can pick its precision.
+
+Engines:
+- openvino:    OpenVINO IR quantized with NNCF → <stem>_int8_openvino_model/
+- onnxruntime: QDQ ONNX quantized with onnxruntime.quantization → <stem>_int8.onnx
+
+The artifact is stored in the artifact cache (MODEL_CACHE_DIR) under the
+weights' hash with precision int8, so it is only loaded for the weights it was
+quantized from. With the cache disabled it stays next to the weights.
+
+The detection head (last model layer: box decoding and concat) is kept in
+FP32; quantizing it costs noticeably more accuracy than it saves in latency.
+
+Outputs next to the artifact:
+- calibration.json: calibration frame counts, resolutions and input statistics
+- report.json:      FP32 vs INT8 latency and agreement on the evaluation frames
+
+Load the result with YOLO_ENGINE=<engine> YOLO_PRECISION=int8.
+
+Usage:
+    python -m models.quantize --engine openvino --model models/yolo11s.pt \\
+        --calibration-dir recordings/ [--eval-dir frames/] [--max-frames 300]
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from shared.logger import logger
+from models.artifact_cache import ArtifactCache
+from models.yolo_detector import (
+    INT8_ENGINES,
+    _export_for_engine,
+    _exported_model_path,
+    resolveEngine,
+    runInference,
+)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+CALIBRATION_METHODS = ('minmax', 'entropy', 'percentile')
+LETTERBOX_COLOR = (114, 114, 114)
+
+
+def collectCalibrationFrames(directory, max_frames=300):
+    """
+    Find calibration images under a directory (recursively).
+
+    Recorder output nests JPEG sequences in one directory per clip; all of
+    them are used. When there are more than max_frames images, an evenly
+    spaced subset is taken so every clip stays represented.
+
+    Args:
+        directory: Root directory of calibration frames
+        max_frames: Max images to return (0 = all)
+
+    Returns:
+        list: Sorted image paths
+    """
+    paths = []
+    for root, _, names in os.walk(directory):
+        paths.extend(
+            os.path.join(root, name) for name in names if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+    paths.sort()
+
+    if max_frames and len(paths) > max_frames:
+        indices = np.linspace(0, len(paths) - 1, max_frames).round().astype(int)
+        paths = [paths[i] for i in indices]
+
+    return paths
+
+
+def preprocessFrame(frame, imgsz=640):
+    """
+    Letterbox a BGR frame into the model input tensor (as Ultralytics does).
+
+    Args:
+        frame: numpy array (H x W x 3, BGR, uint8)
+        imgsz: Square model input size
+
+    Returns:
+        numpy.ndarray: float32 array of shape (1, 3, imgsz, imgsz), RGB, 0-1
+    """
+    height, width = frame.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_width, new_height = int(round(width * scale)), int(round(height * scale))
+
+    resized = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+
+    pad_x, pad_y = (imgsz - new_width) / 2, (imgsz - new_height) / 2
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    padded = cv2.copyMakeBorder(resized, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+
+    tensor = padded[:, :, ::-1].transpose(2, 0, 1)  # BGR HWC → RGB CHW
+    return np.ascontiguousarray(tensor, dtype=np.float32)[np.newaxis] / 255.0
+
+
+def computeCalibrationStats(paths, imgsz=640):
+    """
+    Read calibration frames once and summarize them.
+
+    Args:
+        paths: Image paths from collectCalibrationFrames()
+        imgsz: Model input size used for the channel statistics
+
+    Returns:
+        tuple: (readable_paths, stats dict)
+    """
+    readable = []
+    resolutions = Counter()
+    channel_sum = np.zeros(3, dtype=np.float64)
+    channel_sq_sum = np.zeros(3, dtype=np.float64)
+    pixels = 0
+
+    for path in paths:
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is None:
+            logger.warning(f"Skipping unreadable calibration frame: {path}")
+            continue
+
+        readable.append(path)
+        resolutions[f"{frame.shape[1]}x{frame.shape[0]}"] += 1
+
+        tensor = preprocessFrame(frame, imgsz)[0].reshape(3, -1)
+        channel_sum += tensor.sum(axis=1)
+        channel_sq_sum += np.square(tensor, dtype=np.float64).sum(axis=1)
+        pixels += tensor.shape[1]
+
+    mean = channel_sum / pixels if pixels else channel_sum
+    std = np.sqrt(np.maximum(channel_sq_sum / pixels - mean ** 2, 0.0)) if pixels else channel_sq_sum
+
+    stats = {
+        'frames_found': len(paths),
+        'frames_used': len(readable),
+        'frames_skipped': len(paths) - len(readable),
+        'resolutions': dict(resolutions),
+        'input_channel_mean_rgb': [round(float(v), 4) for v in mean],
+        'input_channel_std_rgb': [round(float(v), 4) for v in std],
+    }
+    return readable, stats
+
+
+class _FrameCalibrationReader:
+    """onnxruntime CalibrationDataReader that loads frames lazily."""
+
+    def __init__(self, paths, input_name, imgsz):
+        self.paths = paths
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self._index = 0
+
+    def get_next(self):
+        while self._index < len(self.paths):
+            frame = cv2.imread(self.paths[self._index], cv2.IMREAD_COLOR)
+            self._index += 1
+            if frame is not None:
+                return {self.input_name: preprocessFrame(frame, self.imgsz)}
+        return None
+
+    def rewind(self):
+        self._index = 0
+
+
+def _head_node_prefix(node_names):
+    """Return the '/model.N/' prefix of the last (detection head) layer."""
+    indices = []
+    for name in node_names:
+        match = re.search(r'/model\.(\d+)/', name)
+        if match:
+            indices.append(int(match.group(1)))
+    return f"/model.{max(indices)}/" if indices else None
+
+
+def _quantize_onnx(fp32_path, output_path, paths, imgsz, method):
+    import onnx
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+
+    fp32_model = onnx.load(fp32_path)
+    input_name = fp32_model.graph.input[0].name
+
+    head_prefix = _head_node_prefix(node.name for node in fp32_model.graph.node)
+    excluded = [node.name for node in fp32_model.graph.node if head_prefix and node.name.startswith(head_prefix)]
+
+    calibrate_method = {
+        'minmax': CalibrationMethod.MinMax,
+        'entropy': CalibrationMethod.Entropy,
+        'percentile': CalibrationMethod.Percentile,
+    }[method]
+
+    quantize_static(
+        model_input=fp32_path,
+        model_output=output_path,
+        calibration_data_reader=_FrameCalibrationReader(paths, input_name, imgsz),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        weight_type=QuantType.QInt8,
+        activation_type=QuantType.QUInt8,
+        calibrate_method=calibrate_method,
+        nodes_to_exclude=excluded,
+    )
+
+    # Ultralytics reads class names and imgsz from the ONNX metadata
+    quantized = onnx.load(output_path)
+    existing = {prop.key for prop in quantized.metadata_props}
+    for prop in fp32_model.metadata_props:
+        if prop.key not in existing:
+            quantized.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(quantized, output_path)
+
+    return {
+        'quantized_nodes': sum(1 for node in quantized.graph.node if node.op_type == 'QuantizeLinear'),
+        'excluded_nodes': len(excluded),
+    }
+
+
+def _quantize_openvino(fp32_dir, output_dir, paths, imgsz):
+    import nncf
+    import openvino as ov
+
+    xml_names = [name for name in os.listdir(fp32_dir) if name.endswith('.xml')]
+    if not xml_names:
+        raise FileNotFoundError(f"No OpenVINO .xml model in {fp32_dir}")
+
+    ov_model = ov.Core().read_model(os.path.join(fp32_dir, xml_names[0]))
+
+    def transform(path):
+        return preprocessFrame(cv2.imread(path, cv2.IMREAD_COLOR), imgsz)
+
+    # Keep box decoding in FP32 (same ignored ops Ultralytics uses for INT8 export)
+    ignored_scope = nncf.IgnoredScope(types=['Multiply', 'Subtract', 'Sigmoid'])
+    quantized = nncf.quantize(
+        ov_model,
+        nncf.Dataset(paths, transform),
+        preset=nncf.QuantizationPreset.MIXED,
+        subset_size=len(paths),
+        ignored_scope=ignored_scope,
+    )
+
+    os.makedirs(output_dir, exist_ok=True)
+    ov.save_model(quantized, os.path.join(output_dir, xml_names[0]))
+
+    # Ultralytics reads class names and imgsz from metadata.yaml
+    metadata_path = os.path.join(fp32_dir, 'metadata.yaml')
+    if os.path.exists(metadata_path):
+        shutil.copy(metadata_path, output_dir)
+
+    return {'ignored_op_types': list(ignored_scope.types)}
+
+
+def _sidecar_path(artifact_path, name):
+    """Where calibration.json / report.json for an artifact are written."""
+    if os.path.isdir(artifact_path):
+        return os.path.join(artifact_path, f"{name}.json")
+    return f"{os.path.splitext(artifact_path)[0]}.{name}.json"
+
+
+def quantizeModel(model_path, calibration_dir, engine='openvino', imgsz=640, max_frames=300, method='minmax',
+                  cache=None):
+    """
+    Quantize YOLO weights to INT8 using calibration frames.
+
+    Args:
+        model_path: Path to the .pt weights (e.g. models/yolo11s.pt)
+        calibration_dir: Directory of real cart frames (searched recursively)
+        engine: 'openvino' or 'onnxruntime'
+        imgsz: Model input size
+        max_frames: Max calibration frames (evenly sampled)
+        method: ONNX calibration method ('minmax', 'entropy', 'percentile')
+        cache: ArtifactCache the INT8 model is stored in (None = ArtifactCache.fromEnv())
+
+    Returns:
+        tuple: (artifact_path, calibration_stats)
+
+    Raises:
+        ValueError: If the engine has no INT8 path or no usable frames are found
+    """
+    engine = resolveEngine(engine)
+    if engine not in INT8_ENGINES:
+        raise ValueError("INT8 quantization needs engine 'openvino' or 'onnxruntime'")
+    if method not in CALIBRATION_METHODS:
+        raise ValueError(f"Unknown calibration method: {method}")
+
+    paths, stats = computeCalibrationStats(collectCalibrationFrames(calibration_dir, max_frames), imgsz)
+    if not paths:
+        raise ValueError(f"No readable calibration frames in {calibration_dir}")
+
+    logger.info(
+        f"Calibrating {engine} INT8 model on {len(paths)} frames from {calibration_dir} "
+        f"(resolutions: {stats['resolutions']})"
+    )
+
+    cache = cache if cache is not None else ArtifactCache.fromEnv()
+    fp32_path = _export_for_engine(model_path, engine, imgsz, cache=cache)
+    output_path = _exported_model_path(model_path, engine, 'int8')
+
+    start_time = time.time()
+    if engine == 'onnxruntime':
+        details = _quantize_onnx(fp32_path, output_path, paths, imgsz, method)
+    else:
+        details = _quantize_openvino(fp32_path, output_path, paths, imgsz)
+        method = 'nncf-mixed'
+    duration = time.time() - start_time
+
+    if cache is not None:
+        output_path = cache.store(model_path, engine, imgsz, 'cpu', output_path,
+                                  {'method': method, 'quantize_seconds': round(duration, 1)}, precision='int8')
+
+    stats.update(details)
+    stats.update({
+        'engine': engine,
+        'source_model': model_path,
+        'fp32_artifact': fp32_path,
+        'artifact': output_path,
+        'imgsz': imgsz,
+        'method': method,
+        'calibration_dir': calibration_dir,
+        'duration_s': round(duration, 1),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+    })
+
+    with open(_sidecar_path(output_path, 'calibration'), 'w') as f:
+        json.dump(stats, f, indent=2)
+
+    logger.info(f"✅ INT8 model written to {output_path} ({duration:.1f}s)")
+    return output_path, stats
+
+
+def _box_iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def matchDetections(reference, candidate, iou_threshold=0.5):
+    """
+    Greedily match candidate detections to reference detections.
+
+    A match needs the same class_id and IoU >= iou_threshold; higher
+    confidence references are matched first.
+
+    Args:
+        reference: Detection dicts treated as ground truth (FP32)
+        candidate: Detection dicts being evaluated (INT8)
+        iou_threshold: Minimum box IoU for a match
+
+    Returns:
+        list: (reference_detection, candidate_detection) pairs
+    """
+    unmatched = list(candidate)
+    pairs = []
+
+    for ref in sorted(reference, key=lambda d: d['confidence'], reverse=True):
+        best, best_iou = None, iou_threshold
+        for other in unmatched:
+            if other['class_id'] != ref['class_id']:
+                continue
+            iou = _box_iou(ref['bbox'], other['bbox'])
+            if iou >= best_iou:
+                best, best_iou = other, iou
+        if best is not None:
+            unmatched.remove(best)
+            pairs.append((ref, best))
+
+    return pairs
+
+
+def _latency_summary(latencies_ms):
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    if not len(values):
+        return {'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0}
+    return {
+        'mean_ms': round(float(values.mean()), 1),
+        'p50_ms': round(float(np.percentile(values, 50)), 1),
+        'p95_ms': round(float(np.percentile(values, 95)), 1),
+    }
+
+
+def summarizeComparison(fp32_results, int8_results, iou_threshold=0.5):
+    """
+    Build the FP32 vs INT8 report from per-frame results.
+
+    Args:
+        fp32_results: List of (detections, latency_ms) per frame for FP32
+        int8_results: List of (detections, latency_ms) per frame for INT8
+        iou_threshold: IoU needed to count an INT8 box as agreeing
+
+    Returns:
+        dict: Latency summaries, speedup and agreement metrics (FP32 as reference)
+    """
+    fp32_total = int8_total = matched = 0
+    confidence_deltas = []
+
+    for (reference, _), (candidate, _) in zip(fp32_results, int8_results):
+        pairs = matchDetections(reference, candidate, iou_threshold)
+        fp32_total += len(reference)
+        int8_total += len(candidate)
+        matched += len(pairs)
+        confidence_deltas.extend(abs(ref['confidence'] - other['confidence']) for ref, other in pairs)
+
+    recall = matched / fp32_total if fp32_total else 1.0
+    precision = matched / int8_total if int8_total else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    fp32_latency = _latency_summary([latency for _, latency in fp32_results])
+    int8_latency = _latency_summary([latency for _, latency in int8_results])
+    speedup = fp32_latency['mean_ms'] / int8_latency['mean_ms'] if int8_latency['mean_ms'] else 0.0
+
+    return {
+        'frames': len(fp32_results),
+        'latency': {'fp32': fp32_latency, 'int8': int8_latency, 'speedup': round(speedup, 2)},
+        'agreement': {
+            'fp32_detections': fp32_total,
+            'int8_detections': int8_total,
+            'matched': matched,
+            'recall': round(recall, 3),
+            'precision': round(precision, 3),
+            'f1': round(f1, 3),
+            'mean_confidence_delta': round(float(np.mean(confidence_deltas)), 4) if confidence_deltas else 0.0,
+            'iou_threshold': iou_threshold,
+        },
+    }
+
+
+def compareModels(fp32_path, int8_path, frame_paths, confidence_threshold=0.3, iou_threshold=0.5, warmup=3):
+    """
+    Run FP32 and INT8 artifacts on the same frames and report the difference.
+
+    Args:
+        fp32_path: Exported FP32 model (.onnx or OpenVINO directory)
+        int8_path: Quantized model from quantizeModel()
+        frame_paths: Evaluation image paths
+        confidence_threshold: Confidence passed to runInference()
+        iou_threshold: IoU needed to count an INT8 box as agreeing
+        warmup: Untimed inferences per model before measuring
+
+    Returns:
+        dict: summarizeComparison() report plus model paths
+    """
+    from ultralytics import YOLO
+
+    frames = [frame for frame in (cv2.imread(path, cv2.IMREAD_COLOR) for path in frame_paths) if frame is not None]
+    if not frames:
+        raise ValueError("No readable evaluation frames")
+
+    results = {}
+    for label, path in (('fp32', fp32_path), ('int8', int8_path)):
+        model = YOLO(path, task='detect')
+        for frame in frames[:warmup]:
+            runInference(model, frame, confidence_threshold)
+
+        per_frame = []
+        for frame in frames:
+            start_time = time.perf_counter()
+            detections = runInference(model, frame, confidence_threshold)
+            per_frame.append((detections, (time.perf_counter() - start_time) * 1000))
+        results[label] = per_frame
+
+    report = summarizeComparison(results['fp32'], results['int8'], iou_threshold)
+    report.update({
+        'fp32_model': fp32_path,
+        'int8_model': int8_path,
+        'confidence_threshold': confidence_threshold,
+    })
+    return report
+
+
+def _log_report(report):
+    latency = report['latency']
+    agreement = report['agreement']
+    logger.info("=" * 60)
+    logger.info(f"FP32 vs INT8 on {report['frames']} frames")
+    logger.info(
+        f"  Latency FP32: {latency['fp32']['mean_ms']:.1f}ms mean, {latency['fp32']['p95_ms']:.1f}ms p95"
+    )
+    logger.info(
+        f"  Latency INT8: {latency['int8']['mean_ms']:.1f}ms mean, {latency['int8']['p95_ms']:.1f}ms p95 "
+        f"({latency['speedup']:.2f}x)"
+    )
+    logger.info(
+        f"  Agreement: recall {agreement['recall']:.3f}, precision {agreement['precision']:.3f}, "
+        f"F1 {agreement['f1']:.3f}, mean |Δconf| {agreement['mean_confidence_delta']:.4f}"
+    )
+    logger.info("=" * 60)
+
+
+def main(argv=None):
+    default_engine = os.getenv('YOLO_ENGINE', 'openvino')
+    parser = argparse.ArgumentParser(description="INT8 post-training quantization for YOLO11s")
+    parser.add_argument('--model', default=os.getenv('YOLO_MODEL_PATH', 'yolo11s.pt'), help="Path to .pt weights")
+    parser.add_argument(
+        '--engine', default=default_engine if default_engine not in ('torch', 'torchscript') else 'openvino',
+        help="openvino or onnxruntime",
+    )
+    parser.add_argument('--calibration-dir', required=True, help="Directory of real cart frames")
+    parser.add_argument('--eval-dir', help="Frames for the FP32 vs INT8 report (default: calibration dir)")
+    parser.add_argument('--max-frames', type=int, default=300, help="Max calibration frames")
+    parser.add_argument('--eval-frames', type=int, default=100, help="Max evaluation frames")
+    parser.add_argument('--imgsz', type=int, default=640, help="Model input size")
+    parser.add_argument('--method', default='minmax', choices=CALIBRATION_METHODS, help="ONNX calibration method")
+    parser.add_argument('--confidence', type=float, default=0.3, help="Confidence threshold for the report")
+    parser.add_argument('--no-report', action='store_true', help="Skip the FP32 vs INT8 comparison")
+    args = parser.parse_args(argv)
+
+    artifact_path, stats = quantizeModel(
+        args.model, args.calibration_dir, args.engine, args.imgsz, args.max_frames, args.method
+    )
+
+    if args.no_report:
+        return 0
+
+    eval_dir = args.eval_dir or args.calibration_dir
+    if eval_dir == args.calibration_dir:
+        logger.warning("Evaluating on the calibration frames; pass --eval-dir for a held-out set")
+
+    report = compareModels(
+        stats['fp32_artifact'], artifact_path, collectCalibrationFrames(eval_dir, args.eval_frames), args.confidence
+    )
+    report['eval_dir'] = eval_dir
+
+    report_path = _sidecar_path(artifact_path, 'report')
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    _log_report(report)
+    logger.info(f"Report written to {report_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
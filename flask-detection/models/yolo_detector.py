@@ -19,7 +19,9 @@ Task: 3.2 - YOLO11s Model Integration
 import os
 import sys
 import json
+import threading
 import time
+from contextlib import contextmanager
 import numpy as np
 from typing import List, Dict, Optional, Tuple
 
@@ -28,13 +30,39 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
 from shared.logger import logger
+from camera.frame import BGR, toColorSpace
+from models.detections import Detections
+from models.product_lookup import ProductLookup
+
+# Inference engines selectable via YOLO_ENGINE; non-torch engines run an
+# exported copy of the weights through the Ultralytics backend for that runtime
+INFERENCE_ENGINES = ('torch', 'torchscript', 'onnxruntime', 'openvino')
+ENGINE_EXPORT_FORMATS = {'torchscript': 'torchscript', 'onnxruntime': 'onnx', 'openvino': 'openvino'}
+# INT8 artifacts are produced by `python -m models.quantize`
+MODEL_PRECISIONS = ('fp32', 'int8')
+INT8_ENGINES = ('onnxruntime', 'openvino')
+DEFAULT_IMGSZ = 640
+_ENGINE_ALIASES = {
+    'pytorch': 'torch', 'ts': 'torchscript', 'jit': 'torchscript',
+    'onnx': 'onnxruntime', 'ort': 'onnxruntime', 'ov': 'openvino',
+}
 
 # Global model cache to avoid reloading
 _yolo_model = None
 _yolo_device = None
+_yolo_engine = None
+_yolo_precision = None
+_yolo_imgsz = None
 
-# Global mapping cache
+# Cold start timings of the last loadModel() call (see getLoadStats())
+_load_stats = {}
+
+# Global mapping cache (reloaded when the file's mtime changes)
 _coco_mapping = None
+_coco_mapping_path = None
+_coco_mapping_mtime = None
+_class_filter = None
+_class_filter_source = None
 
 
 class YOLODetector:
@@ -43,16 +71,20 @@ class YOLODetector:
     Provides convenient interface to model loading and inference.
     """
 
-    def __init__(self, model_path='yolo11s.pt', device=None):
+    def __init__(self, model_path='yolo11s.pt', device=None, engine=None, precision=None):
         """
         Initialize YOLO detector with model loading.
 
         Args:
             model_path: Path to YOLO model file (default: yolo11s.pt)
             device: Device to run model on ('cpu', 'cuda:0', or None for auto)
+            engine: Inference engine (None = YOLO_ENGINE, default 'torch')
+            precision: 'fp32' or 'int8' (None = YOLO_PRECISION, default 'fp32')
         """
-        self.model = loadModel(model_path, device)
+        self.model = loadModel(model_path, device, engine, precision)
         self.device = _yolo_device
+        self.engine = _yolo_engine
+        self.precision = _yolo_precision
         self.mapping = loadMapping()
 
     def detect(self, frame, confidence_threshold=0.7):
@@ -60,39 +92,263 @@ class YOLODetector:
         Run detection on a frame and return mapped products.
 
         Args:
-            frame: OpenCV frame (numpy array, RGB format)
+            frame: Frame or OpenCV frame (numpy array, BGR format)
             confidence_threshold: Minimum confidence (0.0-1.0)
 
         Returns:
             List of detected products with details
         """
-        detections = runInference(self.model, frame, confidence_threshold)
+        detections = Detections.fromDicts(runInference(self.model, frame, confidence_threshold))
+
+        # Drop unmapped classes in one pass, then map the rest to products
+        detections = detections[self.mapping.mask(detections.class_id)]
+        return [
+            {
+                **self.mapping.lookup(detection['class_id']),
+                'confidence': detection['confidence'],
+                'bbox': detection['bbox'],
+                'coco_class': detection['class_name']
+            }
+            for detection in detections
+        ]
+
+
+def resolveEngine(engine=None):
+    """
+    Normalize an inference engine name.
+
+    Args:
+        engine: 'torch', 'torchscript', 'onnxruntime' or 'openvino' (aliases:
+            'ts', 'onnx', 'ov'); None reads YOLO_ENGINE (default 'torch')
+
+    Returns:
+        str: Canonical engine name
+
+    Raises:
+        ValueError: If the engine is unknown
+    """
+    name = (engine or os.getenv('YOLO_ENGINE', 'torch')).strip().lower()
+    name = _ENGINE_ALIASES.get(name, name)
+    if name not in INFERENCE_ENGINES:
+        raise ValueError(f"Unknown YOLO_ENGINE '{engine}' (expected one of {', '.join(INFERENCE_ENGINES)})")
+    return name
 
-        # Map detections to products
-        products = []
-        for detection in detections:
-            product = getProductFromClass(detection['class_id'], self.mapping)
-            if product:
-                products.append({
-                    **product,
-                    'confidence': detection['confidence'],
-                    'bbox': detection['bbox'],
-                    'coco_class': detection['class_name']
-                })
 
-        return products
+def resolvePrecision(precision=None):
+    """
+    Normalize a model precision name.
+
+    Args:
+        precision: 'fp32' or 'int8'; None reads YOLO_PRECISION (default 'fp32')
 
+    Returns:
+        str: 'fp32' or 'int8'
 
-def loadModel(model_path='yolo11s.pt', device=None):
+    Raises:
+        ValueError: If the precision is unknown
+    """
+    name = (precision or os.getenv('YOLO_PRECISION', 'fp32')).strip().lower()
+    if name not in MODEL_PRECISIONS:
+        raise ValueError(f"Unknown YOLO_PRECISION '{precision}' (expected one of {', '.join(MODEL_PRECISIONS)})")
+    return name
+
+
+def resolveModelPath(model_path, models_dir=None):
+    """
+    Validate a model path requested from outside the process.
+
+    Loading .pt weights unpickles them, so only existing models inside the
+    models directory with a known model extension are accepted.
+
+    Args:
+        model_path (str): Requested weights/artifact path (relative paths
+            resolve like YOLO_MODEL_PATH, against the working directory)
+        models_dir (str): Allowed directory; None reads MODEL_DIR (default:
+            the directory of YOLO_MODEL_PATH)
+
+    Returns:
+        str: Resolved absolute model path
+
+    Raises:
+        ValueError: If the path is outside models_dir, has an unknown
+            extension or does not exist
+    """
+    if models_dir is None:
+        models_dir = os.getenv('MODEL_DIR') or os.path.dirname(os.getenv('YOLO_MODEL_PATH', './models/yolo11s.pt'))
+    root = os.path.realpath(models_dir or '.')
+    path = os.path.realpath(model_path)
+
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Model path '{model_path}' is outside the models directory")
+    if not (path.endswith('.pt') or _is_exported_model(path)):
+        raise ValueError(
+            f"Model path '{model_path}' is not a model (.pt, .onnx, .torchscript or *_openvino_model)"
+        )
+    if not os.path.exists(path):
+        raise ValueError(f"Model path '{model_path}' does not exist")
+    return path
+
+
+def resolveImageSize(imgsz=None):
+    """
+    Get the model input size.
+
+    Args:
+        imgsz: Input size in pixels; None reads YOLO_IMGSZ (default 640)
+
+    Returns:
+        int: Input size (multiple of 32)
+
+    Raises:
+        ValueError: If the size is not a positive multiple of 32
+    """
+    size = int(imgsz or os.getenv('YOLO_IMGSZ', DEFAULT_IMGSZ))
+    if size <= 0 or size % 32:
+        raise ValueError(f"YOLO_IMGSZ must be a positive multiple of 32, got {size}")
+    return size
+
+
+def _exported_model_path(model_path, engine, precision='fp32'):
+    """Path the export of model_path for an engine and precision lives at."""
+    stem = os.path.splitext(model_path)[0]
+    if precision == 'int8':
+        stem += '_int8'
+    if engine == 'onnxruntime':
+        return stem + '.onnx'
+    if engine == 'torchscript':
+        return stem + '.torchscript'
+    return stem + '_openvino_model'
+
+
+def _is_exported_model(model_path):
+    """Return the engine for an already exported model path, or None for .pt weights."""
+    if model_path.endswith('.onnx'):
+        return 'onnxruntime'
+    if model_path.endswith('.torchscript'):
+        return 'torchscript'
+    if model_path.rstrip('/\\').endswith('_openvino_model'):
+        return 'openvino'
+    return None
+
+
+def _export_for_engine(model_path, engine, imgsz=DEFAULT_IMGSZ, device='cpu', cache=None):
+    """
+    Export PyTorch weights for a non-torch engine, reusing an earlier export.
+
+    Exports are kept in the artifact cache (MODEL_CACHE_DIR) keyed by the
+    weights' hash, engine, imgsz and device. With the cache disabled
+    (MODEL_CACHE_DIR='') the export lives next to the weights and is reused
+    while it is newer than them.
+
+    Args:
+        model_path: Path to the .pt weights
+        engine: 'torchscript', 'onnxruntime' or 'openvino'
+        imgsz: Export input size
+        device: Device the export is built for (matters for TorchScript)
+        cache: ArtifactCache (None = ArtifactCache.fromEnv())
+
+    Returns:
+        str: Path of the exported model (.torchscript/.onnx file or OpenVINO directory)
+    """
+    from models.artifact_cache import ArtifactCache
+
+    cache = cache if cache is not None else ArtifactCache.fromEnv()
+    if cache is not None:
+        cached_path = cache.lookup(model_path, engine, imgsz, device)
+        if cached_path is not None:
+            logger.info(f"Using cached {engine} model: {cached_path}")
+            _load_stats['artifact_cache'] = 'hit'
+            return cached_path
+        _load_stats['artifact_cache'] = 'miss'
+    else:
+        exported_path = _exported_model_path(model_path, engine)
+        weights_mtime = os.path.getmtime(model_path) if os.path.exists(model_path) else 0
+        if os.path.exists(exported_path) and os.path.getmtime(exported_path) >= weights_mtime:
+            logger.info(f"Using exported {engine} model: {exported_path}")
+            return exported_path
+
+    from ultralytics import YOLO
+
+    export_format = ENGINE_EXPORT_FORMATS[engine]
+    logger.info(f"Exporting {model_path} for {engine} at {imgsz}px (one-time)...")
+
+    start_time = time.time()
+    if engine == 'torchscript':
+        # Traced on the target device; fused Conv+BN like the eager model at predict time
+        exported_path = YOLO(model_path).export(format=export_format, imgsz=imgsz, device=device,
+                                                verbose=False)
+    else:
+        # Dynamic shapes so runInferenceBatch() can send several frames per call
+        exported_path = YOLO(model_path).export(format=export_format, imgsz=imgsz, dynamic=True,
+                                                half=False, verbose=False)
+    export_time = time.time() - start_time
+    _load_stats['export_ms'] = round(export_time * 1000, 1)
+
+    logger.info(f"✅ Exported {engine} model to {exported_path} ({export_time:.1f}s)")
+    if cache is not None:
+        return cache.store(model_path, engine, imgsz, device, exported_path,
+                           {'export_seconds': round(export_time, 2)})
+    return str(exported_path)
+
+
+def _quantized_model_path(model_path, engine, imgsz=DEFAULT_IMGSZ, cache=None):
+    """
+    Find the INT8 model models.quantize built from the current weights.
+
+    Quantized models are kept in the artifact cache under the weights' hash
+    with precision 'int8', so replacing the weights never serves a stale
+    quantized model. With the cache disabled (MODEL_CACHE_DIR='') the model
+    next to the weights is used only while it is newer than them.
+
+    Args:
+        model_path: Path to the .pt weights
+        engine: 'onnxruntime' or 'openvino'
+        imgsz: Input size the model was quantized at
+        cache: ArtifactCache (None = ArtifactCache.fromEnv())
+
+    Returns:
+        str: Path of the INT8 model, or None if there is no current one
+    """
+    from models.artifact_cache import ArtifactCache
+
+    cache = cache if cache is not None else ArtifactCache.fromEnv()
+    if cache is not None:
+        cached_path = cache.lookup(model_path, engine, imgsz, 'cpu', precision='int8')
+        _load_stats['artifact_cache'] = 'hit' if cached_path is not None else 'miss'
+        return cached_path
+
+    quantized_path = _exported_model_path(model_path, engine, 'int8')
+    if not os.path.exists(quantized_path):
+        return None
+    if os.path.exists(model_path) and os.path.getmtime(quantized_path) < os.path.getmtime(model_path):
+        logger.warning(f"INT8 model {quantized_path} is older than {model_path}, ignoring it")
+        return None
+    return quantized_path
+
+
+def loadModel(model_path='yolo11s.pt', device=None, engine=None, precision=None, cache=True, imgsz=None):
     """
     Load YOLO11s model with automatic download and device selection.
 
     This function initializes the YOLO11s model using Ultralytics library.
     The model will auto-download on first run (~21MB). Supports CPU and GPU.
 
+    With engine 'torchscript', 'onnxruntime' or 'openvino' the weights are
+    exported once into the artifact cache (see models.artifact_cache) and
+    later starts load the prebuilt artifact; runInference() returns the same
+    detection dicts for every engine. Load timings are kept in getLoadStats().
+    Precision 'int8' loads the quantized artifact written by
+    `python -m models.quantize`. model_path may also point directly at an
+    exported .onnx file or *_openvino_model directory.
+
     Args:
         model_path: Path to YOLO model file (default: 'yolo11s.pt')
         device: Device to run on ('cpu', 'cuda:0', None=auto-detect)
+        engine: 'torch', 'onnxruntime' or 'openvino' (None = YOLO_ENGINE, default 'torch')
+        precision: 'fp32' or 'int8' (None = YOLO_PRECISION, default 'fp32')
+        cache: Reuse and populate the global model cache; pass False for an
+            independent instance (e.g. one per inference worker thread)
+        imgsz: Input size for export and predict (None = YOLO_IMGSZ, default 640)
 
     Returns:
         YOLO model instance ready for inference
@@ -100,13 +356,24 @@ def loadModel(model_path='yolo11s.pt', device=None):
     Raises:
         Exception: If model download fails or file not found
     """
-    global _yolo_model, _yolo_device
+    global _yolo_model, _yolo_device, _yolo_engine, _yolo_precision, _yolo_imgsz
+
+    exported_engine = _is_exported_model(model_path)
+    engine = exported_engine or resolveEngine(engine)
+    precision = resolvePrecision(precision)
+    imgsz = resolveImageSize(imgsz)
+    if precision == 'int8' and engine not in INT8_ENGINES:
+        raise ValueError("YOLO_PRECISION=int8 needs YOLO_ENGINE=onnxruntime or openvino")
 
     # Return cached model if already loaded
-    if _yolo_model is not None:
+    if (cache and _yolo_model is not None and _yolo_engine == engine and _yolo_precision == precision
+            and _yolo_imgsz == imgsz):
         logger.debug("Using cached YOLO model")
         return _yolo_model
 
+    load_start = time.time()
+    _load_stats.clear()
+
     logger.info("=" * 60)
     logger.info("Loading YOLO11s Model")
     logger.info("=" * 60)
@@ -116,6 +383,8 @@ def loadModel(model_path='yolo11s.pt', device=None):
         from ultralytics import YOLO
         import torch
 
+        _load_stats['import_ms'] = round((time.time() - load_start) * 1000, 1)
+
         # Auto-detect device if not specified
         if device is None:
             if torch.cuda.is_available():
@@ -130,10 +399,24 @@ def loadModel(model_path='yolo11s.pt', device=None):
         _yolo_device = device
 
         # Load YOLO model (will auto-download if not present)
-        logger.info(f"Loading model from: {model_path}")
+        logger.info(f"Loading model from: {model_path} (engine: {engine}, precision: {precision})")
 
         try:
-            model = YOLO(model_path)
+            if engine == 'torch':
+                model = YOLO(model_path)
+            elif exported_engine is not None:
+                model = YOLO(model_path, task='detect')
+            elif precision == 'int8':
+                quantized_path = _quantized_model_path(model_path, engine, imgsz)
+                if quantized_path is None:
+                    raise FileNotFoundError(
+                        f"No INT8 model for the current {model_path} "
+                        f"(create it with: python -m models.quantize --engine {engine} "
+                        f"--model {model_path} --imgsz {imgsz} --calibration-dir <frames>)"
+                    )
+                model = YOLO(quantized_path, task='detect')
+            else:
+                model = YOLO(_export_for_engine(model_path, engine, imgsz, device), task='detect')
             logger.info("✅ Model loaded successfully")
 
         except Exception as download_error:
@@ -151,37 +434,58 @@ def loadModel(model_path='yolo11s.pt', device=None):
             logger.error(f"❌ Model file not found: {model_path}")
             raise FileNotFoundError(f"Model file not found: {model_path}")
 
-        # Move model to specified device
-        try:
-            model.to(device)
-            logger.info(f"✅ Model moved to device: {device}")
-        except Exception as device_error:
-            logger.warning(f"⚠️  Could not move model to {device}: {device_error}")
-            logger.warning("   Falling back to CPU")
-            device = 'cpu'
-            _yolo_device = device
-            model.to(device)
+        # Move model to specified device (exported engines select their own device)
+        if engine == 'torch':
+            try:
+                model.to(device)
+                logger.info(f"✅ Model moved to device: {device}")
+            except Exception as device_error:
+                logger.warning(f"⚠️  Could not move model to {device}: {device_error}")
+                logger.warning("   Falling back to CPU")
+                device = 'cpu'
+                _yolo_device = device
+                model.to(device)
+        else:
+            logger.info(f"✅ Running inference through {engine}")
+
+        # Every predict() call uses the input size the artifact was built for
+        model.overrides['imgsz'] = imgsz
 
         # Warm up model with dummy inference
         logger.info("Warming up model with dummy inference...")
-        dummy_frame = np.zeros((640, 640, 3), dtype=np.uint8)
+        dummy_frame = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
 
         start_time = time.time()
         _ = model.predict(dummy_frame, verbose=False)
         warmup_time = (time.time() - start_time) * 1000
 
+        _load_stats.update({
+            'engine': engine,
+            'precision': precision,
+            'imgsz': imgsz,
+            'device': device,
+            'warmup_ms': round(warmup_time, 1),
+            'load_ms': round((time.time() - load_start) * 1000, 1),
+        })
         logger.info(f"✅ Model warmup complete ({warmup_time:.0f}ms)")
-        logger.info(f"📊 Model info: YOLO11s, {len(model.names)} classes")
+        logger.info(f"📊 Model info: YOLO11s, {len(model.names)} classes, engine {engine} ({precision}, {imgsz}px)")
+        logger.info(f"⏱️  Model ready in {_load_stats['load_ms'] / 1000:.2f}s")
         logger.info("=" * 60)
 
         # Cache model globally
-        _yolo_model = model
+        if cache:
+            _yolo_model = model
+            _yolo_engine = engine
+            _yolo_precision = precision
+            _yolo_imgsz = imgsz
 
         return model
 
     except ImportError as e:
         logger.error(f"❌ Required library not found: {e}")
         logger.error("   Install with: pip install ultralytics torch torchvision")
+        if engine != 'torch':
+            logger.error(f"   The {engine} engine also needs: pip install {engine}")
         raise
 
     except Exception as e:
@@ -189,7 +493,7 @@ def loadModel(model_path='yolo11s.pt', device=None):
         raise
 
 
-def runInference(model, frame, confidence_threshold=0.7):
+def runInference(model, frame, confidence_threshold=0.7, classes=None, imgsz=None):
     """
     Run YOLO inference on a single frame.
 
@@ -198,11 +502,16 @@ def runInference(model, frame, confidence_threshold=0.7):
 
     Args:
         model: YOLO model instance from loadModel()
-        frame: OpenCV frame (numpy array, RGB format, shape: H x W x 3)
+        frame: Frame or OpenCV frame (numpy array, BGR format, shape: H x W x 3).
+            Ultralytics treats numpy input as BGR; RGB-tagged Frames are converted.
         confidence_threshold: Minimum confidence score (0.0-1.0, default: 0.7)
+        classes: Optional class IDs to keep (e.g. getClassFilter()); other
+            classes are dropped before NMS
+        imgsz: Optional input size for this call (default: the size the model
+            was loaded with, see loadModel())
 
     Returns:
-        List of detections, each containing:
+        Detections (columnar; iterates and indexes as detection dicts), each containing:
         {
             'class_id': int (COCO class ID, e.g., 47 for apple),
             'class_name': str (COCO class name, e.g., 'apple'),
@@ -212,7 +521,7 @@ def runInference(model, frame, confidence_threshold=0.7):
 
     Example:
         >>> detections = runInference(model, frame, 0.7)
-        >>> print(detections)
+        >>> print(detections.toList())
         [
             {'class_id': 47, 'class_name': 'apple', 'confidence': 0.92, 'bbox': [123, 56, 234, 178]},
             {'class_id': 46, 'class_name': 'banana', 'confidence': 0.85, 'bbox': [300, 100, 400, 250]}
@@ -222,38 +531,24 @@ def runInference(model, frame, confidence_threshold=0.7):
         # Start inference timer
         start_time = time.time()
 
+        # Ultralytics expects BGR numpy input; only RGB-tagged frames are converted
+        source = toColorSpace(frame, BGR)
+
         # Run YOLO prediction
+        predict_kwargs = {'imgsz': imgsz} if imgsz is not None else {}
         results = model.predict(
-            frame,
+            source,
             verbose=False,
             conf=confidence_threshold,
-            iou=0.45
+            iou=0.45,
+            classes=classes,
+            **predict_kwargs
         )
 
         inference_time = (time.time() - start_time) * 1000
 
-        # Extract detections from results
-        detections = []
-
-        if results and len(results) > 0:
-            boxes = results[0].boxes
-
-            for box in boxes:
-                # Extract box data
-                class_id = int(box.cls[0].item())
-                confidence = float(box.conf[0].item())
-                bbox = box.xyxy[0].tolist()  # [x1, y1, x2, y2]
-                class_name = model.names[class_id]
-
-                # Create detection object
-                detection = {
-                    'class_id': class_id,
-                    'class_name': class_name,
-                    'confidence': round(confidence, 3),
-                    'bbox': [round(coord, 1) for coord in bbox]
-                }
-
-                detections.append(detection)
+        # Extract detections from results (bulk numpy conversion)
+        detections = Detections.fromResult(results[0], model.names) if results else Detections.empty(model.names)
 
         # Log detection results
         logger.debug(f"Detected {len(detections)} objects in frame ({inference_time:.0f}ms)")
@@ -266,22 +561,96 @@ def runInference(model, frame, confidence_threshold=0.7):
 
     except Exception as e:
         logger.error(f"❌ Inference error: {e}")
-        return []
+        return Detections.empty()
+
+
+def runInferenceBatch(model, frames, confidence_threshold=0.7, max_batch_size=8, classes=None):
+    """
+    Run YOLO inference on several frames with batched forward passes.
+
+    Frames (e.g. from multiple cameras or a burst capture) are split into
+    chunks of at most max_batch_size and each chunk goes through a single
+    model.predict call, amortizing per-call framework overhead.
+
+    Args:
+        model: YOLO model instance from loadModel()
+        frames: Sequence of Frames or OpenCV frames (numpy arrays, BGR)
+        confidence_threshold: Minimum confidence score (0.0-1.0, default: 0.7)
+        max_batch_size: Max frames per forward pass (default: 8)
+        classes: Optional class IDs to keep (e.g. getClassFilter())
+
+    Returns:
+        tuple: (detections_per_frame, timing)
+            detections_per_frame: One Detections per input frame, in input
+                order (empty if its batch failed)
+            timing: {
+                'frames': int,
+                'batches': int,
+                'batch_ms': [float, ...] (latency of each forward pass),
+                'total_ms': float,
+                'per_frame_ms': float (total_ms / frames)
+            }
+
+    Example:
+        >>> detections, timing = runInferenceBatch(model, [frame_a, frame_b], 0.3)
+        >>> len(detections), timing['per_frame_ms']
+        (2, 41.7)
+    """
+    frames = list(frames)
+    max_batch_size = max(1, int(max_batch_size))
+    detections_per_frame = []
+    batch_ms = []
+
+    for start in range(0, len(frames), max_batch_size):
+        batch = [toColorSpace(frame, BGR) for frame in frames[start:start + max_batch_size]]
+
+        batch_start = time.time()
+        try:
+            results = model.predict(
+                batch,
+                verbose=False,
+                conf=confidence_threshold,
+                iou=0.45,
+                classes=classes
+            )
+            batch_detections = [Detections.fromResult(result, model.names) for result in results]
+        except Exception as e:
+            logger.error(f"❌ Batch inference error ({len(batch)} frames): {e}")
+            batch_detections = [Detections.empty(model.names) for _ in batch]
+        batch_ms.append(round((time.time() - batch_start) * 1000, 1))
+
+        detections_per_frame.extend(batch_detections)
+
+    total_ms = round(sum(batch_ms), 1)
+    timing = {
+        'frames': len(frames),
+        'batches': len(batch_ms),
+        'batch_ms': batch_ms,
+        'total_ms': total_ms,
+        'per_frame_ms': round(total_ms / len(frames), 1) if frames else 0.0,
+    }
+
+    logger.debug(
+        f"Batch inference: {timing['frames']} frames in {timing['batches']} batches "
+        f"({total_ms:.0f}ms total, {timing['per_frame_ms']:.0f}ms/frame)"
+    )
+
+    return detections_per_frame, timing
 
 
 def getProductFromClass(class_id, mapping):
     """
     Map COCO class ID to ShopShadow product.
 
-    Looks up a COCO class ID in the mapping dictionary and returns
-    corresponding product details if mapped.
+    Thin wrapper over ProductLookup.lookup() for the compiled mapping
+    loadMapping() returns; plain mapping dicts are looked up by string key.
 
     Args:
         class_id: COCO class ID (int, e.g., 47 for apple)
-        mapping: COCO to product mapping dictionary (from loadMapping())
+        mapping: COCO to product mapping (ProductLookup from loadMapping(), or dict)
 
     Returns:
-        Product dictionary if mapped, None otherwise:
+        Product record if mapped, None otherwise:
         {
             'product_id': str (e.g., 'P001'),
             'product_name': str (e.g., 'Organic Apples'),
@@ -298,15 +667,9 @@ def getProductFromClass(class_id, mapping):
         >>> print(product)
         None
     """
-    class_id_str = str(class_id)
-
-    if class_id_str in mapping:
-        product = mapping[class_id_str]
-        logger.debug(f"Mapped COCO class {class_id} ({product['coco_name']}) -> {product['product_id']}")
-        return product
-    else:
-        logger.debug(f"COCO class {class_id} not mapped to any product")
-        return None
+    if isinstance(mapping, ProductLookup):
+        return mapping.lookup(class_id)
+    return mapping.get(str(class_id))
 
 
 def loadMapping(mapping_path='config/coco_to_products.json'):
@@ -315,13 +678,15 @@ def loadMapping(mapping_path='config/coco_to_products.json'):
 
     Loads and caches the mapping configuration that connects COCO class IDs
     to ShopShadow product IDs. The mapping is cached globally to avoid
-    repeated file reads.
+    repeated file reads, and compiled into a read-only ProductLookup
+    (array-indexed product records and a mapped-class bitmask).
 
     Args:
         mapping_path: Path to JSON mapping file (relative to flask-detection/)
 
     Returns:
-        Dictionary mapping COCO class IDs (as strings) to product details
+        ProductLookup: Read-only dict mapping COCO class IDs (as strings) to
+            product details
 
     Raises:
         FileNotFoundError: If mapping file not found
@@ -337,22 +702,29 @@ def loadMapping(mapping_path='config/coco_to_products.json'):
             }
         }
     """
-    global _coco_mapping
+    global _coco_mapping, _coco_mapping_path, _coco_mapping_mtime
 
-    # Return cached mapping if already loaded
+    # Return cached mapping if already loaded and the file is unchanged
     if _coco_mapping is not None:
-        logger.debug("Using cached COCO mapping")
-        return _coco_mapping
+        if not _mapping_file_changed():
+            logger.debug("Using cached COCO mapping")
+            return _coco_mapping
+        logger.info("COCO mapping file changed, reloading")
 
-    try:
-        # Build full path relative to this file
-        base_dir = os.path.dirname(os.path.dirname(__file__))
-        full_path = os.path.join(base_dir, mapping_path)
+    # Build full path relative to this file
+    base_dir = os.path.dirname(os.path.dirname(__file__))
+    full_path = _coco_mapping_path or os.path.join(base_dir, mapping_path)
 
+    try:
         logger.info(f"Loading COCO mapping from: {full_path}")
 
+        mtime = os.path.getmtime(full_path)
         with open(full_path, 'r') as f:
-            _coco_mapping = json.load(f)
+            mapping = ProductLookup(json.load(f))
+
+        _coco_mapping = mapping
+        _coco_mapping_path = full_path
+        _coco_mapping_mtime = mtime
 
         logger.info(f"✅ Loaded COCO mapping with {len(_coco_mapping)} classes")
 
@@ -364,11 +736,18 @@ def loadMapping(mapping_path='config/coco_to_products.json'):
 
     except FileNotFoundError:
         logger.error(f"❌ COCO mapping file not found: {full_path}")
+        if _coco_mapping is not None:
+            logger.warning("   Keeping previously loaded mapping")
+            return _coco_mapping
         logger.error("   Create the file: flask-detection/config/coco_to_products.json")
         raise
 
     except json.JSONDecodeError as e:
         logger.error(f"❌ Invalid JSON in mapping file: {e}")
+        if _coco_mapping is not None:
+            # Likely caught mid-edit; retry on the next call
+            logger.warning("   Keeping previously loaded mapping")
+            return _coco_mapping
         raise
 
     except Exception as e:
@@ -376,27 +755,522 @@ def loadMapping(mapping_path='config/coco_to_products.json'):
         raise
 
 
+def _mapping_file_changed():
+    """Return True if the cached mapping file was modified since it was loaded."""
+    if _coco_mapping_path is None:
+        return False
+    try:
+        return os.path.getmtime(_coco_mapping_path) != _coco_mapping_mtime
+    except OSError:
+        return False
+
+
+def getClassFilter(mapping=None):
+    """
+    Get the COCO class IDs that map to products, for predict(classes=...).
+
+    Restricting inference to mapped classes drops people, carts, hands and
+    other unmapped classes before NMS instead of after routing. The filter
+    follows the current mapping: with mapping=None, loadMapping() is consulted
+    and picks up edits to the mapping file.
+
+    Args:
+        mapping: COCO to product mapping (None = current loadMapping())
+
+    Returns:
+        list: Sorted class IDs, or None (no filter) if the mapping is empty
+    """
+    global _class_filter, _class_filter_source
+
+    if mapping is None:
+        mapping = loadMapping()
+
+    if mapping is not _class_filter_source:
+        class_ids = list(ProductLookup.compile(mapping).class_ids)
+        _class_filter = class_ids or None
+        _class_filter_source = mapping
+        logger.debug(f"Class filter: {_class_filter}")
+
+    return _class_filter
+
+
+def getLoadStats():
+    """
+    Get cold start timings of the last loadModel() call.
+
+    Returns:
+        dict: import_ms, export_ms (only when an export ran), warmup_ms,
+            load_ms (total), artifact_cache ('hit'/'miss' for exported
+            engines), engine, precision, imgsz and device
+    """
+    return dict(_load_stats)
+
+
 def clearCache():
     """
     Clear cached model and mapping.
     Useful for testing or reloading with different configurations.
     """
-    global _yolo_model, _yolo_device, _coco_mapping
+    global _yolo_model, _yolo_device, _yolo_engine, _yolo_precision, _yolo_imgsz
+    global _coco_mapping, _coco_mapping_path, _coco_mapping_mtime, _class_filter, _class_filter_source
 
     _yolo_model = None
     _yolo_device = None
+    _yolo_engine = None
+    _yolo_precision = None
+    _yolo_imgsz = None
+    _load_stats.clear()
     _coco_mapping = None
+    _coco_mapping_path = None
+    _coco_mapping_mtime = None
+    _class_filter = None
+    _class_filter_source = None
 
     logger.info("Cleared YOLO model and mapping cache")
 
 
+def _publish_model(model, load_stats):
+    """Make a hot-swapped model the globally cached one (for loadModel() callers)."""
+    global _yolo_model, _yolo_engine, _yolo_precision, _yolo_imgsz
+
+    _yolo_model = model
+    _yolo_engine = load_stats.get('engine', _yolo_engine)
+    _yolo_precision = load_stats.get('precision', _yolo_precision)
+    _yolo_imgsz = load_stats.get('imgsz', _yolo_imgsz)
+
+
+def requestModelSwap(request_file='model_reload.json', model_path=None, engine=None, precision=None,
+                     reason='api'):
+    """
+    Ask every running ModelManager (possibly in other processes) to reload.
+
+    Atomically replaces request_file with a request carrying a new id; each
+    manager compares the id with the last one it handled, so the main process
+    and all inference workers pick up the same request.
+
+    Args:
+        request_file (str): Swap request file (MODEL_RELOAD_FILE)
+        model_path (str): New weights/artifact path (None = keep current)
+        engine (str): New inference engine (None = keep current)
+        precision (str): New precision (None = keep current)
+        reason (str): Why the reload was requested (logged)
+
+    Returns:
+        int: Request id
+    """
+    request_id = time.time_ns()
+    directory = os.path.dirname(request_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{request_file}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'id': request_id,
+            'reason': reason,
+            'model_path': model_path,
+            'engine': engine,
+            'precision': precision,
+        }, f)
+    os.replace(tmp_path, request_file)
+
+    return request_id
+
+
+class ModelManager:
+    """
+    Hot-swappable model reference.
+
+    A reload loads and warms up the new model on a background thread while
+    inference keeps using the current one, then swaps the reference under a
+    lock. Inference borrows a model with use(); a replaced model is kept until
+    every use() that started before the swap has finished.
+
+    Reloads are triggered by poll() (called once per loop iteration) when the
+    weights file changes and stays unchanged for settle seconds, or when
+    requestModelSwap() writes a new request (HTTP endpoint, SIGHUP).
+
+    Usage:
+        manager = ModelManager.fromEnv()
+        manager.load()
+        while True:
+            manager.poll()
+            with manager.use() as model:
+                processFrame(frame, model)
+
+    Slots give each inference worker thread its own instance (Ultralytics
+    predictors are not thread-safe); slot 0 is the globally cached model.
+    """
+
+    def __init__(self, model_path='yolo11s.pt', device=None, engine=None, precision=None, imgsz=None,
+                 watch=True, settle=2.0, request_file='model_reload.json', loader=None):
+        """
+        Initialize model manager.
+
+        Args:
+            model_path: Path to YOLO model file (weights or exported artifact)
+            device: Device to run on (None = auto-detect)
+            engine: Inference engine (None = YOLO_ENGINE)
+            precision: 'fp32' or 'int8' (None = YOLO_PRECISION)
+            imgsz: Input size (None = YOLO_IMGSZ)
+            watch (bool): Reload when the model file changes
+            settle (float): Seconds a changed file must stay unchanged before
+                reloading (avoids loading a half-copied file)
+            request_file (str): File written by requestModelSwap() (None = ignore requests)
+            loader: Callable (model_path, device, engine, precision, cache, imgsz) -> model
+                (default loadModel)
+        """
+        self.model_path = model_path
+        self.device = device
+        self.engine = engine
+        self.precision = precision
+        self.imgsz = imgsz
+        self.watch = watch
+        self.settle = float(settle)
+        self.request_file = request_file
+        self.loader = loader or loadModel
+
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._models = {}
+        self._in_use = {}
+        self._retiring = {}
+        self._swap_thread = None
+        self._queued_swap = None
+
+        self._file_mtime = None
+        self._changed_mtime = None
+        self._changed_at = None
+        self._request_mtime = None
+        self._request_id = None
+
+        self.swaps = 0
+        self.failed_swaps = 0
+        self.last_swap_ms = None
+
+    @classmethod
+    def fromEnv(cls, model_path='yolo11s.pt', device=None):
+        """
+        Build a manager from environment variables.
+
+        Returns:
+            ModelManager: Manager watching the model file unless MODEL_WATCH_ENABLED
+                is 'false', and reading reload requests from MODEL_RELOAD_FILE
+        """
+        return cls(
+            model_path=model_path,
+            device=device,
+            watch=os.getenv('MODEL_WATCH_ENABLED', 'true').lower() == 'true',
+            settle=float(os.getenv('MODEL_WATCH_SETTLE', 2.0)),
+            request_file=os.getenv('MODEL_RELOAD_FILE', 'model_reload.json') or None,
+        )
+
+    def _load_instance(self, slot, model_path, engine, precision):
+        # Slot 0 goes through the global cache on the first load only, so a
+        # reload never hands back the model it is replacing
+        cache = slot == 0 and self._generation == 0 and not self._models
+        return self.loader(model_path, self.device, engine, precision, cache=cache, imgsz=self.imgsz)
+
+    def load(self):
+        """
+        Load the initial model (blocking).
+
+        Returns:
+            The slot 0 model
+        """
+        model = self._load_instance(0, self.model_path, self.engine, self.precision)
+        with self._lock:
+            self._models = {0: model}
+            self._in_use.setdefault(self._generation, 0)
+        self._file_mtime = self._model_mtime()
+        self._request_id = self._read_request().get('id') if self.request_file else None
+        return model
+
+    @property
+    def generation(self):
+        """Number of completed swaps since load()."""
+        return self._generation
+
+    @contextmanager
+    def use(self, slot=0):
+        """
+        Borrow the current model for one inference.
+
+        Args:
+            slot (int): Worker slot; a slot's model is loaded on first use
+
+        Yields:
+            Model instance that stays valid until the block exits
+        """
+        with self._lock:
+            generation = self._generation
+            model = self._models.get(slot)
+            self._in_use[generation] = self._in_use.get(generation, 0) + 1
+
+        try:
+            if model is None:
+                # First use of this worker slot: load its own instance
+                model = self._load_instance(slot, self.model_path, self.engine, self.precision)
+                with self._lock:
+                    if generation == self._generation:
+                        model = self._models.setdefault(slot, model)
+            yield model
+        finally:
+            with self._lock:
+                self._in_use[generation] -= 1
+                if generation in self._retiring and self._in_use[generation] == 0:
+                    self._retire(generation)
+
+    def _retire(self, generation):
+        """Drop a replaced generation once nothing uses it (lock held)."""
+        self._retiring.pop(generation, None)
+        self._in_use.pop(generation, None)
+        logger.info(f"Released model generation {generation}")
+
+    def _model_mtime(self):
+        try:
+            return os.path.getmtime(self.model_path)
+        except OSError:
+            return None
+
+    def _read_request(self):
+        try:
+            with open(self.request_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def poll(self):
+        """
+        Check for reload triggers; starts a background reload if one fired.
+
+        Cheap (two stat() calls), meant to run once per loop iteration.
+
+        Returns:
+            bool: True if a reload was started
+        """
+        if self.request_file:
+            try:
+                request_mtime = os.path.getmtime(self.request_file)
+            except OSError:
+                request_mtime = None
+            if request_mtime is not None and request_mtime != self._request_mtime:
+                self._request_mtime = request_mtime
+                request = self._read_request()
+                if request.get('id') is not None and request.get('id') != self._request_id:
+                    self._request_id = request['id']
+                    return self.requestSwap(
+                        request.get('model_path'), request.get('engine'), request.get('precision'),
+                        reason=request.get('reason') or 'request',
+                    )
+
+        if self.watch:
+            mtime = self._model_mtime()
+            if mtime is not None and self._file_mtime is not None and mtime != self._file_mtime:
+                now = time.time()
+                if mtime != self._changed_mtime:
+                    self._changed_mtime = mtime
+                    self._changed_at = now
+                elif now - self._changed_at >= self.settle:
+                    self._file_mtime = mtime
+                    self._changed_mtime = None
+                    return self.requestSwap(reason='file change')
+
+        return False
+
+    def requestSwap(self, model_path=None, engine=None, precision=None, reason='manual'):
+        """
+        Start loading a new model in the background.
+
+        Requests made while a reload is running are queued (latest wins) and
+        run once it finishes.
+
+        Args:
+            model_path: New model path (None = keep current)
+            engine: New engine (None = keep current)
+            precision: New precision (None = keep current)
+            reason (str): Logged trigger
+
+        Returns:
+            bool: True if the reload started now, False if it was queued
+        """
+        request = (model_path or self.model_path, engine or self.engine, precision or self.precision, reason)
+        with self._lock:
+            if self._swap_thread is not None and self._swap_thread.is_alive():
+                self._queued_swap = request
+                logger.info(f"Model reload ({reason}) queued behind the running reload")
+                return False
+            self._swap_thread = threading.Thread(target=self._swap, args=request, name='ModelManager-swap',
+                                                 daemon=True)
+            self._swap_thread.start()
+        return True
+
+    def _swap(self, model_path, engine, precision, reason):
+        logger.info(f"Reloading model ({reason}): {model_path}")
+        start_time = time.time()
+
+        try:
+            with self._lock:
+                slots = sorted(self._models) or [0]
+            # loadModel() warms every instance up before it is published
+            models = {0: self._load_instance(0, model_path, engine, precision)}
+            load_stats = getLoadStats()
+            for slot in slots:
+                if slot != 0:
+                    models[slot] = self._load_instance(slot, model_path, engine, precision)
+        except Exception as e:
+            self.failed_swaps += 1
+            logger.error(f"Model reload failed, keeping current model: {e}")
+            models = None
+
+        with self._lock:
+            if models is not None:
+                old_generation = self._generation
+                self._generation += 1
+                self._models = models
+                self._in_use.setdefault(self._generation, 0)
+                self.model_path, self.engine, self.precision = model_path, engine, precision
+                self.swaps += 1
+                self.last_swap_ms = round((time.time() - start_time) * 1000, 1)
+                _publish_model(models[0], load_stats)
+
+                if self._in_use.get(old_generation, 0):
+                    self._retiring[old_generation] = True
+                else:
+                    self._retire(old_generation)
+                logger.info(f"✅ Swapped to model generation {self._generation} ({self.last_swap_ms:.0f}ms)")
+
+            queued, self._queued_swap = self._queued_swap, None
+            if queued is not None:
+                self._swap_thread = threading.Thread(target=self._swap, args=queued, name='ModelManager-swap',
+                                                     daemon=True)
+                self._swap_thread.start()
+
+        if models is not None:
+            self._file_mtime = self._model_mtime()
+
+    def waitForSwap(self, timeout=None):
+        """Block until a running reload (and any queued one) has finished."""
+        while True:
+            thread = self._swap_thread
+            if thread is None or not thread.is_alive():
+                return
+            thread.join(timeout)
+            if timeout is not None and thread.is_alive():
+                return
+
+    def getStats(self):
+        """
+        Get manager counters.
+
+        Returns:
+            dict: Generation, swap counts, last swap time, loaded slots and
+                generations still in use
+        """
+        with self._lock:
+            return {
+                'generation': self._generation,
+                'model_path': self.model_path,
+                'swaps': self.swaps,
+                'failed_swaps': self.failed_swaps,
+                'last_swap_ms': self.last_swap_ms,
+                'slots': len(self._models),
+                'swapping': self._swap_thread is not None and self._swap_thread.is_alive(),
+                'retiring': sorted(self._retiring),
+            }
+
+
+def runInferenceWorker(ring_name, requests, results, confidence_threshold=0.3,
+                       model_path='yolo11s.pt', device=None, reader_id=0, stop_event=None):
+    """
+    Process target: run inference on frames read from a shared-memory frame ring.
+
+    Loads its own model, then serves requests from the parent. Each request is
+    the last frame sequence the parent has seen; the worker waits for a newer
+    frame, reads it as a zero-copy view of the ring slot and posts
+    (frame_seq, timestamp_ns, detections, inference_ms) to results.
+    detections is None when the motion gate (MOTION_GATE_ENABLED) skipped the
+    frame. The DETECTION_ROI crop is applied before gating and inference, and
+    boxes are returned in full-frame coordinates. Unless YOLO_CLASS_FILTER is
+    'false', only mapped classes are decoded (see getClassFilter()). The model
+    is hot-swapped on reload requests (see ModelManager). A None request or
+    stop_event stops the worker, also while it waits for a frame from a
+    producer that has already exited.
+
+    Args:
+        ring_name: Name of the SharedFrameRing created by the parent
+        requests: multiprocessing.Queue of frame sequence numbers (None = stop)
+        results: multiprocessing.Queue receiving result tuples
+        confidence_threshold: Minimum confidence passed to runInference()
+        model_path: Path to YOLO model file
+        device: Device to run on (None = auto-detect)
+        reader_id: Reader slot to pin frames with
+        stop_event: multiprocessing.Event set by the parent on shutdown
+    """
+    from camera.frame import Frame
+    from camera.frame_bus import SharedFrameRing
+    from detection.motion import MotionGate
+    from detection.roi import RegionOfInterest
+
+    ring = SharedFrameRing.attach(ring_name)
+    model_manager = ModelManager.fromEnv(model_path, device)
+    model_manager.load()
+    motion_gate = MotionGate.fromEnv()
+    roi = RegionOfInterest.fromEnv()
+    class_filter_enabled = os.getenv('YOLO_CLASS_FILTER', 'true').lower() == 'true'
+
+    logger.info(f"Inference worker ready on frame bus {ring_name}")
+
+    try:
+        while True:
+            after_seq = requests.get()
+            if after_seq is None:
+                break
+            model_manager.poll()
+
+            view = None
+            while view is None and not (stop_event is not None and stop_event.is_set()):
+                view, frame_seq, timestamp_ns = ring.acquire(reader_id, after_seq, timeout=1.0)
+            if view is None:
+                break
+
+            try:
+                frame = Frame(view, BGR)
+                offset = (0, 0)
+                if roi is not None:
+                    frame, offset = roi.crop(frame)
+
+                if motion_gate is not None and not motion_gate.check(frame):
+                    results.put((frame_seq, timestamp_ns, None, 0.0))
+                    continue
+
+                start_time = time.time()
+                classes = getClassFilter() if class_filter_enabled else None
+                with model_manager.use() as model:
+                    detections = runInference(model, frame, confidence_threshold, classes)
+                if roi is not None:
+                    detections = roi.mapDetections(detections, offset)
+                inference_ms = (time.time() - start_time) * 1000
+
+                if motion_gate is not None:
+                    motion_gate.storeResult(detections)
+
+                results.put((frame_seq, timestamp_ns, detections, inference_ms))
+            finally:
+                view = None
+                ring.release(reader_id)
+    finally:
+        logger.info(f"Inference worker stopped ({ring.getStats()})")
+        ring.close()
+
+
 # Module-level convenience functions for backward compatibility
 def detect_objects(frame, confidence_threshold=0.7):
     """
     Convenience function to detect objects without creating YOLODetector instance.
 
     Args:
-        frame: OpenCV frame (numpy array, RGB format)
+        frame: Frame or OpenCV frame (numpy array, BGR format)
         confidence_threshold: Minimum confidence (0.0-1.0)
 
     Returns:
@@ -0,0 +1,118 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from detection import detector  # noqa: E402
+from detection.aggregator import BASKET, HOLD, PENDING, ConfidenceAggregator  # noqa: E402
+from detection.tracker import ObjectTracker  # noqa: E402
+
+
+def _det(confidence, class_id=47, x=10):
+    return {'class_id': class_id, 'confidence': confidence, 'bbox': [x, 10, x + 40, 50]}
+
+
+def _feed(aggregator, key, confidences):
+    decisions = []
+    for confidence in confidences:
+        aggregator.observe([key], [confidence])
+        decisions.append(int(aggregator.decide([key])[0]))
+    return decisions
+
+
+def test_vote_promotes_after_k_confident_frames():
+    aggregator = ConfidenceAggregator(method='vote', window=5, votes=3)
+
+    # One blurry frame does not decide anything
+    assert _feed(aggregator, 1, [0.5, 0.9, 0.85, 0.8]) == [HOLD, HOLD, HOLD, BASKET]
+
+
+def test_vote_sends_to_pending_only_when_window_fills():
+    aggregator = ConfidenceAggregator(method='vote', window=3, votes=2)
+
+    assert _feed(aggregator, 1, [0.5, 0.9, 0.55]) == [HOLD, HOLD, PENDING]
+
+
+def test_ema_smooths_single_frame_dip():
+    aggregator = ConfidenceAggregator(method='ema', window=4, votes=2, alpha=0.5)
+
+    assert _feed(aggregator, 1, [0.9, 0.6]) == [HOLD, BASKET]
+    assert _feed(aggregator, 2, [0.4, 0.5, 0.6, 0.5]) == [HOLD, HOLD, HOLD, PENDING]
+
+
+def test_ring_buffer_keeps_only_last_window():
+    aggregator = ConfidenceAggregator(method='vote', window=3, votes=3)
+    assert _feed(aggregator, 1, [0.4, 0.9, 0.9]) == [HOLD, HOLD, PENDING]
+
+    # Overwrites the oldest (0.4) slot
+    assert _feed(aggregator, 1, [0.9]) == [BASKET]
+
+
+def test_forget_and_row_reuse_grow_capacity():
+    aggregator = ConfidenceAggregator(method='vote', window=2, votes=1, capacity=2)
+    aggregator.observe([1, 2, 3], [0.9, 0.9, 0.9])
+    assert list(aggregator.decide([1, 2, 3, 4])) == [BASKET, BASKET, BASKET, HOLD]
+
+    aggregator.forget([1])
+    assert aggregator.decide([1])[0] == HOLD
+    assert aggregator.getStats()['keys'] == 2
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        ConfidenceAggregator(method='median')
+    with pytest.raises(ValueError):
+        ConfidenceAggregator(window=3, votes=4)
+
+
+def test_tracker_waits_for_evidence_before_routing():
+    aggregator = ConfidenceAggregator(method='vote', window=3, votes=2)
+    tracker = ObjectTracker(min_hits=1, aggregator=aggregator)
+
+    # Blurry first frame: no pending round trip
+    assert tracker.update([], [_det(0.5)]) == ([], [])
+    assert tracker.update([_det(0.9)]) == ([], [])
+    new_basket, new_pending = tracker.update([_det(0.88)])
+    assert [d['track_id'] for d in new_basket] == [1]
+    assert new_pending == []
+
+    # Routed once
+    assert tracker.update([_det(0.9)]) == ([], [])
+
+
+def test_tracker_forgets_deleted_tracks():
+    aggregator = ConfidenceAggregator(method='vote', window=3, votes=2)
+    tracker = ObjectTracker(min_hits=1, max_age=0, aggregator=aggregator)
+
+    tracker.update([_det(0.9)])
+    tracker.update([])
+
+    assert aggregator.getStats()['keys'] == 0
+
+
+def test_route_detections_aggregates_per_class_without_tracker(monkeypatch):
+    product = {'product_id': 'P001', 'product_name': 'Organic Apples'}
+    monkeypatch.setattr(detector, 'getProductFromClass', lambda class_id, mapping: product)
+    aggregator = ConfidenceAggregator(method='vote', window=3, votes=1)
+
+    first = detector.routeDetections([], [_det(0.5)], {}, 'device-1', aggregator=aggregator)
+    second = detector.routeDetections([_det(0.9), _det(0.92, x=100)], [], {}, 'device-1', aggregator=aggregator)
+
+    assert first == ([], [])
+    assert [p['quantity'] for p in second[0]] == [2]
+    assert second[1] == []
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv('CONFIDENCE_AGGREGATION', raising=False)
+    assert ConfidenceAggregator.fromEnv() is None
+
+    monkeypatch.setenv('CONFIDENCE_AGGREGATION', 'ema')
+    monkeypatch.setenv('CONFIDENCE_WINDOW', '4')
+    monkeypatch.setenv('CONFIDENCE_VOTES', '2')
+    aggregator = ConfidenceAggregator.fromEnv(confidence_threshold=0.8)
+    assert (aggregator.method, aggregator.window, aggregator.votes) == ('ema', 4, 2)
+    assert aggregator.confidence_threshold == 0.8
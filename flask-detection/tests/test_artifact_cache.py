@@ -0,0 +1,136 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from models import artifact_cache, yolo_detector  # noqa: E402
+from models.artifact_cache import ArtifactCache, artifactKey, hashModelFile  # noqa: E402
+
+
+@pytest.fixture
+def weights(tmp_path):
+    path = tmp_path / 'yolo11s.pt'
+    path.write_bytes(b'weights-v1')
+    return str(path)
+
+
+def _export(tmp_path, name='yolo11s.onnx'):
+    path = tmp_path / name
+    path.write_bytes(b'onnx')
+    return str(path)
+
+
+def test_key_covers_hash_engine_imgsz_and_device(weights):
+    key = artifactKey(weights, 'onnxruntime', 640, 'cuda:0')
+
+    assert key.startswith(f"yolo11s-{hashModelFile(weights)[:12]}-onnxruntime-640-cuda0")
+    assert artifactKey(weights, 'openvino', 640, 'cuda:0') != key
+    assert artifactKey(weights, 'onnxruntime', 320, 'cuda:0') != key
+    assert artifactKey(weights, 'onnxruntime', 640, 'cpu') != key
+
+
+def test_key_changes_when_weights_change(weights):
+    before = artifactKey(weights, 'onnxruntime', 640, 'cpu')
+    with open(weights, 'wb') as f:
+        f.write(b'weights-v2-retrained')
+
+    assert artifactKey(weights, 'onnxruntime', 640, 'cpu') != before
+
+
+def test_store_then_lookup(tmp_path, weights):
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    assert cache.lookup(weights, 'onnxruntime', 640, 'cpu') is None
+
+    exported = _export(tmp_path)
+    cached = cache.store(weights, 'onnxruntime', 640, 'cpu', exported, {'export_seconds': 1.5})
+
+    assert not os.path.exists(exported)
+    assert cache.lookup(weights, 'onnxruntime', 640, 'cpu') == cached
+    assert cache.lookup(weights, 'onnxruntime', 320, 'cpu') is None
+
+    [manifest] = cache.entries()
+    assert manifest['sha256'] == hashModelFile(weights)
+    assert manifest['artifact'] == 'yolo11s.onnx'
+    assert manifest['export_seconds'] == 1.5
+
+
+def test_entry_without_manifest_is_a_miss(tmp_path, weights):
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    # Export interrupted before the manifest was written
+    directory = cache.entryDir(artifactKey(weights, 'openvino', 640, 'cpu'))
+    os.makedirs(os.path.join(directory, 'yolo11s_openvino_model'))
+
+    assert cache.lookup(weights, 'openvino', 640, 'cpu') is None
+    assert cache.entries() == []
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv('MODEL_CACHE_DIR', '/tmp/shopshadow-models')
+    assert ArtifactCache.fromEnv().cache_dir == '/tmp/shopshadow-models'
+
+    monkeypatch.setenv('MODEL_CACHE_DIR', '')
+    assert ArtifactCache.fromEnv() is None
+
+
+def test_export_for_engine_uses_cached_artifact_without_exporting(tmp_path, weights, monkeypatch):
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    cached = cache.store(weights, 'openvino', 320, 'cpu', _export(tmp_path, 'yolo11s_openvino_model'))
+    # ultralytics must not be needed on a cache hit
+    monkeypatch.setitem(sys.modules, 'ultralytics', None)
+
+    assert yolo_detector._export_for_engine(weights, 'openvino', 320, 'cpu', cache=cache) == cached
+    assert yolo_detector.getLoadStats()['artifact_cache'] == 'hit'
+
+
+def test_int8_model_is_cached_per_weights_version(tmp_path, weights):
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    assert artifactKey(weights, 'onnxruntime', 640, 'cpu', 'int8') != artifactKey(weights, 'onnxruntime', 640, 'cpu')
+
+    cached = cache.store(weights, 'onnxruntime', 640, 'cpu', _export(tmp_path, 'yolo11s_int8.onnx'),
+                         precision='int8')
+    assert yolo_detector._quantized_model_path(weights, 'onnxruntime', 640, cache=cache) == cached
+    assert cache.lookup(weights, 'onnxruntime', 640, 'cpu') is None
+
+    # Replaced weights: the old quantized model is not served
+    with open(weights, 'wb') as f:
+        f.write(b'weights-v2-retrained')
+    assert yolo_detector._quantized_model_path(weights, 'onnxruntime', 640, cache=cache) is None
+
+
+def test_int8_model_next_to_weights_must_be_newer(tmp_path, weights, monkeypatch):
+    monkeypatch.setenv('MODEL_CACHE_DIR', '')
+    quantized = _export(tmp_path, 'yolo11s_int8.onnx')
+    os.utime(weights, (1000, 1000))
+    os.utime(quantized, (2000, 2000))
+    assert yolo_detector._quantized_model_path(weights, 'onnxruntime', 640) == quantized
+
+    os.utime(weights, (3000, 3000))
+    assert yolo_detector._quantized_model_path(weights, 'onnxruntime', 640) is None
+
+
+def test_hash_is_memoized_per_file_version(weights, monkeypatch):
+    digest = hashModelFile(weights)
+    opened = []
+    real_open = open
+    monkeypatch.setattr(artifact_cache, 'open', lambda *a, **k: opened.append(a) or real_open(*a, **k),
+                        raising=False)
+
+    assert hashModelFile(weights) == digest
+    assert opened == []
+
+
+def test_torchscript_engine_and_image_size(monkeypatch):
+    assert yolo_detector.resolveEngine('ts') == 'torchscript'
+    assert yolo_detector._exported_model_path('models/yolo11s.pt', 'torchscript') == 'models/yolo11s.torchscript'
+    assert yolo_detector._is_exported_model('model_cache/x/yolo11s.torchscript') == 'torchscript'
+
+    monkeypatch.setenv('YOLO_IMGSZ', '320')
+    assert yolo_detector.resolveImageSize() == 320
+    with pytest.raises(ValueError):
+        yolo_detector.resolveImageSize(300)
+    with pytest.raises(ValueError, match='int8'):
+        yolo_detector.loadModel(engine='torchscript', precision='int8')
+
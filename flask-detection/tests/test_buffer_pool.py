@@ -0,0 +1,81 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from camera import capture  # noqa: E402
+from camera.buffer_pool import FrameBufferPool, getBufferPool  # noqa: E402
+from camera.frame import BGR, Frame  # noqa: E402
+from camera.sources import openFrameSource  # noqa: E402
+from detection.visualizer import addInfoOverlay  # noqa: E402
+
+
+def test_pool_reuses_released_buffers():
+    pool = FrameBufferPool(max_per_key=2)
+
+    first = pool.acquire((480, 640, 3))
+    pool.release(first)
+    second = pool.acquire((480, 640, 3))
+
+    assert second is first
+    stats = pool.getStats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_pool_is_keyed_by_shape_and_dtype():
+    pool = FrameBufferPool()
+    buffer = pool.acquire((4, 4, 3))
+    pool.release(buffer)
+
+    assert pool.acquire((4, 4, 3), np.float32) is not buffer
+    assert pool.acquire((8, 4, 3)) is not buffer
+    assert pool.acquire((4, 4, 3)) is buffer
+
+
+def test_pool_is_bounded_and_rejects_views():
+    pool = FrameBufferPool(max_per_key=1)
+    a = pool.acquire((2, 2))
+    b = pool.acquire((2, 2))
+    pool.release(a)
+    pool.release(b)
+    pool.release(a[:1])
+    pool.release(a)
+
+    assert pool.getStats()["idle_buffers"] == 1
+    assert pool.discarded == 3
+
+
+def test_frame_conversion_writes_into_dst():
+    frame = Frame(np.zeros((4, 4, 3), dtype=np.uint8), BGR)
+    dst = np.empty((4, 4, 3), dtype=np.uint8)
+    assert frame.asRGB() is not dst
+    assert frame.to("RGB", dst=dst) is dst
+
+
+def test_capture_loop_reaches_steady_state_without_allocations(tmp_path, monkeypatch):
+    for i in range(8):
+        cv2.imwrite(os.path.join(tmp_path, f"{i:02d}.png"), np.full((48, 64, 3), i, dtype=np.uint8))
+
+    pool = FrameBufferPool()
+    monkeypatch.setattr(capture, "getBufferPool", lambda: pool)
+    monkeypatch.setattr(capture, "_last_frame_shape", None)
+
+    source = openFrameSource(str(tmp_path), realtime=False)
+    try:
+        for _ in range(8):
+            frame = capture.captureFrame(source)
+            addInfoOverlay(frame, ["test"])
+            frame.release()
+    finally:
+        source.release()
+
+    # The first read allocates; every later read decodes into the released buffer
+    assert pool.misses == 0
+    assert pool.hits == 7
+    assert getBufferPool() is not pool
@@ -46,13 +46,13 @@ def test_camera():
     logger.info("✅ Frame captured successfully")
     logger.info(f"   Frame shape: {frame.shape}")
     logger.info(f"   Frame dtype: {frame.dtype}")
+    logger.info(f"   Color space: {frame.color_space}")
 
     # Save test frame
     output_path = os.path.join(current_dir, 'test_frame.jpg')
 
-    # Convert RGB back to BGR for saving (OpenCV saves in BGR)
-    frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-    success = cv2.imwrite(output_path, frame_bgr)
+    # OpenCV saves in BGR, which is the frame's native color space
+    success = cv2.imwrite(output_path, frame.asBGR())
 
     if success:
         logger.info(f"✅ Test frame saved to: {output_path}")
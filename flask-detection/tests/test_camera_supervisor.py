@@ -0,0 +1,154 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from camera.capture import CameraSupervisor  # noqa: E402
+
+
+class FlakySource:
+    """Source that delivers frames until fail() is called."""
+
+    prefetched = True
+
+    def __init__(self):
+        self.healthy = True
+        self.released = False
+
+    def read(self, image=None):
+        if not self.healthy:
+            return False, None
+        return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def isExhausted(self):
+        return False
+
+    def release(self):
+        self.released = True
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_supervisor_reconnects_after_sustained_failure():
+    opened = []
+
+    def opener():
+        opened.append(FlakySource())
+        return opened[-1]
+
+    supervisor = CameraSupervisor(opener, failure_threshold=2, backoff_initial=0.01).start()
+    try:
+        assert supervisor.waitUntilAvailable(timeout=1.0)
+        assert supervisor.captureFrame() is not None
+
+        opened[0].healthy = False
+        assert supervisor.captureFrame() is None
+        assert supervisor.isAvailable()
+        assert supervisor.captureFrame() is None
+        assert supervisor.state == 'reconnecting'
+
+        assert _wait_for(supervisor.isAvailable)
+        assert opened[0].released
+        assert supervisor.reconnects == 1
+        assert supervisor.captureFrame() is not None
+    finally:
+        supervisor.stop()
+
+
+def test_supervisor_reconnects_camera_whose_grabs_fail():
+    class FrozenCamera:
+        """Live camera whose grab() fails while retrieve() keeps decoding the last frame."""
+
+        def __init__(self):
+            self.grabbing = True
+            self.released = False
+
+        def grab(self):
+            time.sleep(0.001)
+            return self.grabbing
+
+        def retrieve(self, image=None):
+            return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+        def release(self):
+            self.released = True
+
+    opened = []
+
+    def opener():
+        opened.append(FrozenCamera())
+        return opened[-1]
+
+    supervisor = CameraSupervisor(opener, failure_threshold=2, backoff_initial=0.01, read_timeout=0.1).start()
+    try:
+        assert supervisor.waitUntilAvailable(timeout=1.0)
+        assert _wait_for(lambda: supervisor.captureFrame() is not None)
+
+        def reconnected():
+            supervisor.captureFrame()
+            return supervisor.reconnects == 1
+
+        # Only the stale grabber makes captures fail: retrieve() never does
+        opened[0].grabbing = False
+        assert _wait_for(reconnected)
+        assert opened[0].released
+        assert len(opened) == 2
+    finally:
+        supervisor.stop()
+
+
+def test_capture_returns_immediately_while_reconnecting():
+    attempts = []
+
+    def opener():
+        attempts.append(time.monotonic())
+        return None
+
+    supervisor = CameraSupervisor(opener, backoff_initial=0.01, backoff_max=0.04).start()
+    try:
+        start = time.monotonic()
+        assert supervisor.captureFrame() is None
+        assert time.monotonic() - start < 0.05
+        assert not supervisor.isAvailable()
+
+        assert _wait_for(lambda: len(attempts) >= 4)
+        gaps = [b - a for a, b in zip(attempts, attempts[1:])]
+        assert gaps[-1] >= gaps[0]
+    finally:
+        supervisor.stop()
+    assert supervisor.state == 'stopped'
+
+
+def test_exhausted_source_is_not_reconnected():
+    class FiniteSource(FlakySource):
+        def isExhausted(self):
+            return not self.healthy
+
+    sources = []
+
+    def opener():
+        sources.append(FiniteSource())
+        return sources[-1]
+
+    supervisor = CameraSupervisor(opener, failure_threshold=1, backoff_initial=0.01).start()
+    try:
+        assert supervisor.waitUntilAvailable(timeout=1.0)
+        sources[0].healthy = False
+
+        assert supervisor.captureFrame() is None
+        assert supervisor.isExhausted()
+        time.sleep(0.05)
+        assert len(sources) == 1
+    finally:
+        supervisor.stop()
@@ -0,0 +1,143 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from detection import detector  # noqa: E402
+from detection.cascade import InferenceCascade  # noqa: E402
+from detection.roi import RegionOfInterest  # noqa: E402
+from models.detections import Detections  # noqa: E402
+
+
+def _detections(*confidences):
+    count = len(confidences)
+    return Detections(
+        [[10.0, 10.0, 50.0, 50.0]] * count, list(confidences), [47] * count, {47: 'apple'}
+    )
+
+
+class StagedInference:
+    """Fake runInference returning a result per input size."""
+
+    def __init__(self, by_imgsz):
+        self.by_imgsz = by_imgsz
+        self.calls = []
+
+    def __call__(self, model, frame, confidence_threshold, classes=None, imgsz=None):
+        self.calls.append(imgsz)
+        return self.by_imgsz[imgsz]
+
+
+@pytest.fixture
+def frame():
+    return np.zeros((100, 200, 3), dtype=np.uint8)
+
+
+def test_confident_first_pass_is_accepted(monkeypatch, frame):
+    fake = StagedInference({320: _detections(0.9), None: _detections(0.95)})
+    monkeypatch.setattr(detector, 'runInference', fake)
+    cascade = InferenceCascade(first_imgsz=320)
+
+    high_conf, low_conf = detector.processFrame(frame, None, 0.7, cascade=cascade)
+
+    assert fake.calls == [320]
+    assert [d['confidence'] for d in high_conf] == [0.9]
+    assert low_conf == []
+    assert cascade.getStats()['stage1_hit_rate'] == 1.0
+
+
+def test_pending_band_reruns_at_full_size(monkeypatch, frame):
+    fake = StagedInference({320: _detections(0.9, 0.5), None: _detections(0.92, 0.81)})
+    monkeypatch.setattr(detector, 'runInference', fake)
+    cascade = InferenceCascade(first_imgsz=320)
+
+    high_conf, low_conf = detector.processFrame(frame, None, 0.7, cascade=cascade)
+
+    assert fake.calls == [320, None]
+    assert [d['confidence'] for d in high_conf] == [0.92, 0.81]
+    assert low_conf == []
+    stats = cascade.getStats()
+    assert stats['reruns_pending'] == 1
+    assert stats['stage1_hit_rate'] == 0.0
+
+
+def test_empty_first_pass_with_motion_reruns_unless_disabled(monkeypatch, frame):
+    fake = StagedInference({320: Detections.empty(), 640: _detections(0.75)})
+    monkeypatch.setattr(detector, 'runInference', fake)
+
+    rerun = InferenceCascade(first_imgsz=320, full_imgsz=640)
+    high_conf, _ = detector.processFrame(frame, None, 0.7, cascade=rerun, motion=True)
+    assert fake.calls == [320, 640]
+    assert len(high_conf) == 1
+    assert rerun.getStats()['reruns_empty'] == 1
+
+    fake.calls.clear()
+    no_rerun = InferenceCascade(first_imgsz=320, rerun_on_empty=False)
+    assert detector.processFrame(frame, None, 0.7, cascade=no_rerun, motion=True) == ([], [])
+    assert fake.calls == [320]
+
+
+def test_empty_first_pass_without_motion_is_accepted(monkeypatch, frame):
+    fake = StagedInference({320: Detections.empty(), 640: _detections(0.75)})
+    monkeypatch.setattr(detector, 'runInference', fake)
+    cascade = InferenceCascade(first_imgsz=320, full_imgsz=640)
+
+    # No motion gate, or a periodic refresh of a static scene
+    assert detector.processFrame(frame, None, 0.7, cascade=cascade) == ([], [])
+    assert fake.calls == [320]
+    assert cascade.getStats()['stage1_hit_rate'] == 1.0
+
+
+def test_motion_gate_flags_only_real_motion():
+    from detection.motion import MotionGate
+
+    gate = MotionGate(max_skips=1)
+    still = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    assert gate.check(still) and not gate.motion_detected
+    gate.storeResult(([], []))
+    assert not gate.check(still)
+    # max_skips refresh runs inference without motion
+    assert gate.check(still) and not gate.motion_detected
+    assert gate.check(np.full_like(still, 200)) and gate.motion_detected
+
+
+def test_detections_below_floor_do_not_count_as_pending():
+    cascade = InferenceCascade(first_imgsz=320, rerun_on_empty=False)
+
+    assert cascade.rerunReason(_detections(0.9, 0.2), 0.7, 0.3) is None
+    assert cascade.rerunReason([{'confidence': 0.4}], 0.7, 0.3) == 'pending'
+
+
+def test_cascade_runs_on_roi_crop_and_maps_boxes_back(monkeypatch, frame):
+    shapes = []
+
+    def fake(model, source, confidence_threshold, classes=None, imgsz=None):
+        shapes.append((source.data.shape[:2], imgsz))
+        return _detections(0.9)
+
+    monkeypatch.setattr(detector, 'runInference', fake)
+    roi = RegionOfInterest.parse('0.5,0.5,1,1')
+
+    high_conf, _ = detector.processFrame(frame, None, 0.7, roi=roi, cascade=InferenceCascade(320))
+
+    assert shapes == [((50, 100), 320)]
+    assert high_conf[0]['bbox'] == [110.0, 60.0, 150.0, 100.0]
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv('INFERENCE_CASCADE_ENABLED', raising=False)
+    assert InferenceCascade.fromEnv() is None
+
+    monkeypatch.setenv('INFERENCE_CASCADE_ENABLED', 'true')
+    monkeypatch.setenv('INFERENCE_CASCADE_IMGSZ', '256')
+    monkeypatch.setenv('INFERENCE_CASCADE_RERUN_EMPTY', 'false')
+    cascade = InferenceCascade.fromEnv()
+    assert (cascade.first_imgsz, cascade.full_imgsz, cascade.rerun_on_empty) == (256, None, False)
+
+    with pytest.raises(ValueError):
+        InferenceCascade(first_imgsz=300)
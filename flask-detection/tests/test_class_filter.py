@@ -0,0 +1,69 @@
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from detection import detector  # noqa: E402
+from models.yolo_detector import clearCache, getClassFilter, loadMapping  # noqa: E402
+
+
+def _product(name, product_id):
+    return {"coco_name": name, "product_id": product_id, "product_name": name.title(), "price": 1.0}
+
+
+@pytest.fixture
+def mapping_file(tmp_path):
+    path = tmp_path / "coco_to_products.json"
+    path.write_text(json.dumps({"47": _product("apple", "P001"), "46": _product("banana", "P002")}))
+    clearCache()
+    yield path
+    clearCache()
+
+
+def test_class_filter_lists_mapped_ids(mapping_file):
+    mapping = loadMapping(str(mapping_file))
+
+    assert getClassFilter(mapping) == [46, 47]
+    assert getClassFilter() == [46, 47]
+    assert getClassFilter({}) is None
+
+
+def test_mapping_and_filter_follow_file_changes(mapping_file):
+    loadMapping(str(mapping_file))
+    assert getClassFilter() == [46, 47]
+
+    mapping_file.write_text(json.dumps({"49": _product("orange", "P003")}))
+    future = time.time() + 5
+    os.utime(mapping_file, (future, future))
+
+    assert list(loadMapping(str(mapping_file))) == ["49"]
+    assert getClassFilter() == [49]
+
+
+def test_invalid_edit_keeps_previous_mapping(mapping_file):
+    loadMapping(str(mapping_file))
+
+    mapping_file.write_text("{ not json")
+    future = time.time() + 5
+    os.utime(mapping_file, (future, future))
+
+    assert set(loadMapping(str(mapping_file))) == {"46", "47"}
+
+
+def test_process_frame_passes_class_filter(monkeypatch):
+    captured = {}
+
+    def fake_run_inference(model, frame, confidence_threshold=0.3, classes=None):
+        captured["classes"] = classes
+        return []
+
+    monkeypatch.setattr(detector, "runInference", fake_run_inference)
+
+    detector.processFrame(frame=object(), model=object(), classes=[46, 47])
+
+    assert captured["classes"] == [46, 47]
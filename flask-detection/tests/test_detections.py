@@ -0,0 +1,129 @@
+import os
+import pickle
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from detection.detector import splitByConfidence  # noqa: E402
+from models.detections import DetectionBatch, Detections  # noqa: E402
+
+NAMES = {46: 'banana', 47: 'apple'}
+
+
+class FakeBoxes:
+    def __init__(self, rows):
+        self.data = np.array(rows, dtype=np.float32).reshape(-1, 6)
+
+    def __len__(self):
+        return len(self.data)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.boxes = FakeBoxes(rows)
+
+
+def _detections():
+    return Detections.fromResult(
+        FakeResult([
+            [123.04, 56.26, 234.0, 178.91, 0.92345, 47],
+            [300.0, 100.0, 400.0, 250.0, 0.5, 46],
+        ]),
+        NAMES,
+    )
+
+
+def test_from_result_rounds_and_iterates_as_dicts():
+    detections = _detections()
+
+    assert len(detections) == 2
+    assert detections[0] == {
+        'class_id': 47,
+        'class_name': 'apple',
+        'confidence': 0.923,
+        'bbox': [123.0, 56.3, 234.0, 178.9],
+    }
+    assert [d['class_name'] for d in detections] == ['apple', 'banana']
+    assert detections == detections.toList()
+
+
+def test_threshold_and_empty_results():
+    filtered = Detections.fromResult(FakeResult([[0, 0, 1, 1, 0.2, 47], [0, 0, 1, 1, 0.8, 46]]), NAMES, 0.5)
+    assert [d['class_id'] for d in filtered] == [46]
+
+    empty = Detections.fromResult(FakeResult([]), NAMES)
+    assert len(empty) == 0
+    assert not empty
+    assert empty == []
+
+
+def test_mask_indexing_translation_and_pickle():
+    detections = _detections()
+
+    high = detections[detections.confidence >= 0.7]
+    assert isinstance(high, Detections)
+    assert [d['class_id'] for d in high] == [47]
+
+    moved = detections.translated(10, 20)
+    assert moved[1]['bbox'] == [310.0, 120.0, 410.0, 270.0]
+    assert detections[1]['bbox'] == [300.0, 100.0, 400.0, 250.0]
+
+    assert pickle.loads(pickle.dumps(detections)) == detections
+
+
+def test_from_dicts_round_trip():
+    detections = _detections()
+    assert Detections.fromDicts(detections.toList(), NAMES) == detections
+
+
+def test_split_by_confidence_accepts_detections():
+    high_conf, low_conf = splitByConfidence(_detections(), threshold=0.7, detection_floor=0.3)
+
+    assert [d['class_id'] for d in high_conf] == [47]
+    assert [d['class_id'] for d in low_conf] == [46]
+
+
+def test_split_returns_batches():
+    high_conf, low_conf = splitByConfidence(_detections(), threshold=0.7, detection_floor=0.3)
+
+    assert isinstance(high_conf, DetectionBatch) and isinstance(low_conf, DetectionBatch)
+    assert Detections is DetectionBatch
+
+
+def test_group_by_class_counts_max_and_mean():
+    batch = DetectionBatch(
+        [[0, 0, 1, 1]] * 4, [0.9, 0.5, 0.7, 0.4], [47, 1001, 47, 1001], NAMES
+    )
+
+    class_ids, counts, max_conf, mean_conf = batch.groupByClass()
+
+    assert class_ids.tolist() == [47, 1001]
+    assert counts.tolist() == [2, 2]
+    np.testing.assert_allclose(max_conf, [0.9, 0.5])
+    np.testing.assert_allclose(mean_conf, [0.8, 0.45])
+    assert DetectionBatch.empty().groupByClass()[0].size == 0
+
+
+def test_concat_and_track_ids():
+    detections = _detections()
+    tracked = detections[:1].withTrackIds([7])
+
+    assert tracked[0]['track_id'] == 7
+    assert [d['track_id'] for d in tracked] == [7]
+    assert pickle.loads(pickle.dumps(tracked))[0]['track_id'] == 7
+
+    combined = tracked + detections[1:]
+    assert len(combined) == len(detections)
+    assert combined.track_id is None
+    assert ([] + detections) == detections
+
+
+def test_from_dicts_fills_missing_fields():
+    batch = DetectionBatch.fromDicts([{'class_id': 47}, {'confidence': 0.9}])
+
+    assert len(batch) == 1
+    assert batch[0]['bbox'] == [0.0, 0.0, 0.0, 0.0]
+    assert batch[0]['confidence'] == 0.0
@@ -0,0 +1,78 @@
+"""
+Parity between YOLO_ENGINE backends.
+
+Runs the same sample frames through the PyTorch model and each exported CPU
+engine and checks they report the same objects. Skipped when Ultralytics or
+the engine runtime is not installed.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from models import yolo_detector  # noqa: E402
+from models.yolo_detector import clearCache, loadModel, resolveEngine, runInference  # noqa: E402
+
+
+def test_resolve_engine_aliases(monkeypatch):
+    assert resolveEngine('onnx') == 'onnxruntime'
+    assert resolveEngine('OpenVINO') == 'openvino'
+
+    monkeypatch.setenv('YOLO_ENGINE', 'ov')
+    assert resolveEngine() == 'openvino'
+
+    with pytest.raises(ValueError):
+        resolveEngine('tensorrt')
+
+
+def test_exported_model_paths():
+    assert yolo_detector._exported_model_path('models/yolo11s.pt', 'onnxruntime') == 'models/yolo11s.onnx'
+    assert yolo_detector._exported_model_path('models/yolo11s.pt', 'openvino') == 'models/yolo11s_openvino_model'
+
+
+def _sample_frames():
+    import cv2
+    from ultralytics.utils import ASSETS
+
+    frames = [cv2.imread(str(path)) for path in sorted(ASSETS.glob('*.jpg'))]
+    return [frame for frame in frames if frame is not None]
+
+
+def _iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union else 0.0
+
+
+@pytest.mark.parametrize('engine, runtime', [('onnxruntime', 'onnxruntime'), ('openvino', 'openvino')])
+def test_engines_agree_with_torch(engine, runtime):
+    pytest.importorskip('ultralytics')
+    pytest.importorskip(runtime)
+
+    frames = _sample_frames()
+    assert frames, "Ultralytics sample images not found"
+
+    clearCache()
+    reference = [runInference(loadModel(engine='torch', device='cpu'), frame, 0.5) for frame in frames]
+    clearCache()
+    candidate = [runInference(loadModel(engine=engine, device='cpu'), frame, 0.5) for frame in frames]
+    clearCache()
+
+    for expected, actual in zip(reference, candidate):
+        # Objects near the threshold may flip; compare the confident ones
+        confident = [d for d in expected if d['confidence'] >= 0.6]
+        for detection in confident:
+            matches = [
+                other for other in actual
+                if other['class_id'] == detection['class_id'] and _iou(other['bbox'], detection['bbox']) > 0.9
+            ]
+            assert matches, f"{engine} missed {detection}"
+            assert abs(matches[0]['confidence'] - detection['confidence']) < 0.05
+        assert abs(len(actual) - len(expected)) <= max(1, int(np.ceil(0.1 * len(expected))))
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from camera.frame import BGR, RGB, Frame, toColorSpace  # noqa: E402
+from detection.visualizer import addInfoOverlay, drawDetections  # noqa: E402
+
+
+def _bgr_frame():
+    data = np.zeros((48, 64, 3), dtype=np.uint8)
+    data[..., 0] = 255  # pure blue in BGR
+    return Frame(data, BGR)
+
+
+def test_matching_color_space_returns_same_array():
+    frame = _bgr_frame()
+    assert frame.to(BGR) is frame.data
+    assert toColorSpace(frame.data, BGR) is frame.data
+
+
+def test_conversion_swaps_channels():
+    frame = _bgr_frame()
+    rgb = frame.asRGB()
+    assert rgb is not frame.data
+    assert rgb[0, 0].tolist() == [0, 0, 255]
+    assert Frame(rgb, RGB).asBGR()[0, 0].tolist() == [255, 0, 0]
+
+
+def test_draw_detections_annotates_bgr_frame_in_place():
+    frame = _bgr_frame()
+    detections = [{'bbox': [5, 20, 30, 40], 'class_name': 'apple', 'confidence': 0.9}]
+
+    display = drawDetections(frame, detections, show_confidence=True)
+    display = addInfoOverlay(display, ["Iteration: 1"])
+
+    assert display is frame.data
+
+
+def test_draw_detections_converts_legacy_rgb_arrays():
+    rgb = np.zeros((48, 64, 3), dtype=np.uint8)
+    rgb[..., 0] = 255  # pure red in RGB
+
+    display = drawDetections(rgb, [])
+
+    assert display is not rgb
+    assert display[0, 0].tolist() == [0, 0, 255]
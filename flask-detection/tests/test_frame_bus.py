@@ -0,0 +1,134 @@
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from camera.frame_bus import SharedFrameRing  # noqa: E402
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(slots=4, shape=(48, 64, 3), max_readers=2)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def _frame(value):
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+def test_reader_sees_latest_frame_as_readonly_view(ring):
+    reader = SharedFrameRing.attach(ring.name)
+    try:
+        assert ring.write(_frame(1)) == 1
+        assert ring.write(_frame(2)) == 2
+
+        view, seq, timestamp_ns = reader.acquire(after_seq=0)
+
+        assert seq == 2
+        assert timestamp_ns > 0
+        assert int(view[0, 0, 0]) == 2
+        assert not view.flags.writeable
+        assert not view.flags.owndata
+        view = None
+        reader.release()
+    finally:
+        reader.close()
+
+
+def test_acquire_times_out_without_newer_frame(ring):
+    ring.write(_frame(1))
+    view, seq, _ = ring.acquire(after_seq=1, timeout=0.01)
+    assert view is None
+    assert seq == 0
+
+
+def test_writer_skips_pinned_slot(ring):
+    reader = SharedFrameRing.attach(ring.name)
+    try:
+        ring.write(_frame(7))
+        view, seq, _ = reader.acquire(after_seq=0)
+
+        # Lap the ring several times; the pinned frame must stay intact
+        for value in range(20, 40):
+            assert ring.write(_frame(value)) > 0
+
+        assert int(view[0, 0, 0]) == 7
+        assert ring.writer_collisions > 0
+        view = None
+        reader.release()
+    finally:
+        reader.close()
+
+
+def test_mismatched_frame_shape_is_resized_into_slot(ring):
+    ring.write(np.full((96, 128, 3), 9, dtype=np.uint8))
+    view, _, _ = ring.acquire()
+    assert view.shape == (48, 64, 3)
+    assert int(view[10, 10, 0]) == 9
+    view = None
+    ring.release()
+
+
+def _child_reader(name, results):
+    ring = SharedFrameRing.attach(name)
+    view, seq, _ = ring.acquire(after_seq=0, timeout=5.0)
+    results.put((seq, int(view[0, 0, 0])))
+    view = None
+    ring.release()
+    ring.close()
+
+
+def test_frames_cross_process_boundary(ring):
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    ring.write(_frame(42))
+
+    process = ctx.Process(target=_child_reader, args=(ring.name, results))
+    process.start()
+    seq, value = results.get(timeout=30)
+    process.join(timeout=10)
+
+    assert (seq, value) == (1, 42)
+
+
+def test_inference_worker_stops_while_waiting_for_frames(ring, monkeypatch):
+    import queue
+    import threading
+    import time
+
+    from models import yolo_detector
+
+    class IdleModelManager:
+        def load(self):
+            return object()
+
+        def poll(self):
+            return False
+
+    monkeypatch.setattr(yolo_detector.ModelManager, 'fromEnv', classmethod(lambda cls, *args: IdleModelManager()))
+    requests, results, stop_event = queue.Queue(), queue.Queue(), threading.Event()
+    worker = threading.Thread(
+        target=yolo_detector.runInferenceWorker,
+        args=(ring.name, requests, results),
+        kwargs={'stop_event': stop_event},
+        daemon=True,
+    )
+    worker.start()
+
+    # No producer: the worker waits for a frame that never comes
+    requests.put(0)
+    time.sleep(0.2)
+    assert worker.is_alive()
+    stop_event.set()
+    requests.put(None)
+
+    worker.join(timeout=3)
+    assert not worker.is_alive()
+    assert results.empty()
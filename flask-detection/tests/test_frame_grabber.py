@@ -0,0 +1,170 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from camera.capture import FrameGrabber, captureFrame  # noqa: E402
+
+
+class FakeCamera:
+    """Minimal VideoCapture stand-in that produces a new frame per grab()."""
+
+    def __init__(self, grab_delay=0.001):
+        self.grab_delay = grab_delay
+        self.grabs = 0
+        self.retrieves = 0
+        self._lock = threading.Lock()
+
+    def grab(self):
+        time.sleep(self.grab_delay)
+        with self._lock:
+            self.grabs += 1
+        return True
+
+    def retrieve(self, image=None):
+        with self._lock:
+            self.retrieves += 1
+            value = self.grabs % 256
+        if image is not None and image.shape == (4, 4, 3):
+            image[:] = value
+            return True, image
+        return True, np.full((4, 4, 3), value, dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+def _wait_for(predicate, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_grabber_returns_latest_frame_with_sequence():
+    camera = FakeCamera()
+    grabber = FrameGrabber(camera).start()
+    try:
+        assert _wait_for(lambda: grabber.getStats()['sequence'] >= 5)
+
+        frame, sequence, timestamp = grabber.read()
+
+        assert frame is not None
+        assert sequence >= 5
+        assert timestamp <= time.monotonic()
+        # Only the frame handed to the consumer is decoded
+        assert camera.retrieves == 1
+        assert grabber.getStats()['dropped_frames'] >= sequence - 1
+    finally:
+        grabber.stop()
+
+
+def test_grabber_counts_duplicate_reads():
+    class SingleFrameCamera(FakeCamera):
+        def grab(self):
+            time.sleep(self.grab_delay)
+            with self._lock:
+                if self.grabs >= 1:
+                    return False
+                self.grabs += 1
+            return True
+
+    camera = SingleFrameCamera()
+    grabber = FrameGrabber(camera, max_failed_grabs=1000).start()
+    try:
+        first, first_seq, _ = grabber.read()
+        second, second_seq, _ = grabber.read()
+
+        assert first is not None
+        assert second is not first
+        assert first_seq == second_seq == 1
+        assert grabber.duplicate_frames == 1
+        assert camera.retrieves == 2
+    finally:
+        grabber.stop()
+
+
+def test_read_refuses_frozen_frame_when_grabs_keep_failing():
+    class DeadCamera(FakeCamera):
+        """Device gone: grab() fails, retrieve() still decodes the old frame."""
+
+        dead = False
+
+        def grab(self):
+            if self.dead:
+                time.sleep(self.grab_delay)
+                return False
+            return super().grab()
+
+    camera = DeadCamera()
+    grabber = FrameGrabber(camera, read_timeout=0.2, max_failed_grabs=5).start()
+    try:
+        assert _wait_for(lambda: grabber.getStats()['sequence'] >= 1)
+        assert grabber.read()[0] is not None
+
+        camera.dead = True
+        assert _wait_for(lambda: grabber.read()[0] is None)
+        assert grabber.stale_reads >= 1
+    finally:
+        grabber.stop()
+
+
+def test_capture_frame_accepts_grabber():
+    grabber = FrameGrabber(FakeCamera()).start()
+    try:
+        frame = captureFrame(grabber)
+        assert frame is not None
+        assert frame.shape == (4, 4, 3)
+    finally:
+        grabber.stop()
+    assert not grabber.isRunning()
+
+
+def test_read_without_running_thread_returns_none():
+    grabber = FrameGrabber(FakeCamera())
+    frame, sequence, timestamp = grabber.read(timeout=0.05)
+    assert frame is None
+    assert sequence == 0
+    assert timestamp is None
+
+
+def test_grabber_feeds_recorder_every_grabbed_frame(tmp_path):
+    from camera.recorder import FrameRecorder
+
+    camera = FakeCamera()
+    recorder = FrameRecorder(seconds=60.0, fps=0, max_frames=1000, output_dir=str(tmp_path))
+    grabber = FrameGrabber(camera, recorder=recorder).start()
+    try:
+        assert _wait_for(lambda: grabber.getStats()['sequence'] >= 10)
+        frame, _, _ = grabber.read()
+    finally:
+        grabber.stop()
+
+    assert recorder.frames_recorded == grabber.grabbed_frames
+    assert len({int(entry.data[0, 0, 0]) for entry in recorder._ring}) == recorder.frames_recorded
+    # read() copied the recorder's decode instead of decoding again
+    assert camera.retrieves == recorder.frames_recorded
+    assert frame.flags.writeable
+    assert not any(entry.data is frame for entry in recorder._ring)
+
+
+def test_grabber_decodes_only_frames_the_recorder_wants(tmp_path):
+    from camera.recorder import FrameRecorder
+
+    camera = FakeCamera(grab_delay=0.005)
+    recorder = FrameRecorder(seconds=60.0, fps=10, output_dir=str(tmp_path))
+    grabber = FrameGrabber(camera, recorder=recorder).start()
+    try:
+        assert _wait_for(lambda: grabber.getStats()['sequence'] >= 60)
+    finally:
+        grabber.stop()
+
+    assert 0 < recorder.frames_recorded < grabber.grabbed_frames / 2
+    assert camera.retrieves == recorder.frames_recorded
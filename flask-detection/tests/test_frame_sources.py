@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from camera.capture import captureFrame  # noqa: E402
+from camera.sources import ImageDirectorySource, VideoCaptureSource, openFrameSource  # noqa: E402
+
+
+def _write_images(directory, count):
+    for i in range(count):
+        image = np.full((48, 64, 3), i * 10, dtype=np.uint8)
+        cv2.imwrite(os.path.join(directory, f"frame_{i:03d}.png"), image)
+
+
+def _drain(source):
+    values = []
+    while True:
+        ok, frame = source.read()
+        if not ok:
+            break
+        values.append(int(frame[0, 0, 0]))
+    return values
+
+
+def test_image_directory_fast_playback_is_ordered_and_complete(tmp_path):
+    _write_images(tmp_path, 5)
+
+    source = openFrameSource(str(tmp_path), realtime=False)
+    try:
+        assert isinstance(source, ImageDirectorySource)
+        assert _drain(source) == [0, 10, 20, 30, 40]
+        assert source.isExhausted()
+        assert captureFrame(source, max_retries=1) is None
+    finally:
+        source.release()
+
+
+def test_image_directory_loops(tmp_path):
+    _write_images(tmp_path, 2)
+
+    source = openFrameSource(str(tmp_path), realtime=False, loop=True)
+    try:
+        values = [int(source.read()[1][0, 0, 0]) for _ in range(5)]
+        assert values == [0, 10, 0, 10, 0]
+        assert not source.isExhausted()
+    finally:
+        source.release()
+
+
+def test_realtime_playback_drops_frames_for_slow_consumer(tmp_path):
+    _write_images(tmp_path, 20)
+
+    source = openFrameSource(str(tmp_path), realtime=True, fps=200, prefetch=1)
+    try:
+        time.sleep(0.2)
+        values = _drain(source)
+        assert values[-1] == 190
+        assert len(values) < 20
+        assert source.frames_dropped > 0
+    finally:
+        source.release()
+
+
+def test_video_file_source(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(4):
+        writer.write(np.full((48, 64, 3), i * 40, dtype=np.uint8))
+    writer.release()
+
+    source = openFrameSource(path, realtime=False)
+    try:
+        assert isinstance(source, VideoCaptureSource)
+        assert not source.live
+        frame = captureFrame(source)
+        assert frame is not None
+        assert frame.shape == (48, 64, 3)
+        assert len(_drain(source)) == 3
+    finally:
+        source.release()
+
+
+def test_missing_source_returns_none(tmp_path):
+    assert openFrameSource(str(tmp_path / "missing.mp4")) is None
@@ -0,0 +1,53 @@
+"""
+Import budget: modules used by non-inference processes (Flask app, routing,
+mapping tools) must not pull in the heavy inference/vision libraries at import
+time. Each import runs in a fresh interpreter so earlier tests cannot mask it.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SERVICE_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+HEAVY_MODULES = ('torch', 'torchvision', 'ultralytics', 'onnxruntime', 'openvino', 'cv2')
+
+
+def _imported_heavy_modules(module):
+    script = (
+        "import json, sys\n"
+        f"import {module}\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([SERVICE_DIR, os.path.join(SERVICE_DIR, '..')]))
+    completed = subprocess.run(
+        [sys.executable, '-c', script], cwd=SERVICE_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize('module', [
+    'detection.detector',
+    'models',
+    'models.yolo_detector',
+    'models.product_lookup',
+    'detection.roi',
+    'detection.inference_pool',
+    'detection.tracker',
+    'detection.aggregator',
+    'detection.reconciler',
+    'camera.recorder',
+    'app',
+])
+def test_module_does_not_import_heavy_libraries(module):
+    assert _imported_heavy_modules(module) == []
+
+
+@pytest.mark.parametrize('module', ['main', 'detection.inference_shards'])
+def test_inference_entry_points_defer_model_runtimes(module):
+    # OpenCV is needed for capture/display; torch and friends load in loadModel()
+    assert set(_imported_heavy_modules(module)) <= {'cv2'}
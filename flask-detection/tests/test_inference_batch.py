@@ -0,0 +1,95 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from camera.frame import BGR, RGB, Frame  # noqa: E402
+from models.yolo_detector import runInferenceBatch  # noqa: E402
+
+
+class FakeBoxes:
+    def __init__(self, rows):
+        self.data = np.array(rows, dtype=np.float32).reshape(-1, 6)
+
+    def __len__(self):
+        return len(self.data)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.boxes = FakeBoxes(rows)
+
+
+class FakeModel:
+    """Returns one box per frame whose class id is the frame's fill value."""
+
+    names = {i: f"class_{i}" for i in range(256)}
+
+    def __init__(self, fail_on_call=None):
+        self.batch_sizes = []
+        self.fail_on_call = fail_on_call
+
+    def predict(self, source, verbose=False, conf=0.25, iou=0.45, classes=None):
+        self.batch_sizes.append(len(source))
+        self.classes = classes
+        if self.fail_on_call == len(self.batch_sizes):
+            raise RuntimeError("boom")
+        return [FakeResult([[1, 2, 3, 4, 0.9, int(img[0, 0, 0])]]) for img in source]
+
+
+def _frame(value):
+    return np.full((32, 32, 3), value, dtype=np.uint8)
+
+
+def test_batches_respect_max_size_and_keep_order():
+    model = FakeModel()
+    frames = [_frame(i) for i in range(5)]
+
+    detections, timing = runInferenceBatch(model, frames, confidence_threshold=0.3, max_batch_size=2)
+
+    assert model.batch_sizes == [2, 2, 1]
+    assert [d[0]['class_id'] for d in detections] == [0, 1, 2, 3, 4]
+    assert detections[3][0] == {'class_id': 3, 'class_name': 'class_3', 'confidence': 0.9, 'bbox': [1.0, 2.0, 3.0, 4.0]}
+    assert timing['frames'] == 5
+    assert timing['batches'] == 3
+    assert len(timing['batch_ms']) == 3
+    assert timing['per_frame_ms'] >= 0.0
+
+
+def test_failed_batch_yields_empty_lists_for_its_frames():
+    model = FakeModel(fail_on_call=1)
+
+    detections, timing = runInferenceBatch(model, [_frame(1), _frame(2), _frame(3)], max_batch_size=2)
+
+    assert detections[:2] == [[], []]
+    assert detections[2][0]['class_id'] == 3
+    assert timing['batches'] == 2
+
+
+def test_rgb_frames_are_converted_to_bgr():
+    model = FakeModel()
+    data = np.zeros((32, 32, 3), dtype=np.uint8)
+    data[..., 2] = 7  # blue channel in RGB order
+
+    detections, _ = runInferenceBatch(model, [Frame(data, RGB), Frame(_frame(5), BGR)])
+
+    assert [d[0]['class_id'] for d in detections] == [7, 5]
+
+
+def test_empty_input():
+    detections, timing = runInferenceBatch(FakeModel(), [])
+
+    assert detections == []
+    assert timing['batches'] == 0
+    assert timing['per_frame_ms'] == 0.0
+
+
+def test_class_filter_is_passed_to_predict():
+    model = FakeModel()
+
+    runInferenceBatch(model, [_frame(1)], classes=[46, 47])
+
+    assert model.classes == [46, 47]
@@ -0,0 +1,146 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from detection.inference_pool import InferencePool  # noqa: E402
+
+
+class FakeFrame:
+    def __init__(self, value):
+        self.value = value
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+class Gate:
+    """Holds workers inside infer() until opened."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.started = threading.Semaphore(0)
+
+    def infer(self, model, frame, motion):
+        self.started.release()
+        self.event.wait(5)
+        return (model, frame.value)
+
+
+def _pool(gate, workers=1, max_queue=2, overflow='drop_oldest'):
+    pool = InferencePool(gate.infer, lambda index: f"model-{index}", workers, max_queue, overflow)
+    pool.start()
+    return pool
+
+
+def test_results_come_back_in_submission_order_with_tags():
+    pool = InferencePool(lambda model, frame, motion: frame.value * 2, lambda index: None, workers=3, max_queue=10)
+    pool.start()
+    try:
+        for seq in range(6):
+            pool.submit(FakeFrame(seq), seq, timestamp=100.0 + seq)
+
+        futures = [pool.popCompleted(timeout=2.0) for _ in range(6)]
+    finally:
+        pool.stop()
+
+    assert [f.frame_seq for f in futures] == list(range(6))
+    assert [f.result() for f in futures] == [0, 2, 4, 6, 8, 10]
+    assert [f.timestamp for f in futures] == [100.0 + seq for seq in range(6)]
+    assert pool.getStats()['completed'] == 6
+
+
+def test_drop_oldest_cancels_oldest_queued_frame():
+    gate = Gate()
+    pool = _pool(gate, max_queue=2, overflow='drop_oldest')
+    try:
+        in_flight = pool.submit(FakeFrame(0), 0)
+        assert gate.started.acquire(timeout=2)
+
+        first, second, third = (pool.submit(FakeFrame(i), i) for i in (1, 2, 3))
+
+        assert first.dropped and first.frame.released
+        assert not second.dropped and not third.dropped
+
+        gate.event.set()
+        done = [pool.popCompleted(timeout=2.0) for _ in range(3)]
+    finally:
+        pool.stop()
+
+    assert [f.frame_seq for f in done] == [0, 2, 3]
+    assert in_flight.result() == ('model-0', 0)
+    assert pool.getStats()['dropped'] == 1
+
+
+def test_drop_newest_rejects_new_frame():
+    gate = Gate()
+    pool = _pool(gate, max_queue=1, overflow='drop_newest')
+    try:
+        pool.submit(FakeFrame(0), 0)
+        assert gate.started.acquire(timeout=2)
+        queued = pool.submit(FakeFrame(1), 1)
+        rejected = pool.submit(FakeFrame(2), 2)
+
+        assert rejected.dropped and rejected.frame.released
+        assert not queued.dropped
+    finally:
+        gate.event.set()
+        pool.stop()
+
+
+def test_block_waits_for_free_slot_and_times_out():
+    gate = Gate()
+    pool = _pool(gate, max_queue=1, overflow='block')
+    try:
+        pool.submit(FakeFrame(0), 0)
+        assert gate.started.acquire(timeout=2)
+        pool.submit(FakeFrame(1), 1)
+
+        start = time.monotonic()
+        timed_out = pool.submit(FakeFrame(2), 2, timeout=0.1)
+        assert timed_out.dropped
+        assert time.monotonic() - start >= 0.1
+
+        # Unblocks once the worker takes the queued frame
+        threading.Timer(0.1, gate.event.set).start()
+        accepted = pool.submit(FakeFrame(3), 3, timeout=2.0)
+        assert not accepted.dropped
+        assert accepted.result(timeout=2.0) == ('model-0', 3)
+    finally:
+        gate.event.set()
+        pool.stop()
+
+
+def test_failed_inference_sets_exception():
+    def infer(model, frame, motion):
+        raise RuntimeError("boom")
+
+    pool = InferencePool(infer, lambda index: None, workers=1)
+    pool.start()
+    try:
+        pool.submit(FakeFrame(0), 0)
+        future = pool.popCompleted(timeout=2.0)
+    finally:
+        pool.stop()
+
+    assert isinstance(future.exception(), RuntimeError)
+    assert pool.getStats()['failed'] == 1
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv('INFERENCE_WORKERS', raising=False)
+    assert InferencePool.fromEnv(lambda m, f: None, lambda i: None) is None
+
+    monkeypatch.setenv('INFERENCE_WORKERS', '2')
+    monkeypatch.setenv('INFERENCE_OVERFLOW', 'block')
+    pool = InferencePool.fromEnv(lambda m, f: None, lambda i: None)
+    assert pool.workers == 2 and pool.overflow == 'block'
+
+    with pytest.raises(ValueError):
+        InferencePool(lambda m, f, motion: None, lambda i: None, overflow='spill')
@@ -0,0 +1,168 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from camera.frame_bus import SharedFrameRing  # noqa: E402
+from detection.inference_shards import (  # noqa: E402
+    InferenceShardPool,
+    benchmarkShards,
+    planCpuAffinity,
+    serveShardRequests,
+)
+
+
+def _fake_shard(index, requests, results, threads, cpus, delay=0.0, fail_value=None):
+    """Shard worker returning (pixel value, shard index, threads) instead of detections."""
+    def infer(frame, motion):
+        time.sleep(delay)
+        value = int(frame.data[0, 0, 0])
+        if value == fail_value:
+            raise ValueError(f"bad frame {value}")
+        return value, index, threads
+
+    serveShardRequests(index, requests, results, infer)
+
+
+def _shape_shard(index, requests, results, threads, cpus, delay=0.0):
+    """Shard worker returning the shape of the frame it was given."""
+    def infer(frame, motion):
+        time.sleep(delay)
+        return frame.data.shape, int(frame.data[0, 0, 0])
+
+    serveShardRequests(index, requests, results, infer)
+
+
+def _frame(value, shape=(24, 32, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def _pool(**kwargs):
+    worker_kwargs = kwargs.pop('worker_kwargs', {})
+    pool = InferenceShardPool(worker_target=_fake_shard, worker_kwargs=worker_kwargs, **kwargs)
+    pool.start()
+    return pool
+
+
+def test_ring_acquire_sequence_returns_exact_frame():
+    ring = SharedFrameRing.create(slots=4, shape=(24, 32, 3), max_readers=1)
+    try:
+        for value in (1, 2, 3):
+            ring.write(_frame(value))
+
+        view, timestamp_ns = ring.acquireSequence(2)
+        assert int(view[0, 0, 0]) == 2
+        assert timestamp_ns > 0
+        view = None
+        ring.release()
+
+        for value in (4, 5, 6, 7):
+            ring.write(_frame(value))
+        # Overwritten frames and frames never published are reported as missing
+        assert ring.acquireSequence(1)[0] is None
+        assert ring.acquireSequence(99, timeout=0.05)[0] is None
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+def test_plan_cpu_affinity_splits_disjoint_sets():
+    assert planCpuAffinity(2, cpus=[0, 1, 2, 3]) == [[0, 1], [2, 3]]
+    assert planCpuAffinity(3, cpus=[4, 5, 6, 7]) == [[4, 5], [6], [7]]
+    assert planCpuAffinity(4, cpus=[0, 1]) == [None] * 4
+
+
+def test_results_come_back_in_order_from_all_shards():
+    pool = _pool(workers=2, threads_per_worker=3, max_queue=16, overflow='block',
+                 worker_kwargs={'delay': 0.01})
+    try:
+        for seq in range(8):
+            pool.submit(_frame(seq), seq, timestamp=100.0 + seq)
+        futures = [pool.popCompleted(timeout=30.0) for _ in range(8)]
+        stats = pool.getStats()
+    finally:
+        pool.stop()
+
+    assert [f.frame_seq for f in futures] == list(range(8))
+    assert [f.result()[0] for f in futures] == list(range(8))
+    assert {f.result()[1] for f in futures} == {0, 1}
+    assert {f.result()[2] for f in futures} == {3}
+    assert stats['completed'] == 8
+    assert sum(stats['dispatched']) == 8
+
+
+def test_round_robin_alternates_shards():
+    pool = _pool(workers=2, dispatch='round_robin', max_inflight=4, max_queue=8)
+    try:
+        for seq in range(4):
+            pool.submit(_frame(seq), seq)
+        shards = [pool.popCompleted(timeout=30.0).result()[1] for _ in range(4)]
+    finally:
+        pool.stop()
+
+    assert shards == [0, 1, 0, 1]
+
+
+def test_worker_errors_fail_only_that_frame():
+    pool = _pool(workers=1, max_queue=4, overflow='block', worker_kwargs={'fail_value': 1})
+    try:
+        for seq in range(3):
+            pool.submit(_frame(seq), seq)
+        futures = [pool.popCompleted(timeout=30.0) for _ in range(3)]
+    finally:
+        pool.stop()
+
+    assert futures[0].result()[0] == 0
+    with pytest.raises(RuntimeError, match='bad frame 1'):
+        futures[1].result()
+    assert futures[2].result()[0] == 2
+    assert pool.getStats()['failed'] == 1
+
+
+def test_new_frame_size_recreates_ring_instead_of_resizing():
+    pool = InferenceShardPool(workers=1, max_inflight=2, max_queue=8, overflow='block',
+                              worker_target=_shape_shard, worker_kwargs={'delay': 0.05})
+    pool.start()
+    try:
+        pool.submit(_frame(1), 0)
+        pool.submit(_frame(2), 1)
+        # Camera reconnected at another resolution while frames are in flight
+        pool.submit(_frame(3, (48, 64, 3)), 2)
+        pool.submit(_frame(4, (48, 64, 3)), 3)
+
+        results = [pool.popCompleted(timeout=5.0).result() for _ in range(4)]
+    finally:
+        pool.stop()
+
+    assert results == [((24, 32, 3), 1), ((24, 32, 3), 2), ((48, 64, 3), 3), ((48, 64, 3), 4)]
+
+
+def test_benchmark_reports_fps_per_worker_count():
+    results = benchmarkShards(
+        [_frame(value) for value in range(4)],
+        worker_counts=(1, 2),
+        total_frames=12,
+        cpu_affinity=False,
+        worker_target=_fake_shard,
+    )
+
+    assert [row['workers'] for row in results] == [1, 2]
+    assert all(row['frames'] == 12 and row['failed'] == 0 for row in results)
+    assert all(row['fps'] > 0 for row in results)
+
+
+def test_from_env_disabled_by_default(monkeypatch):
+    monkeypatch.delenv('INFERENCE_PROCESSES', raising=False)
+    assert InferenceShardPool.fromEnv() is None
+
+    monkeypatch.setenv('INFERENCE_PROCESSES', '2')
+    monkeypatch.setenv('INFERENCE_DISPATCH', 'round_robin')
+    pool = InferenceShardPool.fromEnv(0.6, 'weights.pt')
+    assert pool.workers == 2
+    assert pool.dispatch == 'round_robin'
+    assert pool.worker_kwargs['model_path'] == 'weights.pt'
@@ -0,0 +1,184 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from models import yolo_detector  # noqa: E402
+from models.yolo_detector import ModelManager, requestModelSwap  # noqa: E402
+
+
+class FakeLoader:
+    """Stands in for loadModel(); returns (model_path, load number) tuples."""
+
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail = False
+
+    def __call__(self, model_path, device, engine, precision, cache=True, imgsz=None):
+        self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError('corrupt weights')
+        self.calls.append((model_path, engine, cache))
+        return (model_path, len(self.calls))
+
+
+@pytest.fixture(autouse=True)
+def reset_model_cache():
+    yield
+    yolo_detector.clearCache()
+
+
+@pytest.fixture
+def loader():
+    return FakeLoader()
+
+
+def _manager(loader, tmp_path, **kwargs):
+    kwargs.setdefault('request_file', str(tmp_path / 'model_reload.json'))
+    manager = ModelManager(model_path=str(tmp_path / 'yolo11s.pt'), loader=loader, **kwargs)
+    manager.load()
+    return manager
+
+
+def test_swap_loads_in_background_and_keeps_serving_old_model(loader, tmp_path):
+    manager = _manager(loader, tmp_path)
+    with manager.use() as model:
+        first = model
+
+    loader.gate.clear()
+    assert manager.requestSwap(reason='test')
+    # Loop keeps inferring on the current model while the new one loads
+    with manager.use() as model:
+        assert model is first
+    loader.gate.set()
+    manager.waitForSwap(5)
+
+    with manager.use() as model:
+        assert model != first
+    assert manager.generation == 1
+    assert manager.getStats()['swaps'] == 1
+    # A reload must not return the cached model it replaces
+    assert loader.calls[-1][2] is False
+
+
+def test_old_model_is_kept_until_in_flight_inference_finishes(loader, tmp_path):
+    manager = _manager(loader, tmp_path)
+
+    with manager.use() as model:
+        manager.requestSwap()
+        manager.waitForSwap(5)
+        assert manager.getStats()['retiring'] == [0]
+        assert model[1] == 1
+
+    assert manager.getStats()['retiring'] == []
+
+
+def test_failed_reload_keeps_current_model(loader, tmp_path):
+    manager = _manager(loader, tmp_path)
+    loader.fail = True
+
+    manager.requestSwap()
+    manager.waitForSwap(5)
+
+    with manager.use() as model:
+        assert model[1] == 1
+    assert manager.generation == 0
+    assert manager.getStats()['failed_swaps'] == 1
+
+
+def test_worker_slots_get_their_own_instances_and_are_all_swapped(loader, tmp_path):
+    manager = _manager(loader, tmp_path)
+    with manager.use(0) as slot0, manager.use(1) as slot1:
+        assert slot0 is not slot1
+
+    manager.requestSwap()
+    manager.waitForSwap(5)
+
+    assert manager.getStats()['slots'] == 2
+    assert len(loader.calls) == 4
+
+
+def test_request_file_reaches_every_manager(loader, tmp_path):
+    request_file = str(tmp_path / 'model_reload.json')
+    requestModelSwap(request_file, reason='stale')
+    # A request that predates start-up is not replayed
+    managers = [_manager(loader, tmp_path), _manager(loader, tmp_path)]
+    assert not any(manager.poll() for manager in managers)
+
+    time.sleep(0.01)
+    new_weights = str(tmp_path / 'retrained.pt')
+    requestModelSwap(request_file, model_path=new_weights, engine='openvino')
+    assert all(manager.poll() for manager in managers)
+    for manager in managers:
+        manager.waitForSwap(5)
+        with manager.use() as model:
+            assert model[0] == new_weights
+        assert manager.engine == 'openvino'
+        # Same request is handled once
+        assert not manager.poll()
+
+
+def test_file_change_triggers_reload_after_settling(loader, tmp_path):
+    weights = tmp_path / 'yolo11s.pt'
+    weights.write_bytes(b'v1')
+    manager = _manager(loader, tmp_path, settle=0.0)
+    assert not manager.poll()
+
+    weights.write_bytes(b'v2')
+    os.utime(weights, (time.time() + 5, time.time() + 5))
+    # First sighting only starts the settle timer
+    assert not manager.poll()
+    assert manager.poll()
+    manager.waitForSwap(5)
+    assert manager.generation == 1
+    assert not manager.poll()
+
+
+def test_reload_endpoint_writes_request(tmp_path, monkeypatch):
+    pytest.importorskip('flask_cors')
+    request_file = tmp_path / 'model_reload.json'
+    models_dir = tmp_path / 'models'
+    models_dir.mkdir()
+    (models_dir / 'new.pt').write_bytes(b'weights')
+    monkeypatch.setenv('MODEL_RELOAD_FILE', str(request_file))
+    monkeypatch.setenv('MODEL_DIR', str(models_dir))
+    monkeypatch.chdir(tmp_path)
+    import app as app_module
+
+    client = app_module.app.test_client()
+    response = client.post('/model/reload', json={'model_path': 'models/new.pt', 'engine': 'ov'})
+    assert response.status_code == 202
+
+    request = json.loads(request_file.read_text())
+    assert request['id'] == response.get_json()['request_id']
+    assert (request['model_path'], request['engine']) == (str(models_dir / 'new.pt'), 'openvino')
+
+    assert client.post('/model/reload', json={'engine': 'tensorrt'}).status_code == 400
+
+
+@pytest.mark.parametrize('model_path', ['../evil.pt', '/tmp/evil.pt', 'models/../evil.pt', 'models/new.pkl',
+                                        'models/missing.pt'])
+def test_reload_endpoint_rejects_paths_outside_models_dir(tmp_path, monkeypatch, model_path):
+    pytest.importorskip('flask_cors')
+    request_file = tmp_path / 'model_reload.json'
+    models_dir = tmp_path / 'models'
+    models_dir.mkdir()
+    (models_dir / 'new.pkl').write_bytes(b'weights')
+    (tmp_path / 'evil.pt').write_bytes(b'weights')
+    monkeypatch.setenv('MODEL_RELOAD_FILE', str(request_file))
+    monkeypatch.setenv('MODEL_DIR', str(models_dir))
+    monkeypatch.chdir(tmp_path)
+    import app as app_module
+
+    response = app_module.app.test_client().post('/model/reload', json={'model_path': model_path})
+
+    assert response.status_code == 400
+    assert not request_file.exists()
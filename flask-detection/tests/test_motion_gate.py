@@ -0,0 +1,77 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from camera.frame import BGR, Frame  # noqa: E402
+from detection.motion import MotionGate  # noqa: E402
+
+
+def _frame(value=0, box=None):
+    data = np.full((480, 640, 3), value, dtype=np.uint8)
+    if box is not None:
+        x1, y1, x2, y2 = box
+        data[y1:y2, x1:x2] = 255
+    return Frame(data, BGR)
+
+
+@pytest.mark.parametrize("method", ["diff", "background"])
+def test_static_scene_skips_and_reuses_result(method):
+    gate = MotionGate(method=method, max_skips=0)
+
+    assert gate.check(_frame()) is True
+    gate.storeResult(([{"class_id": 47}], []))
+
+    for _ in range(3):
+        assert gate.check(_frame()) is False
+
+    assert gate.last_result == ([{"class_id": 47}], [])
+    stats = gate.getStats()
+    assert stats["inferences_run"] == 1
+    assert stats["inferences_skipped"] == 3
+
+
+def test_motion_triggers_inference():
+    gate = MotionGate()
+    gate.check(_frame())
+    gate.storeResult(([], []))
+
+    assert gate.check(_frame(box=(200, 150, 400, 350))) is True
+    assert gate.last_motion_ratio > gate.area_threshold
+
+
+def test_small_noise_is_ignored():
+    gate = MotionGate()
+    gate.check(_frame(value=100))
+    gate.storeResult(([], []))
+
+    assert gate.check(_frame(value=110)) is False
+
+
+def test_max_skips_forces_periodic_inference():
+    gate = MotionGate(max_skips=2)
+    gate.check(_frame())
+    gate.storeResult(([], []))
+
+    assert [gate.check(_frame()) for _ in range(3)] == [False, False, True]
+    assert gate.forced_inferences == 1
+
+
+def test_no_cached_result_always_runs_inference():
+    gate = MotionGate()
+    assert gate.check(_frame()) is True
+    assert gate.check(_frame()) is True
+
+
+def test_from_env_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("MOTION_GATE_ENABLED", raising=False)
+    assert MotionGate.fromEnv() is None
+
+    monkeypatch.setenv("MOTION_GATE_ENABLED", "true")
+    monkeypatch.setenv("MOTION_GATE_METHOD", "background")
+    gate = MotionGate.fromEnv()
+    assert gate.method == "background"
@@ -0,0 +1,73 @@
+import json
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from models import yolo_detector  # noqa: E402
+from models.product_lookup import COCO_CLASS_COUNT, ProductLookup  # noqa: E402
+from models.yolo_detector import getClassFilter, getProductFromClass, loadMapping  # noqa: E402
+
+MAPPING = {
+    '47': {'coco_name': 'apple', 'product_id': 'P001', 'product_name': 'Organic Apples', 'price': 1.99},
+    '46': {'coco_name': 'banana', 'product_id': 'P002', 'product_name': 'Fresh Bananas', 'price': 0.59},
+}
+
+
+@pytest.fixture(autouse=True)
+def reset_mapping_cache():
+    yield
+    yolo_detector.clearCache()
+
+
+def test_compiled_tables():
+    lookup = ProductLookup(MAPPING)
+
+    assert len(lookup.products) == COCO_CLASS_COUNT
+    assert lookup.lookup(47)['product_id'] == 'P001'
+    assert lookup.lookup(0) is None
+    assert lookup.lookup(999) is None
+    assert lookup.class_ids == (46, 47)
+    assert lookup.mask(np.array([47, 0, 46, 999, -1])).tolist() == [True, False, True, False, False]
+
+
+def test_still_behaves_like_the_mapping_dict():
+    lookup = ProductLookup(MAPPING)
+
+    assert isinstance(lookup, dict)
+    assert lookup['47'] == MAPPING['47']
+    assert getProductFromClass(46, lookup) == MAPPING['46']
+    assert getProductFromClass(46, MAPPING) == MAPPING['46']
+    assert pickle.loads(pickle.dumps(lookup)).lookup(47) == MAPPING['47']
+
+
+def test_read_only():
+    lookup = ProductLookup(MAPPING)
+
+    with pytest.raises(TypeError):
+        lookup['1'] = {}
+    with pytest.raises(TypeError):
+        lookup.update({})
+    with pytest.raises(TypeError):
+        lookup.lookup(47)['price'] = 0
+
+
+def test_load_mapping_compiles_and_recompiles_on_edit(tmp_path):
+    mapping_file = tmp_path / 'coco_to_products.json'
+    mapping_file.write_text(json.dumps(MAPPING))
+
+    lookup = loadMapping(str(mapping_file))
+    assert isinstance(lookup, ProductLookup)
+    assert getClassFilter(lookup) == [46, 47]
+
+    mapping_file.write_text(json.dumps({'47': MAPPING['47']}))
+    os.utime(mapping_file, (1, 1))
+
+    reloaded = loadMapping(str(mapping_file))
+    assert reloaded.lookup(46) is None
+    assert getClassFilter() == [47]
@@ -0,0 +1,111 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from models import quantize  # noqa: E402
+from models.yolo_detector import _exported_model_path, _is_exported_model, loadModel  # noqa: E402
+
+
+def _write_frames(directory, count, shape=(48, 64, 3)):
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        cv2.imwrite(os.path.join(directory, f"frame_{i:04d}.jpg"), np.full(shape, i * 10, dtype=np.uint8))
+
+
+def test_collect_frames_recurses_and_samples_evenly(tmp_path):
+    _write_frames(str(tmp_path / 'clip_a'), 6)
+    _write_frames(str(tmp_path / 'clip_b'), 6)
+    (tmp_path / 'clip_a' / 'metadata.json').write_text('{}')
+
+    all_paths = quantize.collectCalibrationFrames(str(tmp_path), max_frames=0)
+    sampled = quantize.collectCalibrationFrames(str(tmp_path), max_frames=4)
+
+    assert len(all_paths) == 12
+    assert len(sampled) == 4
+    assert sampled[0] == all_paths[0] and sampled[-1] == all_paths[-1]
+    assert any('clip_b' in path for path in sampled)
+
+
+def test_preprocess_letterboxes_to_square_rgb_tensor():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    frame[..., 0] = 255  # blue in BGR
+
+    tensor = quantize.preprocessFrame(frame, imgsz=320)
+
+    assert tensor.shape == (1, 3, 320, 320)
+    assert tensor.dtype == np.float32
+    # 640x480 → 320x240 with 40px grey bars top and bottom
+    assert tensor[0, 2, 160, 160] == pytest.approx(1.0)
+    assert tensor[0, 0, 160, 160] == pytest.approx(0.0)
+    assert tensor[0, 0, 10, 160] == pytest.approx(114 / 255)
+
+
+def test_calibration_stats_skip_unreadable(tmp_path):
+    _write_frames(str(tmp_path), 3)
+    broken = tmp_path / 'broken.jpg'
+    broken.write_bytes(b'not an image')
+
+    paths, stats = quantize.computeCalibrationStats(quantize.collectCalibrationFrames(str(tmp_path)), imgsz=64)
+
+    assert len(paths) == 3
+    assert stats['frames_skipped'] == 1
+    assert stats['resolutions'] == {'64x48': 3}
+    assert len(stats['input_channel_mean_rgb']) == 3
+
+
+def test_match_detections_requires_class_and_overlap():
+    reference = [
+        {'class_id': 47, 'confidence': 0.9, 'bbox': [0, 0, 10, 10]},
+        {'class_id': 46, 'confidence': 0.8, 'bbox': [20, 20, 30, 30]},
+    ]
+    candidate = [
+        {'class_id': 47, 'confidence': 0.85, 'bbox': [0, 0, 10, 11]},
+        {'class_id': 47, 'confidence': 0.7, 'bbox': [20, 20, 30, 30]},
+    ]
+
+    pairs = quantize.matchDetections(reference, candidate)
+
+    assert len(pairs) == 1
+    assert pairs[0][0]['class_id'] == 47
+
+
+def test_summarize_comparison_reports_agreement_and_speedup():
+    box = {'class_id': 47, 'confidence': 0.9, 'bbox': [0, 0, 10, 10]}
+    fp32 = [([box], 100.0), ([box], 100.0)]
+    int8 = [([dict(box, confidence=0.88)], 50.0), ([], 50.0)]
+
+    report = quantize.summarizeComparison(fp32, int8)
+
+    assert report['latency']['speedup'] == 2.0
+    assert report['agreement']['recall'] == 0.5
+    assert report['agreement']['precision'] == 1.0
+    assert report['agreement']['mean_confidence_delta'] == pytest.approx(0.02)
+
+
+def test_head_node_prefix():
+    names = ['/model.0/conv/Conv', '/model.23/dfl/Conv', '/model.9/m/MaxPool', 'output0']
+    assert quantize._head_node_prefix(names) == '/model.23/'
+
+
+def test_int8_artifact_paths():
+    assert _exported_model_path('models/yolo11s.pt', 'onnxruntime', 'int8') == 'models/yolo11s_int8.onnx'
+    assert _exported_model_path('models/yolo11s.pt', 'openvino', 'int8') == 'models/yolo11s_int8_openvino_model'
+    assert _is_exported_model('models/yolo11s_int8.onnx') == 'onnxruntime'
+    assert _is_exported_model('models/yolo11s_int8_openvino_model/') == 'openvino'
+    assert _is_exported_model('models/yolo11s.pt') is None
+
+
+def test_int8_requires_exported_engine():
+    with pytest.raises(ValueError):
+        loadModel(engine='torch', precision='int8')
+
+
+def test_quantize_rejects_torch_engine(tmp_path):
+    with pytest.raises(ValueError):
+        quantize.quantizeModel('yolo11s.pt', str(tmp_path), engine='torch')
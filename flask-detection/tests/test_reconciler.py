@@ -0,0 +1,276 @@
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from api.backend_client import ADD_APPLIED, ADD_FAILED, ADD_UNKNOWN, BackendClient  # noqa: E402
+from detection.reconciler import BasketReconciler  # noqa: E402
+from detection.tracker import ObjectTracker  # noqa: E402
+
+MAPPING = {
+    '47': {'coco_name': 'apple', 'product_id': 'P001', 'product_name': 'Organic Apples', 'price': 1.99},
+    '46': {'coco_name': 'banana', 'product_id': 'P002', 'product_name': 'Fresh Bananas', 'price': 0.59},
+}
+
+
+class FakeBackend:
+    """Backend basket rows per product; add() answers like POST /api/basket/items."""
+
+    def __init__(self):
+        self.rows = {}
+        self.calls = []
+        self.next_outcome = []
+
+    def addBasketItem(self, product_id, quantity, confidence):
+        self.calls.append((product_id, quantity))
+        outcome = self.next_outcome.pop(0) if self.next_outcome else ADD_APPLIED
+        if outcome == ADD_FAILED:
+            return ADD_FAILED, None
+        action = 'updated' if product_id in self.rows else 'created'
+        self.rows[product_id] = self.rows.get(product_id, 0) + quantity
+        if outcome == ADD_UNKNOWN:
+            return ADD_UNKNOWN, None
+        return ADD_APPLIED, {'productId': product_id, 'quantity': self.rows[product_id], 'action': action}
+
+
+def _det(class_id=47, x=10, confidence=0.9):
+    return {'class_id': class_id, 'confidence': confidence, 'bbox': [x, 10, x + 40, 50]}
+
+
+def _reconciler(backend, tmp_path, device_id='device-1', **kwargs):
+    reconciler = BasketReconciler(backend, state_file=str(tmp_path / 'basket_state.json'), **kwargs)
+    reconciler.attach(device_id)
+    return reconciler
+
+
+def test_sends_only_the_difference(tmp_path):
+    backend = FakeBackend()
+    reconciler = _reconciler(backend, tmp_path)
+
+    for _ in range(5):
+        reconciler.setDesired([_det(), _det(x=100)], MAPPING)
+        reconciler.sync()
+    reconciler.setDesired([_det(), _det(x=100), _det(x=200), _det(46)], MAPPING)
+    reconciler.sync()
+
+    assert backend.calls == [('P001', 2), ('P001', 1), ('P002', 1)]
+    assert reconciler.acknowledged == {'P001': 3, 'P002': 1}
+
+
+def test_removals_are_reported_not_sent(tmp_path):
+    backend = FakeBackend()
+    reconciler = _reconciler(backend, tmp_path)
+    reconciler.setDesired([_det(), _det(x=100)], MAPPING)
+    reconciler.sync()
+
+    reconciler.setDesired([_det()], MAPPING)
+    assert reconciler.diff() == {'P001': -1}
+    reconciler.sync()
+    assert reconciler.getStats()['unsynced_removals'] == 1
+
+    # Item back in view: nothing to re-add
+    reconciler.setDesired([_det(), _det(x=100)], MAPPING)
+    reconciler.sync()
+    assert backend.calls == [('P001', 2)]
+
+
+def test_failed_add_is_retried_unknown_add_is_not(tmp_path):
+    backend = FakeBackend()
+    reconciler = _reconciler(backend, tmp_path)
+    backend.next_outcome = [ADD_FAILED, ADD_APPLIED, ADD_UNKNOWN]
+
+    reconciler.setDesired([_det()], MAPPING)
+    reconciler.sync()
+    reconciler.sync()
+    assert backend.rows == {'P001': 1}
+
+    reconciler.setDesired([_det(), _det(x=100)], MAPPING)
+    reconciler.sync()
+    reconciler.sync()
+    assert backend.calls == [('P001', 1), ('P001', 1), ('P001', 1)]
+    assert reconciler.getStats()['unverified'] == ['P001']
+
+    # Next answered add reports the real row total
+    reconciler.setDesired([_det(), _det(x=100), _det(x=200)], MAPPING)
+    reconciler.sync()
+    assert reconciler.acknowledged == {'P001': 3}
+    assert reconciler.unverified == set()
+
+
+def test_backend_total_wins_over_local_count(tmp_path):
+    backend = FakeBackend()
+    backend.rows = {'P001': 2}
+    reconciler = _reconciler(backend, tmp_path)
+
+    reconciler.setDesired([_det()], MAPPING)
+    reconciler.sync()
+
+    assert reconciler.acknowledged == {'P001': 3}
+    assert reconciler.diff() == {'P001': -2}
+
+
+def test_restart_resumes_connected_device_without_duplicates(tmp_path):
+    backend = FakeBackend()
+    reconciler = _reconciler(backend, tmp_path)
+    reconciler.setDesired([_det(), _det(x=100)], MAPPING)
+    reconciler.sync()
+
+    restarted = BasketReconciler(backend, state_file=str(tmp_path / 'basket_state.json'))
+    assert restarted.saved_device_id == 'device-1'
+    restarted.attach('device-1', resumed=True)
+    restarted.setDesired([_det(), _det(x=100), _det(46)], MAPPING)
+    restarted.sync()
+
+    assert backend.calls == [('P001', 2), ('P002', 1)]
+    state = json.loads((tmp_path / 'basket_state.json').read_text())
+    assert state['acknowledged'] == {'P001': 2, 'P002': 1}
+
+    # A different device starts from an empty basket
+    other = BasketReconciler(backend, state_file=str(tmp_path / 'basket_state.json'))
+    other.attach('device-2')
+    assert other.acknowledged == {}
+
+
+def test_restart_that_needs_pairing_starts_a_new_session(tmp_path):
+    backend = FakeBackend()
+    reconciler = _reconciler(backend, tmp_path)
+    reconciler.setDesired([_det(), _det(x=100)], MAPPING)
+    reconciler.sync()
+
+    # Re-registration left the device disconnected; the next shopper has one apple
+    backend.rows = {}
+    restarted = BasketReconciler(backend, state_file=str(tmp_path / 'basket_state.json'))
+    restarted.attach('device-1', resumed=False)
+    restarted.setDesired([_det()], MAPPING)
+    restarted.sync()
+
+    assert backend.rows == {'P001': 1}
+
+
+def test_occluded_basket_is_not_added_twice(tmp_path):
+    backend = FakeBackend()
+    reconciler = _reconciler(backend, tmp_path)
+    tracker = ObjectTracker(min_hits=1, max_age=0)
+
+    frames = [[_det(), _det(x=100)]] * 4 + [[]] * 8 + [[_det(), _det(x=100)]] * 4
+    for frame in frames:
+        tracker.update(frame, [])
+        reconciler.setDesired(tracker.basketItems(), MAPPING)
+        reconciler.sync()
+
+    assert backend.calls == [('P001', 2)]
+    assert backend.rows == {'P001': 2}
+    assert reconciler.getStats()['resets'] == 0
+
+
+def test_emptied_row_is_counted_from_zero(tmp_path):
+    backend = FakeBackend()
+    reconciler = _reconciler(backend, tmp_path)
+    reconciler.setDesired([_det(), _det(x=100)], MAPPING)
+    reconciler.sync()
+
+    # Checkout empties the backend basket; the shopper adds a third apple
+    backend.rows = {}
+    reconciler.setDesired([_det(), _det(x=100), _det(x=200)], MAPPING)
+    assert reconciler.sync() == {'P001': 1}
+    assert reconciler.acknowledged == {'P001': 1}
+
+    # The row was recreated with one apple: the other two follow
+    assert reconciler.sync() == {'P001': 2}
+    assert backend.rows == {'P001': 3}
+
+
+def test_long_empty_basket_ends_the_session(tmp_path, monkeypatch):
+    backend = FakeBackend()
+    reconciler = _reconciler(backend, tmp_path, reset_seconds=300)
+    now = [1000.0]
+    monkeypatch.setattr('detection.reconciler.time.monotonic', lambda: now[0])
+    reconciler.setDesired([_det()], MAPPING)
+    reconciler.sync()
+
+    # Occlusion shorter than reset_seconds keeps the session
+    reconciler.setDesired([], MAPPING)
+    now[0] += 60
+    reconciler.setDesired([], MAPPING)
+    reconciler.setDesired([_det()], MAPPING)
+    reconciler.sync()
+    assert backend.calls == [('P001', 1)]
+
+    # Checkout, then the basket stays empty for five minutes
+    backend.rows = {}
+    reconciler.setDesired([], MAPPING)
+    now[0] += 300
+    reconciler.setDesired([], MAPPING)
+    assert reconciler.acknowledged == {}
+
+    reconciler.setDesired([_det()], MAPPING)
+    assert reconciler.sync() == {'P001': 1}
+    assert reconciler.getStats()['resets'] == 1
+
+
+def test_desired_basket_from_tracker(tmp_path):
+    backend = FakeBackend()
+    reconciler = _reconciler(backend, tmp_path)
+    tracker = ObjectTracker(min_hits=1, max_age=0)
+
+    frames = [[_det()], [_det()], [], [_det()], [_det(), _det(x=200)]]
+    for frame in frames:
+        tracker.update(frame, [])
+        reconciler.setDesired(tracker.basketItems(), MAPPING)
+        reconciler.sync()
+
+    # The apple re-tracked after leaving view is not added twice
+    assert backend.calls == [('P001', 1), ('P001', 1)]
+
+
+def test_add_basket_item_does_not_resend_unanswered_request(monkeypatch):
+    client = BackendClient('http://backend.test')
+    client.device_id = 'device-1'
+    calls = []
+
+    def post(url, json, timeout):
+        calls.append(json)
+        raise requests.exceptions.ReadTimeout('no response')
+
+    monkeypatch.setattr(client.session, 'post', post)
+
+    assert client.addBasketItem('P001', 1, 0.9) == (ADD_UNKNOWN, None)
+    assert len(calls) == 1
+
+
+def test_add_basket_item_unreachable_backend_is_safe_to_retry():
+    client = BackendClient('http://127.0.0.1:9', timeout=1)
+    client.device_id = 'device-1'
+
+    outcome, _ = client.addBasketItem('P001', 1, 0.9)
+
+    assert outcome == ADD_FAILED
+
+
+def test_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv('BASKET_RECONCILER_ENABLED', raising=False)
+    assert BasketReconciler.fromEnv(FakeBackend()) is None
+
+    monkeypatch.setenv('BASKET_RECONCILER_ENABLED', 'true')
+    monkeypatch.setenv('BASKET_STATE_FILE', str(tmp_path / 'state.json'))
+    reconciler = BasketReconciler.fromEnv(FakeBackend())
+    assert reconciler.state_file == str(tmp_path / 'state.json')
+    assert reconciler.reset_seconds == 0
+
+    monkeypatch.setenv('BASKET_RESET_SECONDS', '600')
+    assert BasketReconciler.fromEnv(FakeBackend()).reset_seconds == 600
+
+
+@pytest.mark.parametrize('content', ['not json', '[]'])
+def test_unreadable_state_is_ignored(tmp_path, content):
+    state_file = tmp_path / 'basket_state.json'
+    state_file.write_text(content)
+
+    reconciler = BasketReconciler(FakeBackend(), state_file=str(state_file))
+
+    assert reconciler.saved_device_id is None
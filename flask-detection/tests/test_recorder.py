@@ -0,0 +1,175 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from camera.buffer_pool import FrameBufferPool  # noqa: E402
+from camera.frame import BGR, Frame  # noqa: E402
+from camera.recorder import TRIGGER_LOW_CONFIDENCE, FrameRecorder, requestRecording  # noqa: E402
+
+
+def _frame(value):
+    return Frame(np.full((48, 64, 3), value, dtype=np.uint8), BGR)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    rec = FrameRecorder(seconds=1.0, fps=0, output_dir=str(tmp_path), file_format='jpg', cooldown=0,
+                        poll_interval=0)
+    rec.start()
+    yield rec
+    rec.stop()
+
+
+def test_ring_keeps_only_time_window_and_copies_frames(tmp_path):
+    rec = FrameRecorder(seconds=1.0, output_dir=str(tmp_path))
+    frame = _frame(10)
+
+    for i in range(5):
+        rec.record(frame, timestamp=100.0 + i * 0.4)
+
+    # Only 100.8, 101.2 and 101.6 are within 1s of the newest frame
+    assert rec.getStats()['buffered_frames'] == 3
+
+    # Later writes to the capture buffer do not alter buffered frames
+    frame.data[:] = 99
+    assert all(int(entry.data[0, 0, 0]) == 10 for entry in rec._ring)
+
+
+def test_frames_are_sampled_down_to_fps(tmp_path):
+    pool = FrameBufferPool()
+    rec = FrameRecorder(seconds=10.0, fps=5, output_dir=str(tmp_path))
+
+    # 30 fps input for one second
+    for i in range(30):
+        timestamp = 100.0 + i / 30
+        if rec.wants(timestamp):
+            rec.record(pool.acquire((48, 64, 3)), timestamp=timestamp, pool=pool)
+        else:
+            rec.record(_frame(i), timestamp=timestamp)
+
+    assert rec.getStats()['buffered_frames'] == 5
+    assert rec.frames_skipped == 25
+    timestamps = [entry.timestamp for entry in rec._ring]
+    assert all(0.19 < later - earlier < 0.24 for earlier, later in zip(timestamps, timestamps[1:]))
+    assert rec.wants(101.05)
+
+
+def test_owned_buffers_return_to_pool_after_pending_clips(tmp_path):
+    pool = FrameBufferPool()
+    rec = FrameRecorder(seconds=1.0, fps=0, max_frames=2, output_dir=str(tmp_path), file_format='jpg')
+
+    buffers = [pool.acquire((48, 64, 3)) for _ in range(3)]
+    rec.record(buffers[0], timestamp=100.0, pool=pool)
+    rec.record(buffers[1], timestamp=100.1, pool=pool)
+    assert rec.trigger('routing_failure') is not None
+
+    # Evicted from the ring but still held by the queued clip
+    rec.record(buffers[2], timestamp=100.2, pool=pool)
+    assert pool.returns == 0
+
+    # Writer not started: finish the queued clip by hand
+    rec._unref(rec._jobs.get_nowait()['frames'])
+    assert pool.returns == 1
+    assert pool.acquire((48, 64, 3)) is buffers[0]
+
+
+def test_trigger_writes_jpeg_sequence_and_metadata(recorder, tmp_path):
+    for value in (10, 20, 30):
+        recorder.record(_frame(value))
+
+    directory = recorder.trigger('low_confidence', {'detections': [{'class_id': 47}]})
+    assert directory is not None
+    assert _wait_for(lambda: recorder.recordings_saved == 1)
+
+    with open(os.path.join(directory, 'metadata.json')) as f:
+        metadata = json.load(f)
+
+    assert metadata['reason'] == 'low_confidence'
+    assert metadata['frame_count'] == 3
+    assert metadata['metadata']['detections'] == [{'class_id': 47}]
+    assert sorted(metadata['files']) == ['frame_0001.jpg', 'frame_0002.jpg', 'frame_0003.jpg']
+
+
+def test_triggers_within_cooldown_are_coalesced(tmp_path):
+    rec = FrameRecorder(seconds=5.0, output_dir=str(tmp_path), file_format='jpg', cooldown=60)
+    rec.start()
+    try:
+        rec.record(_frame(10))
+        assert rec.trigger('routing_failure') is not None
+        assert rec.trigger('routing_failure') is None
+        assert rec.triggers_coalesced == 1
+    finally:
+        rec.stop()
+
+    assert rec.recordings_saved == 1
+
+
+def test_trigger_without_frames_is_ignored(recorder):
+    assert recorder.trigger('api') is None
+
+
+def test_request_file_triggers_recording(recorder, tmp_path):
+    recorder.record(_frame(10))
+    requestRecording('dispute', str(tmp_path), metadata={'itemId': 'abc'})
+
+    recorder.record(_frame(20))
+
+    assert _wait_for(lambda: recorder.recordings_saved == 1)
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('request-')]
+    saved = [name for name in os.listdir(tmp_path) if name.endswith('_dispute')]
+    assert len(saved) == 1
+
+
+def test_api_request_is_not_lost_to_cooldown_or_busy_writer(tmp_path):
+    rec = FrameRecorder(seconds=5.0, output_dir=str(tmp_path), file_format='jpg', cooldown=60,
+                        max_pending=1, poll_interval=0)
+    rec.record(_frame(10))
+    assert rec.trigger(TRIGGER_LOW_CONFIDENCE) is not None
+    assert rec.trigger(TRIGGER_LOW_CONFIDENCE) is None
+
+    # Writer not started: the queue is full, so the request waits
+    requestRecording('api', str(tmp_path))
+    rec.record(_frame(20))
+    assert [name for name in os.listdir(tmp_path) if name.startswith('request-')]
+
+    rec.start()
+    try:
+        assert _wait_for(lambda: rec.recordings_saved == 1)
+        rec.record(_frame(30))
+        assert _wait_for(lambda: rec.recordings_saved == 2)
+    finally:
+        rec.stop()
+
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('request-')]
+    assert rec.triggers_coalesced == 1
+
+
+def test_mp4_recording(tmp_path):
+    rec = FrameRecorder(seconds=5.0, output_dir=str(tmp_path), file_format='mp4')
+    rec.start()
+    try:
+        for i in range(5):
+            rec.record(_frame(i * 40), timestamp=time.time() + i * 0.1)
+        directory = rec.trigger('api')
+    finally:
+        rec.stop()
+
+    if rec.write_errors:
+        pytest.skip("OpenCV build has no mp4v encoder")
+    assert os.path.getsize(os.path.join(directory, 'clip.mp4')) > 0
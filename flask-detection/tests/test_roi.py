@@ -0,0 +1,104 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from camera.frame import BGR, Frame  # noqa: E402
+from detection import detector  # noqa: E402
+from detection.roi import RegionOfInterest  # noqa: E402
+
+
+def _frame():
+    return Frame(np.zeros((480, 640, 3), dtype=np.uint8), BGR)
+
+
+def test_parse_rectangle_and_polygon():
+    rect = RegionOfInterest.parse("0.25,0.5,0.75,1.0")
+    assert not rect.is_polygon
+
+    polygon = RegionOfInterest.parse("0.1,1;0.25,0.2;0.75,0.2;0.9,1")
+    assert polygon.is_polygon
+    assert len(polygon.points) == 4
+
+    assert RegionOfInterest.parse("") is None
+    with pytest.raises(ValueError):
+        RegionOfInterest.parse("0.1,0.2,0.3")
+    with pytest.raises(ValueError):
+        RegionOfInterest.parse("0.5,0.5,0.5,0.9")
+
+
+def test_invalid_env_falls_back_to_full_frame(monkeypatch):
+    monkeypatch.setenv("DETECTION_ROI", "not,a,roi")
+    assert RegionOfInterest.fromEnv() is None
+
+
+def test_rectangle_crop_is_view_with_offset():
+    roi = RegionOfInterest.parse("0.25,0.5,0.75,1.0")
+    frame = _frame()
+
+    cropped, offset = roi.crop(frame)
+
+    assert offset == (160, 240)
+    assert cropped.shape == (240, 320, 3)
+    assert np.shares_memory(cropped.data, frame.data)
+
+
+def test_polygon_crop_masks_outside_pixels():
+    roi = RegionOfInterest.parse("0,0;1,0;0,1")
+    frame = Frame(np.full((100, 100, 3), 200, dtype=np.uint8), BGR)
+
+    cropped, offset = roi.crop(frame)
+
+    assert offset == (0, 0)
+    assert cropped.data[5, 5].tolist() == [200, 200, 200]
+    assert cropped.data[95, 95].tolist() == [0, 0, 0]
+    # Source frame is left untouched
+    assert frame.data[95, 95].tolist() == [200, 200, 200]
+
+
+def test_map_detections_offsets_boxes_and_drops_outside_polygon():
+    roi = RegionOfInterest.parse("0,0;1,0;0,1")
+    roi.crop(Frame(np.zeros((100, 100, 3), dtype=np.uint8), BGR))
+
+    detections = [
+        {"class_id": 1, "bbox": [5.0, 5.0, 15.0, 15.0]},
+        {"class_id": 2, "bbox": [80.0, 80.0, 95.0, 95.0]},
+    ]
+    mapped = roi.mapDetections(detections, (0, 0))
+
+    assert [d["class_id"] for d in mapped] == [1]
+
+
+def test_process_frame_infers_on_crop_and_returns_full_frame_boxes(monkeypatch):
+    monkeypatch.setattr(detector.logger, "debug", lambda *args, **kwargs: None)
+    roi = RegionOfInterest.parse("0.25,0.5,0.75,1.0")
+    seen_shapes = []
+
+    def fake_run_inference(model, frame, confidence_threshold=0.3):
+        seen_shapes.append(frame.shape)
+        return [{"class_id": 47, "confidence": 0.9, "bbox": [10.0, 20.0, 110.0, 120.0]}]
+
+    monkeypatch.setattr(detector, "runInference", fake_run_inference)
+
+    high_conf, low_conf = detector.processFrame(_frame(), model=None, threshold=0.7, roi=roi)
+
+    assert seen_shapes == [(240, 320, 3)]
+    assert high_conf[0]["bbox"] == [170.0, 260.0, 270.0, 360.0]
+    assert low_conf == []
+
+
+def test_map_detections_translates_columnar_detections():
+    from models.detections import Detections
+
+    roi = RegionOfInterest.parse("0,0;1,0;0,1")
+    roi.crop(Frame(np.zeros((100, 100, 3), dtype=np.uint8), BGR))
+    detections = Detections([[5, 5, 15, 15], [80, 80, 95, 95]], [0.9, 0.8], [1, 2])
+
+    mapped = roi.mapDetections(detections, (0, 0))
+
+    assert isinstance(mapped, Detections)
+    assert [d["class_id"] for d in mapped] == [1]
@@ -0,0 +1,154 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from detection import detector  # noqa: E402
+from detection.tracker import ObjectTracker, boxIou  # noqa: E402
+from models.detections import Detections  # noqa: E402
+
+APPLE = {'product_id': 'P001', 'product_name': 'Organic Apples'}
+
+
+def _det(x, y, confidence=0.9, class_id=47, size=40):
+    return {'class_id': class_id, 'confidence': confidence, 'bbox': [x, y, x + size, y + size]}
+
+
+def test_box_iou_matrix():
+    iou = boxIou([[0, 0, 10, 10], [100, 100, 110, 110]], [[0, 0, 10, 10], [5, 0, 15, 10]])
+
+    assert iou.shape == (2, 2)
+    np.testing.assert_allclose(iou[0], [1.0, 50 / 150])
+    np.testing.assert_allclose(iou[1], [0.0, 0.0])
+
+
+def test_static_item_is_reported_once():
+    tracker = ObjectTracker(min_hits=2)
+
+    assert tracker.update([_det(10, 10)]) == ([], [])
+    new_basket, _ = tracker.update([_det(11, 10)])
+    assert [d['track_id'] for d in new_basket] == [1]
+
+    for _ in range(10):
+        assert tracker.update([_det(10, 11)]) == ([], [])
+    assert tracker.getStats()['active_tracks'] == 1
+
+
+def test_single_frame_noise_never_confirms():
+    tracker = ObjectTracker(min_hits=2)
+
+    tracker.update([_det(10, 10)])
+    tracker.update([])
+    tracker.update([_det(10, 10)])
+
+    assert tracker.getStats()['tracks_confirmed'] == 0
+
+
+def test_second_item_of_same_class_gets_its_own_track():
+    tracker = ObjectTracker(min_hits=1)
+
+    first, _ = tracker.update([_det(10, 10)])
+    second, _ = tracker.update([_det(10, 10), _det(200, 10)])
+
+    assert len(first) == 1 and len(second) == 1
+    assert second[0]['track_id'] != first[0]['track_id']
+    assert second[0]['bbox'][0] == 200
+
+
+def test_low_confidence_dip_keeps_track():
+    tracker = ObjectTracker(min_hits=1)
+    tracker.update([_det(10, 10)])
+
+    # Same apple scored 0.5 for a frame: matched in the second stage
+    assert tracker.update([], [_det(12, 10, confidence=0.5)]) == ([], [])
+    assert tracker.update([_det(10, 10)]) == ([], [])
+
+
+def test_low_confidence_only_track_routes_to_pending():
+    tracker = ObjectTracker(min_hits=2)
+    tracker.update([], [_det(10, 10, confidence=0.5)])
+
+    new_basket, new_pending = tracker.update([], [_det(10, 10, confidence=0.55)])
+
+    assert new_basket == []
+    assert new_pending[0]['confidence'] == 0.55
+
+
+def test_centroid_fallback_follows_moved_item():
+    tracker = ObjectTracker(min_hits=1, iou_threshold=0.3, centroid_threshold=0.5)
+    tracker.update([_det(10, 10)])
+
+    # Moved by more than half its width: IoU below threshold, centroid within range
+    assert tracker.update([_det(35, 10)]) == ([], [])
+    assert tracker.getStats()['tracks_created'] == 1
+
+
+def test_classes_never_match_each_other():
+    tracker = ObjectTracker(min_hits=1)
+    tracker.update([_det(10, 10, class_id=47)])
+
+    new_basket, _ = tracker.update([_det(10, 10, class_id=46)])
+
+    assert [d['class_id'] for d in new_basket] == [46]
+
+
+def test_track_survives_occlusion_up_to_max_age():
+    tracker = ObjectTracker(min_hits=1, max_age=2)
+    tracker.update([_det(10, 10)])
+
+    tracker.update([])
+    tracker.update([])
+    assert tracker.update([_det(10, 10)]) == ([], [])
+
+    for _ in range(3):
+        tracker.update([])
+    assert tracker.getStats()['tracks_removed'] == 1
+    new_basket, _ = tracker.update([_det(10, 10)])
+    assert len(new_basket) == 1
+
+
+def test_accepts_detections_container():
+    tracker = ObjectTracker(min_hits=1)
+    detections = Detections([[10.0, 10.0, 50.0, 50.0]], [0.9], [47], {47: 'apple'})
+
+    new_basket, _ = tracker.update(detections, Detections.empty())
+
+    assert new_basket[0]['class_id'] == 47
+
+
+def test_route_detections_sends_only_new_tracks(monkeypatch):
+    monkeypatch.setattr(detector, 'getProductFromClass', lambda class_id, mapping: APPLE)
+    tracker = ObjectTracker(min_hits=2)
+
+    payloads = []
+    for frame_detections in ([_det(10, 10)], [_det(10, 10), _det(200, 10)], [_det(10, 10), _det(200, 10)]):
+        basket, _ = detector.routeDetections(frame_detections, [], {}, 'device-1', tracker=tracker)
+        payloads.append([p['quantity'] for p in basket])
+
+    assert payloads == [[], [1], [1]]
+
+    for _ in range(5):
+        basket, pending = detector.routeDetections([_det(10, 10), _det(200, 10)], [], {}, 'device-1', tracker=tracker)
+        assert basket == [] and pending == []
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv('TRACKER_ENABLED', raising=False)
+    monkeypatch.setenv('TRACKER_MIN_HITS', '3')
+    assert ObjectTracker.fromEnv().min_hits == 3
+
+    monkeypatch.setenv('TRACKER_ENABLED', 'false')
+    assert ObjectTracker.fromEnv() is None
+
+
+@pytest.mark.parametrize('count', [0, 1, 25])
+def test_stats_track_counts(count):
+    tracker = ObjectTracker(min_hits=1)
+
+    tracker.update([_det(50 * i, 0) for i in range(count)])
+
+    assert tracker.getStats()['active_tracks'] == count